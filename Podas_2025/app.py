@@ -6,15 +6,59 @@ Visualización de PQR pendientes georreferenciadas con mapa interactivo
 import streamlit as st
 import pandas as pd
 import folium
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
+import functools
 import os
+import sys
+import time
 from pathlib import Path
-import matplotlib.pyplot as plt
+
+# Los módulos compartidos de podas viven en la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from podas.charts import bar_chart_png, stacked_bar_png
+from podas.cube import CountsCube
+from podas.filters import FilterIndex
+from podas.ingest import table_path
+from podas.loaders import INVENTARIO_FILE, PQR_FILE, load_inventario, load_pqr
+from podas.map_cache import MapHtmlCache, filter_key
+from podas.map_layers import ZoomSwitch, add_density_layer, add_point_layer
+from podas.routing import plan_route
+from podas.scheduling import schedule_summary, schedule_work_orders, work_orders_zip
+from podas import timing
 
 # Colores personalizados
 COLOR_VERDE = '#70e000'
 COLOR_ROJO = '#d80032'
 
+# Tema y colores de los gráficos de barras (ver podas.charts)
+TEMA_GRAFICOS = 'oscuro'
+COLORES_GRAFICOS = {'SI': COLOR_VERDE, 'NO': COLOR_ROJO}
+
+# Radio de los hexágonos de densidad (m) y zoom desde el que se ven los puntos
+TAMANO_HEXAGONO_M = 250
+ZOOM_DETALLE = 15
+
+# Plantillas de popup de los marcadores ({campo} se reemplaza por el valor de la fila)
+POPUP_PQR = (
+    "<b>Sticker:</b> {Sticker}<br>"
+    "<b>P.Q.R.S:</b> {P.Q.R.S}<br>"
+    "<b>Comuna:</b> {Comuna}<br>"
+    "<b>Inventariado:</b> {Inventariado}<br>"
+    "<b>Requiere Acción:</b> {Requiere_Acción}"
+)
+POPUP_DENSIDAD = (
+    "<b>PQR:</b> {PQR}<br>"
+    "<b>Requieren acción:</b> {Pendientes}<br>"
+    "<b>Árboles inventario:</b> {Árboles}"
+)
+POPUP_INVENTARIO = (
+    "<b>Sticker:</b> {Sticker}<br>"
+    "<b>Nombre común:</b> {Nombre_comun}<br>"
+    "<b>Nombre científico:</b> {NOMBRE CIENTIFICO}<br>"
+    "<b>Altura (m):</b> {HT(m)}<br>"
+    "<b>CAP (cm):</b> {CAP(cm)}"
+)
+
 # Configuración de la página
 st.set_page_config(
     page_title="Gestión de Podas - ESIP",
@@ -22,95 +66,179 @@ st.set_page_config(
     layout="wide"
 )
 
-# Ruta de los archivos CSV
-DATA_DIR = Path("data")
-PQR_FILE = DATA_DIR / "pqr_pendientes_georreferenciadas.csv"
-INVENTARIO_FILE = DATA_DIR / "Inventario_forestal.csv"
-
-
-def clean_coordinate(value):
-    """
-    Limpia y convierte una coordenada a float.
-    Maneja strings con comas como separador decimal y valores no numéricos.
-    """
-    if pd.isna(value):
-        return None
-    
-    try:
-        # Si ya es numérico, convertir directamente
-        if isinstance(value, (int, float)):
-            return float(value)
-        
-        # Si es string, limpiar y convertir
-        if isinstance(value, str):
-            # Eliminar espacios
-            value = value.strip()
-            # Reemplazar comas por puntos (formato decimal europeo)
-            value = value.replace(',', '.')
-        
-        # Convertir a float
-        result = float(value)
-        
-        # Validar rangos razonables para coordenadas
-        # Latitud: -90 a 90, Longitud: -180 a 180
-        if abs(result) > 180:
-            return None
-            
-        return result
-    except (ValueError, TypeError, AttributeError):
-        return None
+# Motivos de rechazo de coordenadas (ver podas.coordinates) tal como se muestran
+ETIQUETAS_RECHAZO = {'vacio': 'vacías', 'no_numerico': 'no numéricas', 'fuera_de_rango': 'fuera de rango'}
 
 
+@timing.timed('load_pqr_data')
 @st.cache_data
 def load_pqr_data():
     """
-    Carga el archivo CSV de PQR pendientes georreferenciadas.
-    Fuerza Sticker a string y lo rellena con ceros a 6 cifras.
+    Carga el archivo CSV de PQR pendientes georreferenciadas (o su Parquet de
+    python -m podas.ingest, si es más reciente).
+    Normaliza Sticker con la clave canónica compartida (numéricos a 6 cifras) y
+    aplica el esquema compacto de podas.schema: st.cache_data entrega una copia
+    por sesión, así que cada byte por fila se paga en cada sesión.
+
+    Returns:
+        Tupla (df, rechazos): rechazos son las filas con coordenadas rechazadas
+        por motivo (ver podas.coordinates.rejection_counts), o None si falla la carga
     """
     try:
-        df = pd.read_csv(PQR_FILE, dtype={'Sticker': str})
-        # Convertir Sticker a string y rellenar con ceros a 6 cifras
-        df['Sticker'] = df['Sticker'].astype(str).str.zfill(6)
-        
-        # Limpiar y convertir coordenadas a float
-        if 'Latitud' in df.columns:
-            df['Latitud'] = df['Latitud'].apply(clean_coordinate)
-        if 'Longitud' in df.columns:
-            df['Longitud'] = df['Longitud'].apply(clean_coordinate)
-        
-        return df
+        # Misma carga que la generación por lotes de rutas (python -m podas.batch, ver podas.loaders)
+        return load_pqr(PQR_FILE, rechazos=True)
     except FileNotFoundError:
         st.error(f"❌ No se encontró el archivo: {PQR_FILE}")
-        return pd.DataFrame()
+        return pd.DataFrame(), None
     except Exception as e:
         st.error(f"❌ Error al cargar PQR: {str(e)}")
-        return pd.DataFrame()
+        return pd.DataFrame(), None
 
 
+@timing.timed('load_inventario_data')
 @st.cache_data
 def load_inventario_data():
     """
-    Carga el archivo CSV de Inventario forestal si existe.
-    Fuerza Sticker a string y lo rellena con ceros a 6 cifras.
+    Carga el archivo CSV de Inventario forestal si existe (o su Parquet).
+    Normaliza Sticker con la clave canónica compartida (numéricos a 6 cifras) y
+    aplica el esquema compacto de podas.schema.
+
+    Returns:
+        Tupla (df, rechazos) como load_pqr_data
     """
-    if not INVENTARIO_FILE.exists():
-        return pd.DataFrame()
+    if not table_path(INVENTARIO_FILE).exists():
+        return pd.DataFrame(), None
     
     try:
-        df = pd.read_csv(INVENTARIO_FILE, dtype={'Sticker': str})
-        # Convertir Sticker a string y rellenar con ceros a 6 cifras
-        df['Sticker'] = df['Sticker'].astype(str).str.zfill(6)
-        
-        # Limpiar y convertir coordenadas a float
-        if 'Latitud' in df.columns:
-            df['Latitud'] = df['Latitud'].apply(clean_coordinate)
-        if 'Longitud' in df.columns:
-            df['Longitud'] = df['Longitud'].apply(clean_coordinate)
-        
-        return df
+        return load_inventario(INVENTARIO_FILE, rechazos=True)
     except Exception as e:
         st.warning(f"⚠️ Error al cargar Inventario forestal: {str(e)}")
-        return pd.DataFrame()
+        return pd.DataFrame(), None
+
+
+@st.cache_data
+def load_data_version():
+    """
+    Versión de los datos cargados: tamaño y fecha de los archivos que leen
+    load_pqr_data y load_inventario_data. Se guarda en st.cache_data junto con
+    ellos, así que cambia cuando se limpian las cachés y los datos se releen.
+    """
+    version = {}
+    for ruta in (table_path(PQR_FILE), table_path(INVENTARIO_FILE)):
+        version[str(ruta)] = (ruta.stat().st_size, ruta.stat().st_mtime_ns) if ruta.exists() else None
+    return version
+
+
+@st.cache_resource
+def get_pqr_filter_index():
+    """
+    Índice de filtros de los PQR (ver podas.filters), construido una vez.
+    load_pqr_data devuelve siempre las mismas filas en el mismo orden, así que
+    las máscaras del índice sirven para cada copia que entrega st.cache_data.
+    """
+    return FilterIndex(load_pqr_data()[0], {
+        'Comuna': 'exact',
+        'Inventariado': 'upper',
+        'Requiere_Acción': 'upper',
+    })
+
+
+@st.cache_resource
+def get_pqr_counts_cube():
+    """
+    Cubo de conteos de los PQR (ver podas.cube), construido una vez.
+    Las métricas y gráficos se responden sumando celdas del cubo con los
+    mismos filtros de la barra lateral, sin recorrer las filas.
+    """
+    return CountsCube(load_pqr_data()[0])
+
+
+@timing.timed('render_bar_chart')
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_bar_chart(labels, values, xlabel, theme=TEMA_GRAFICOS):
+    """
+    PNG de un gráfico de barras de conteos (ver podas.charts).
+    La clave de st.cache_data son los conteos, el título y el tema: mientras los
+    filtros no cambien los conteos, el PNG se sirve sin crear ni rasterizar la figura.
+    
+    Args:
+        labels: Tupla de etiquetas de las barras
+        values: Tupla de conteos
+        xlabel: Título del eje X
+        theme: Tema de podas.charts.THEMES
+    
+    Returns:
+        Bytes del PNG
+    """
+    return bar_chart_png(labels, values, xlabel, colors=COLORES_GRAFICOS, theme=theme)
+
+
+@timing.timed('render_stacked_chart')
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_stacked_chart(categories, stacks, theme=TEMA_GRAFICOS):
+    """
+    PNG de las barras apiladas de Inventariado por Comuna, en caché como render_bar_chart.
+    
+    Args:
+        categories: Tupla de comunas
+        stacks: Tupla de pares (valor de Inventariado, tupla de conteos por comuna)
+        theme: Tema de podas.charts.THEMES
+    
+    Returns:
+        Bytes del PNG
+    """
+    return stacked_bar_png(
+        categories, stacks, 'Comuna', title='Conteo de Inventariado por Comuna',
+        legend_title='Inventariado', colors=COLORES_GRAFICOS, theme=theme
+    )
+
+
+@st.cache_resource
+def get_map_cache():
+    """Caché LRU del HTML de los mapas, compartida entre sesiones (ver podas.map_cache)."""
+    return MapHtmlCache(max_entries=32)
+
+
+def render_map_html(*args, **kwargs):
+    """Construye el mapa con create_map y lo serializa a HTML. Devuelve (html, info)."""
+    with timing.span('create_map'):
+        m, info = create_map(*args, **kwargs)
+    with timing.span('serialización HTML'):
+        return m.get_root().render(), info
+
+
+@timing.timed('compute_route')
+@st.cache_data
+def compute_route(df_pqr):
+    """
+    Calcula la ruta optimizada (vecino más cercano + 2-opt/Or-opt) de los PQR filtrados.
+    
+    Args:
+        df_pqr: DataFrame con datos de PQR filtrados
+    
+    Returns:
+        Tupla (df_ruta, resumen) de podas.routing.plan_route
+    """
+    return plan_route(df_pqr)
+
+
+@timing.timed('compute_schedule')
+@st.cache_data
+def compute_schedule(df_pqr, crews, max_stops, max_km):
+    """
+    Programa los PQR pendientes por cuadrilla y día.
+    
+    Args:
+        df_pqr: DataFrame con datos de PQR filtrados
+        crews: Número de cuadrillas
+        max_stops: Máximo de paradas por cuadrilla y día
+        max_km: Máximo de km por cuadrilla y día (None = sin límite)
+    
+    Returns:
+        Tupla (plan, resumen, zip_ordenes) de podas.scheduling
+    """
+    plan = schedule_work_orders(df_pqr, crews=crews, max_stops=max_stops, max_km=max_km)
+    return plan, schedule_summary(plan), work_orders_zip(plan)
 
 
 def add_legend(m):
@@ -137,7 +265,8 @@ def add_legend(m):
     m.get_root().html.add_child(folium.Element(legend_html))
 
 
-def create_map(df_pqr, df_inventario, show_inventario, show_ruta_optima, comunas_seleccionadas=None):
+def create_map(df_pqr, df_inventario, show_inventario, show_ruta_optima, comunas_seleccionadas=None, df_ruta=None,
+               show_densidad=False):
     """
     Crea un mapa Folium con marcadores de PQR e Inventario.
     
@@ -147,12 +276,18 @@ def create_map(df_pqr, df_inventario, show_inventario, show_ruta_optima, comunas
         show_inventario: Boolean para mostrar capa de Inventario
         show_ruta_optima: Boolean para mostrar ruta óptima
         comunas_seleccionadas: Lista de comunas seleccionadas para filtrar inventario
+        df_ruta: DataFrame de PQR en orden de visita (ver compute_route)
+        show_densidad: Boolean para mostrar conteos por hexágono con zoom bajo
+    
+    Returns:
+        Tupla (m, info); info tiene los conteos de la capa de inventario para el pie del mapa
     """
+    info = {}
     if df_pqr.empty:
         # Mapa por defecto si no hay datos
         m = folium.Map(location=[2.94, -75.30], zoom_start=12)
         add_legend(m)
-        return m
+        return m, info
     
     # Calcular coordenadas promedio para centrar el mapa
     lat_valid = df_pqr['Latitud'].dropna()
@@ -173,41 +308,28 @@ def create_map(df_pqr, df_inventario, show_inventario, show_ruta_optima, comunas
         tiles='OpenStreetMap'
     )
     
-    # Añadir marcadores de PQR
-    for idx, row in df_pqr.iterrows():
-        lat = row.get('Latitud')
-        lon = row.get('Longitud')
-        
-        # Validar que las coordenadas sean numéricas
-        if pd.isna(lat) or pd.isna(lon) or not isinstance(lat, (int, float)) or not isinstance(lon, (int, float)):
-            continue
-        
-        # Color según Inventariado (verde para SI, rojo para NO)
-        color = COLOR_VERDE if str(row.get('Inventariado', 'NO')).upper() == 'SI' else COLOR_ROJO
-        
-        # Tamaño del marcador según Requiere_acción (reducido para mejor visualización)
-        size = 8 if str(row.get('Requiere_Acción', 'NO')).upper() == 'SI' else 6
-        
-        # Información del popup
-        popup_text = f"""
-        <b>Sticker:</b> {row.get('Sticker', 'N/A')}<br>
-        <b>P.Q.R.S:</b> {row.get('P.Q.R.S', 'N/A')}<br>
-        <b>Comuna:</b> {row.get('Comuna', 'N/A')}<br>
-        <b>Inventariado:</b> {row.get('Inventariado', 'N/A')}<br>
-        <b>Requiere Acción:</b> {row.get('Requiere_Acción', 'N/A')}
-        """
-        
-        folium.CircleMarker(
-            location=[float(lat), float(lon)],
-            radius=size,
-            popup=folium.Popup(popup_text, max_width=300),
-            color='black',
-            weight=1,
-            fill=True,
-            fillColor=color,
-            fillOpacity=0.7,
-            tooltip=f"Sticker: {row.get('Sticker', 'N/A')}"
-        ).add_to(m)
+    # Añadir marcadores de PQR (una sola capa GeoJSON)
+    with timing.span('capa PQR'):
+        capa_pqr = add_point_layer(
+            m,
+            df_pqr,
+            fields=['Sticker', 'P.Q.R.S', 'Comuna', 'Inventariado', 'Requiere_Acción'],
+            base_style={'color': 'black', 'weight': 1, 'fill': True, 'fillOpacity': 0.7},
+            styles={
+                # Color según Inventariado (verde para SI, rojo para NO)
+                'Inventariado': {'SI': {'fillColor': COLOR_VERDE}, '*': {'fillColor': COLOR_ROJO}},
+                # Tamaño del marcador según Requiere_acción
+                'Requiere_Acción': {'SI': {'radius': 8}, '*': {'radius': 6}},
+            },
+            popup=POPUP_PQR,
+            tooltip='Sticker: {Sticker}',
+            control=False
+        )
+    capas_puntos = [capa_pqr]
+    capas_densidad = {
+        'PQR': df_pqr,
+        'Pendientes': df_pqr[df_pqr['Requiere_Acción'].astype(str).str.upper() == 'SI'],
+    }
     
     # Añadir puntos del Inventario forestal si está activado
     if show_inventario and not df_inventario.empty:
@@ -228,47 +350,34 @@ def create_map(df_pqr, df_inventario, show_inventario, show_ruta_optima, comunas
                     df_inventario_filtrado['Sticker'].isin(stickers_comunas)
                 ]
         
-        for idx, row in df_inventario_filtrado.iterrows():
-            lat = row.get('Latitud', None)
-            lon = row.get('Longitud', None)
-            
-            # Validar que las coordenadas sean numéricas
-            if (pd.notna(lat) and pd.notna(lon) and 
-                isinstance(lat, (int, float)) and isinstance(lon, (int, float))):
-                popup_text = f"""
-                <b>Sticker:</b> {row.get('Sticker', 'N/A')}<br>
-                <b>Nombre común:</b> {row.get('Nombre_comun', 'N/A')}<br>
-                <b>Nombre científico:</b> {row.get('NOMBRE CIENTIFICO', 'N/A')}<br>
-                <b>Altura (m):</b> {row.get('HT(m)', 'N/A')}<br>
-                <b>CAP (cm):</b> {row.get('CAP(cm)', 'N/A')}
-                """
-                
-                folium.CircleMarker(
-                    location=[float(lat), float(lon)],
-                    radius=6,
-                    popup=folium.Popup(popup_text, max_width=300),
-                    color='blue',
-                    weight=1,
-                    fill=True,
-                    fillColor='blue',
-                    fillOpacity=0.6,
-                    tooltip=f"Inventario - Sticker: {row.get('Sticker', 'N/A')}"
-                ).add_to(m)
+        # Los árboles con la misma coordenada se dibujan como un solo marcador
+        with timing.span('capa inventario'):
+            capa_inventario = add_point_layer(
+                m,
+                df_inventario_filtrado,
+                fields=['Sticker', 'Nombre_comun', 'NOMBRE CIENTIFICO', 'HT(m)', 'CAP(cm)'],
+                base_style={
+                    'radius': 6,
+                    'color': 'blue',
+                    'weight': 1,
+                    'fill': True,
+                    'fillColor': 'blue',
+                    'fillOpacity': 0.6
+                },
+                popup=POPUP_INVENTARIO,
+                tooltip='Inventario - Sticker: {Sticker}',
+                control=False,
+                colocated='group',
+                group_label='árboles en este punto'
+            )
+        capas_puntos.append(capa_inventario)
+        capas_densidad['Árboles'] = df_inventario_filtrado
+        info = {'inventario_puntos': capa_inventario.n_points, 'inventario_agrupados': capa_inventario.markers_saved}
     
     # Añadir ruta óptima si está activada
-    if show_ruta_optima and not df_pqr.empty:
-        # Ordenar por Comuna y Latitud descendente
-        df_ruta = df_pqr.sort_values(['Comuna', 'Latitud'], ascending=[True, False])
-        
-        # Crear lista de coordenadas para la ruta
-        coordinates = []
-        for idx, row in df_ruta.iterrows():
-            lat = row.get('Latitud')
-            lon = row.get('Longitud')
-            # Validar que las coordenadas sean numéricas
-            if (pd.notna(lat) and pd.notna(lon) and 
-                isinstance(lat, (int, float)) and isinstance(lon, (int, float))):
-                coordinates.append([float(lat), float(lon)])
+    if show_ruta_optima and df_ruta is not None and not df_ruta.empty:
+        # Coordenadas en el orden de visita de la ruta optimizada
+        coordinates = df_ruta[['Latitud', 'Longitud']].astype(float).values.tolist()
         
         # Dibujar línea verde conectando los puntos
         if len(coordinates) > 1:
@@ -298,105 +407,135 @@ def create_map(df_pqr, df_inventario, show_inventario, show_ruta_optima, comunas
                 icon=folium.Icon(color='darkred', icon='stop', prefix='fa')
             ).add_to(m)
     
+    # Conteos por hexágono con zoom bajo; marcadores individuales desde ZOOM_DETALLE
+    if show_densidad:
+        with timing.span('capa densidad'):
+            capa_densidad = add_density_layer(
+                m, capas_densidad, size_m=TAMANO_HEXAGONO_M,
+                popup=POPUP_DENSIDAD, tooltip='{Total} puntos', control=False
+            )
+        ZoomSwitch([capa_densidad], capas_puntos, zoom=ZOOM_DETALLE).add_to(m)
+
     # Agregar leyenda al mapa
     add_legend(m)
     
-    return m
+    return m, info
 
 
-def main():
-    """Función principal de la aplicación"""
-    
-    # Header con título y logo
-    col_header1, col_header2 = st.columns([3, 1])
-    with col_header1:
-        st.title("🌳 Gestión de Podas - ESIP")
-    with col_header2:
-        logo_path = Path("logo_esip_clear.png")
-        if logo_path.exists():
-            st.image(str(logo_path), width=150)
-    
-    st.markdown("---")
-    
-    # Cargar datos
-    df_pqr = load_pqr_data()
-    df_inventario = load_inventario_data()
-    
-    if df_pqr.empty:
-        st.error("No se pudieron cargar los datos de PQR. Verifica que el archivo exista.")
-        return
-    
-    # Sidebar con filtros
-    st.sidebar.header("🔍 Filtros")
-    
-    # Filtro por Comuna (multiselect)
-    comunas_disponibles = sorted(df_pqr['Comuna'].dropna().unique())
-    comunas_seleccionadas = st.sidebar.multiselect(
-        "Comuna",
-        options=comunas_disponibles,
-        default=comunas_disponibles
-    )
+def timed_section(nombre):
+    """
+    Decorador que guarda en st.session_state['tiempos_secciones'] la duración
+    (ms) de la última ejecución de una sección, tanto en un rerun completo como
+    en un rerun solo de su fragmento (ver benchmarks/bench_fragments.py), y la
+    registra como tramo de podas.timing.
     
-    # Filtro por Inventariado
-    inventariado_options = ['Todos', 'SI', 'NO']
-    inventariado_seleccionado = st.sidebar.selectbox(
-        "Inventariado",
-        options=inventariado_options,
-        index=0
-    )
+    Args:
+        nombre: Nombre de la sección
+    """
+    def decorador(func):
+        @functools.wraps(func)
+        def envoltura(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                with timing.fragment('Podas_2025', nombre):
+                    return func(*args, **kwargs)
+            finally:
+                tiempos = st.session_state.setdefault('tiempos_secciones', {})
+                tiempos[nombre] = (time.perf_counter() - t0) * 1000
+        return envoltura
+    return decorador
+
+
+# Secciones de la página. Cada una es un st.fragment: un widget dentro de una
+# sección vuelve a ejecutar solo esa sección, con los argumentos del último
+# rerun completo; los filtros de la barra lateral siguen ejecutando toda la página.
+
+@st.fragment
+@timed_section('Mapa')
+def render_map_section(df_filtered, df_inventario, comunas_seleccionadas, estado_filtros, df_ruta, resumen_ruta):
+    """
+    Mapa interactivo con sus capas y el resumen de la ruta.
+    Las capas de inventario y de hexágonos se eligen dentro de la sección, así
+    que activarlas reconstruye (o toma de la caché) solo el mapa.
     
-    # Filtro por Requiere_acción
-    requiere_accion_options = ['Todos', 'SI', 'NO']
-    requiere_accion_seleccionado = st.sidebar.selectbox(
-        "Requiere Acción",
-        options=requiere_accion_options,
-        index=0
-    )
+    Args:
+        df_filtered: DataFrame con datos de PQR filtrados
+        df_inventario: DataFrame con datos de Inventario forestal
+        comunas_seleccionadas: Lista de comunas seleccionadas
+        estado_filtros: Diccionario con el estado de los filtros de la barra lateral
+        df_ruta: DataFrame de PQR en orden de visita, o None
+        resumen_ruta: Resumen de compute_route, o None
+    """
+    st.subheader("🗺️ Mapa Interactivo")
     
-    # Checkbox para mostrar Inventario Forestal
-    show_inventario = st.sidebar.checkbox(
-        "Mostrar capa Inventario Forestal",
-        value=False
-    )
+    col_capa1, col_capa2 = st.columns(2)
+    with col_capa1:
+        # Checkbox para mostrar Inventario Forestal
+        show_inventario = st.checkbox(
+            "Mostrar capa Inventario Forestal",
+            value=False
+        )
+    with col_capa2:
+        # Checkbox para agregar los puntos en hexágonos a escala ciudad
+        show_densidad = st.checkbox(
+            "Agregar en hexágonos con zoom bajo",
+            value=True,
+            help="A escala ciudad el mapa muestra conteos por hexágono; los puntos aparecen al acercarse"
+        )
     
-    # Checkbox para mostrar ruta óptima
-    show_ruta_optima = st.sidebar.checkbox(
-        "Mostrar ruta óptima",
-        value=False
+    # El mapa solo se construye si esta combinación de filtros y esta versión de
+    # los datos no están en la caché
+    cache_mapas = get_map_cache()
+    clave_mapa = filter_key(**estado_filtros, version=load_data_version(), inventario=show_inventario,
+                            densidad=show_densidad)
+    html_mapa, info_mapa, _ = cache_mapas.get_or_build(
+        clave_mapa,
+        lambda: render_map_html(df_filtered, df_inventario, show_inventario, estado_filtros['ruta'],
+                                comunas_seleccionadas, df_ruta=df_ruta, show_densidad=show_densidad)
     )
     
-    # Aplicar filtros
-    df_filtered = df_pqr.copy()
-    
-    # Filtrar por Comuna
-    if comunas_seleccionadas:
-        df_filtered = df_filtered[df_filtered['Comuna'].isin(comunas_seleccionadas)]
-    
-    # Filtrar por Inventariado
-    if inventariado_seleccionado != 'Todos':
-        df_filtered = df_filtered[
-            df_filtered['Inventariado'].astype(str).str.upper() == inventariado_seleccionado
-        ]
-    
-    # Filtrar por Requiere_acción
-    if requiere_accion_seleccionado != 'Todos':
-        df_filtered = df_filtered[
-            df_filtered['Requiere_Acción'].astype(str).str.upper() == requiere_accion_seleccionado
-        ]
-    
-    # Crear mapa
-    st.subheader("🗺️ Mapa Interactivo")
-    m = create_map(df_filtered, df_inventario, show_inventario, show_ruta_optima, comunas_seleccionadas)
-    
     # Mostrar mapa
-    map_data = st_folium(m, width=1200, height=500)
+    components.html(html_mapa, height=500)
+    if info_mapa.get('inventario_agrupados'):
+        st.caption(
+            f"🌳 {info_mapa['inventario_puntos']:,} árboles del inventario en "
+            f"{info_mapa['inventario_puntos'] - info_mapa['inventario_agrupados']:,} marcadores "
+            f"({info_mapa['inventario_agrupados']:,} árboles en coordenadas repetidas agrupados)"
+        )
+    # Aciertos y tamaño de la caché solo con el panel de depuración (?debug=1 o PODAS_TIMING_PANEL)
+    if timing.panel_requested():
+        estadisticas = cache_mapas.stats()
+        st.caption(
+            f"Caché de mapas: {estadisticas['hits']} aciertos, {estadisticas['misses']} fallos, "
+            f"{estadisticas['entries']} mapas ({estadisticas['bytes'] / 1e6:.1f} MB)"
+        )
+
+    # Longitud de la ruta optimizada frente al orden anterior (Comuna, Latitud)
+    if resumen_ruta is not None:
+        col_ruta1, col_ruta2, col_ruta3 = st.columns(3)
+        with col_ruta1:
+            st.metric("Ruta optimizada", f"{resumen_ruta['km_ruta']:.1f} km")
+        with col_ruta2:
+            st.metric("Orden por Comuna y Latitud", f"{resumen_ruta['km_orden_actual']:.1f} km")
+        with col_ruta3:
+            st.metric("Ahorro", f"{resumen_ruta['ahorro_pct']:.1f} %")
+
+
+@st.fragment
+@timed_section('Métricas')
+def render_metrics_section(filtros):
+    """
+    Métricas de conteo por comuna.
     
+    Args:
+        filtros: Filtros de la barra lateral ({columna: valores}, ver get_pqr_counts_cube)
+    """
     # Métricas de conteo por comuna
     st.markdown("---")
     st.subheader("📊 Métricas por Comuna")
     
     # Obtener conteo por comuna
-    conteo_por_comuna = df_filtered.groupby('Comuna').size().sort_values(ascending=False)
+    conteo_por_comuna = get_pqr_counts_cube().counts('Comuna', filtros).sort_values(ascending=False)
     
     # Crear columnas para mostrar métricas (máximo 4 columnas)
     num_columnas = min(4, len(conteo_por_comuna))
@@ -407,7 +546,18 @@ def main():
             comuna_label = comuna.split()[-1] if ' ' in str(comuna) and comuna.split()[-1].isdigit() else str(comuna)
             with cols_metricas[idx % num_columnas]:
                 st.metric(label=f"{comuna}", value=int(conteo))
+
+
+@st.fragment
+@timed_section('Gráficos')
+def render_charts_section(filtros):
+    """
+    Gráficos de Inventariado y Requiere Acción, y barras apiladas por comuna.
     
+    Args:
+        filtros: Filtros de la barra lateral ({columna: valores}, ver get_pqr_counts_cube)
+    """
+    cubo = get_pqr_counts_cube()
     # Estadísticas y gráficos
     st.markdown("---")
     st.subheader("📊 Estadísticas")
@@ -417,163 +567,44 @@ def main():
     # Gráfico de barras: Conteo de Inventariado
     with col1:
         st.markdown("**Conteo por Inventariado**")
-        inventariado_counts = df_filtered['Inventariado'].value_counts()
-        
-        # Crear gráfico con colores personalizados y estilo moderno
-        fig, ax = plt.subplots(figsize=(6, 4))
-        fig.patch.set_facecolor('#0E1117')
-        ax.set_facecolor('#0E1117')
-        
-        colors = []
-        labels = []
-        values = []
-        
-        for idx, (label, value) in enumerate(inventariado_counts.items()):
-            labels.append(str(label))
-            values.append(value)
-            if str(label).upper() == 'SI':
-                colors.append(COLOR_VERDE)
-            elif str(label).upper() == 'NO':
-                colors.append(COLOR_ROJO)
-            else:
-                colors.append('#808080')
-        
-        bars = ax.bar(labels, values, color=colors, alpha=0.8, edgecolor='white', linewidth=1.5)
-        
-        # Estilizar ejes
-        ax.set_ylabel('Conteo', color='white', fontsize=11)
-        ax.set_xlabel('Inventariado', color='white', fontsize=11)
-        ax.tick_params(colors='white', labelsize=10)
-        ax.spines['bottom'].set_color('white')
-        ax.spines['top'].set_color('#0E1117')
-        ax.spines['right'].set_color('#0E1117')
-        ax.spines['left'].set_color('white')
-        ax.grid(axis='y', alpha=0.3, color='white', linestyle='--')
-        
-        plt.tight_layout()
-        st.pyplot(fig, facecolor='#0E1117')
-        plt.close(fig)
+        inventariado_counts = cubo.counts('Inventariado', filtros).sort_values(ascending=False)
+        st.image(render_bar_chart(tuple(inventariado_counts.index), tuple(inventariado_counts.tolist()), 'Inventariado'),
+                 output_format='PNG', use_container_width=True)
     
     # Gráfico de barras: Conteo de Requiere_acción
     with col2:
         st.markdown("**Conteo por Requiere Acción**")
-        requiere_accion_counts = df_filtered['Requiere_Acción'].value_counts()
-        
-        # Crear gráfico con colores personalizados y estilo moderno
-        fig, ax = plt.subplots(figsize=(6, 4))
-        fig.patch.set_facecolor('#0E1117')
-        ax.set_facecolor('#0E1117')
-        
-        colors = []
-        labels = []
-        values = []
-        
-        for idx, (label, value) in enumerate(requiere_accion_counts.items()):
-            labels.append(str(label))
-            values.append(value)
-            if str(label).upper() == 'SI':
-                colors.append(COLOR_VERDE)
-            elif str(label).upper() == 'NO':
-                colors.append(COLOR_ROJO)
-            else:
-                colors.append('#808080')
-        
-        bars = ax.bar(labels, values, color=colors, alpha=0.8, edgecolor='white', linewidth=1.5)
-        
-        # Estilizar ejes
-        ax.set_ylabel('Conteo', color='white', fontsize=11)
-        ax.set_xlabel('Requiere Acción', color='white', fontsize=11)
-        ax.tick_params(colors='white', labelsize=10)
-        ax.spines['bottom'].set_color('white')
-        ax.spines['top'].set_color('#0E1117')
-        ax.spines['right'].set_color('#0E1117')
-        ax.spines['left'].set_color('white')
-        ax.grid(axis='y', alpha=0.3, color='white', linestyle='--')
-        
-        plt.tight_layout()
-        st.pyplot(fig, facecolor='#0E1117')
-        plt.close(fig)
+        requiere_accion_counts = cubo.counts('Requiere_Acción', filtros).sort_values(ascending=False)
+        st.image(render_bar_chart(tuple(requiere_accion_counts.index), tuple(requiere_accion_counts.tolist()),
+                                  'Requiere Acción'),
+                 output_format='PNG', use_container_width=True)
     
     # Gráfico de conteo por comuna e inventariado
     st.markdown("---")
     st.subheader("📊 Conteo de Inventariado por Comuna")
     
     # Crear tabla cruzada de Comuna vs Inventariado
-    if not df_filtered.empty and 'Comuna' in df_filtered.columns and 'Inventariado' in df_filtered.columns:
-        conteo_comuna_inventariado = pd.crosstab(df_filtered['Comuna'], df_filtered['Inventariado'])
-        
-        # Asegurar que existan las columnas SI y NO, rellenar con 0 si no existen
-        if 'SI' not in conteo_comuna_inventariado.columns:
-            conteo_comuna_inventariado['SI'] = 0
-        if 'NO' not in conteo_comuna_inventariado.columns:
-            conteo_comuna_inventariado['NO'] = 0
-        
-        # Ordenar columnas: SI primero (se dibuja abajo) y NO después (arriba)
-        column_order = []
-        if 'SI' in conteo_comuna_inventariado.columns:
-            column_order.append('SI')
-        if 'NO' in conteo_comuna_inventariado.columns:
-            column_order.append('NO')
-        
-        # Agregar cualquier otra columna que pueda existir
-        for col in conteo_comuna_inventariado.columns:
-            if col not in column_order:
-                column_order.append(col)
-        
-        conteo_comuna_inventariado = conteo_comuna_inventariado[column_order]
-        
-        # Crear gráfico de barras apiladas con colores personalizados y estilo moderno
-        fig, ax = plt.subplots(figsize=(12, 6))
-        fig.patch.set_facecolor('#0E1117')
-        ax.set_facecolor('#0E1117')
+    if cubo.total(filtros) > 0 and 'Comuna' in cubo and 'Inventariado' in cubo:
+        conteo_comuna_inventariado = cubo.crosstab('Comuna', 'Inventariado', filtros)
         
-        # Obtener los índices (comunas) ordenadas
-        comunas = conteo_comuna_inventariado.index.tolist()
-        x_pos = range(len(comunas))
+        # Ordenar columnas: SI primero (se dibuja abajo), NO después (arriba) y luego cualquier otra
+        column_order = ['SI', 'NO'] + [col for col in conteo_comuna_inventariado.columns if col not in ('SI', 'NO')]
+        conteo_comuna_inventariado = conteo_comuna_inventariado.reindex(columns=column_order, fill_value=0)
         
-        # Dibujar barras apiladas (SI primero abajo, NO arriba)
-        bottom = None
-        for col in column_order:
-            values = conteo_comuna_inventariado[col].values
-            if col.upper() == 'SI':
-                color = COLOR_VERDE
-                label = 'SI'
-            elif col.upper() == 'NO':
-                color = COLOR_ROJO
-                label = 'NO'
-            else:
-                color = '#808080'
-                label = col
-            
-            ax.bar(x_pos, values, bottom=bottom, color=color, label=label, 
-                   alpha=0.8, edgecolor='white', linewidth=1.5)
-            if bottom is None:
-                bottom = values
-            else:
-                bottom = bottom + values
-        
-        # Estilizar ejes
-        ax.set_xlabel('Comuna', color='white', fontsize=12)
-        ax.set_ylabel('Conteo', color='white', fontsize=12)
-        ax.set_title('Conteo de Inventariado por Comuna', color='white', fontsize=14, fontweight='bold', pad=20)
-        ax.set_xticks(x_pos)
-        ax.set_xticklabels(comunas, rotation=45, ha='right', color='white', fontsize=10)
-        ax.tick_params(colors='white', labelsize=10)
-        ax.spines['bottom'].set_color('white')
-        ax.spines['top'].set_color('#0E1117')
-        ax.spines['right'].set_color('#0E1117')
-        ax.spines['left'].set_color('white')
-        ax.grid(axis='y', alpha=0.3, color='white', linestyle='--')
-        
-        # Estilizar leyenda
-        legend = ax.legend(title='Inventariado', title_fontsize=11, fontsize=10,
-                          facecolor='#0E1117', edgecolor='white', labelcolor='white')
-        legend.get_title().set_color('white')
-        
-        plt.tight_layout()
-        st.pyplot(fig, facecolor='#0E1117')
-        plt.close(fig)
+        stacks = tuple((col, tuple(conteo_comuna_inventariado[col].tolist())) for col in column_order)
+        st.image(render_stacked_chart(tuple(conteo_comuna_inventariado.index), stacks),
+                 output_format='PNG', use_container_width=True)
+
+
+@st.fragment
+@timed_section('Tabla')
+def render_table_section(df_filtered):
+    """
+    Tabla de los PQR filtrados.
     
+    Args:
+        df_filtered: DataFrame con datos de PQR filtrados
+    """
     # Tabla final
     st.markdown("---")
     st.subheader("📋 Tabla de Datos")
@@ -589,28 +620,166 @@ def main():
     df_tabla = df_filtered[columnas_disponibles].copy()
     
     st.dataframe(df_tabla, use_container_width=True)
+
+
+@st.fragment
+@timed_section('Exportar')
+def render_export_section(df_filtered, df_ruta):
+    """
+    Descarga de la ruta óptima y programación de cuadrillas.
+    Cambiar cuadrillas, paradas o km vuelve a ejecutar solo esta sección.
     
+    Args:
+        df_filtered: DataFrame con datos de PQR filtrados
+        df_ruta: DataFrame de PQR en orden de visita, o None
+    """
     # Botón de descarga CSV de la ruta óptima
     st.markdown("---")
     st.subheader("💾 Exportar Datos")
     
-    if show_ruta_optima and not df_filtered.empty:
-        # Ordenar por Comuna y Latitud descendente (igual que en la ruta)
-        df_ruta_optima = df_filtered.sort_values(['Comuna', 'Latitud'], ascending=[True, False])
-        
-        # Preparar CSV para descarga
-        csv_ruta = df_ruta_optima.to_csv(index=False)
+    if df_ruta is not None and not df_ruta.empty:
+        # Mismo orden de visita que la ruta dibujada en el mapa
+        csv_ruta = df_ruta.to_csv(index=False)
         
         st.download_button(
             label="📥 Descargar CSV de Ruta Óptima",
             data=csv_ruta,
             file_name="ruta_optima.csv",
             mime="text/csv",
-            help="Descarga la ruta óptima ordenada por Comuna y Latitud descendente"
+            help="Descarga los PQR en el orden de visita de la ruta optimizada"
         )
     else:
         st.info("💡 Activa 'Mostrar ruta óptima' para habilitar la descarga de la ruta óptima.")
     
+    # Órdenes de trabajo por cuadrilla y día (PQR con Requiere Acción = SI)
+    st.markdown("---")
+    st.subheader("🚚 Programación de Cuadrillas")
+    
+    col_prog1, col_prog2, col_prog3 = st.columns(3)
+    with col_prog1:
+        num_cuadrillas = st.number_input("Cuadrillas", min_value=1, max_value=50, value=3)
+    with col_prog2:
+        paradas_dia = st.number_input("Paradas por cuadrilla y día", min_value=1, max_value=200, value=25)
+    with col_prog3:
+        km_dia = st.number_input("Km máximos por cuadrilla y día (0 = sin límite)",
+                                 min_value=0.0, max_value=500.0, value=0.0, step=5.0)
+    
+    plan, resumen_plan, zip_ordenes = compute_schedule(
+        df_filtered, int(num_cuadrillas), int(paradas_dia), km_dia or None
+    )
+    if plan.empty:
+        st.info("💡 No hay PQR pendientes con Requiere Acción = SI en los filtros seleccionados.")
+    else:
+        col_res1, col_res2, col_res3 = st.columns(3)
+        with col_res1:
+            st.metric("PQR programados", len(plan))
+        with col_res2:
+            st.metric("Días de trabajo", int(resumen_plan['Dia'].max()))
+        with col_res3:
+            st.metric("Recorrido total", f"{resumen_plan['Km'].sum():.1f} km")
+        
+        st.dataframe(resumen_plan, use_container_width=True, hide_index=True)
+        st.download_button(
+            label="📥 Descargar órdenes de trabajo (ZIP)",
+            data=zip_ordenes,
+            file_name="ordenes_cuadrillas.zip",
+            mime="application/zip",
+            help="Un CSV y un GeoJSON por cuadrilla y día, más el resumen de distancias"
+        )
+
+
+
+def main():
+    """Función principal de la aplicación"""
+    
+    # Header con título y logo
+    col_header1, col_header2 = st.columns([3, 1])
+    with col_header1:
+        st.title("🌳 Gestión de Podas - ESIP")
+    with col_header2:
+        logo_path = Path("logo_esip_clear.png")
+        if logo_path.exists():
+            st.image(str(logo_path), width=150)
+    
+    st.markdown("---")
+    
+    # Cargar datos
+    df_pqr, rechazos_pqr = load_pqr_data()
+    df_inventario, rechazos_inventario = load_inventario_data()
+    filtros_pqr = get_pqr_filter_index()
+    
+    if df_pqr.empty:
+        st.error("No se pudieron cargar los datos de PQR. Verifica que el archivo exista.")
+        return
+    
+    # Filas sin coordenadas válidas: no aparecen en el mapa ni en la ruta óptima
+    for nombre, rechazos in (('PQR', rechazos_pqr), ('árboles del inventario', rechazos_inventario)):
+        if rechazos is not None and rechazos.sum():
+            detalle = ", ".join(f"{n:,} {ETIQUETAS_RECHAZO[m]}" for m, n in rechazos.items() if n)
+            st.caption(f"📍 {rechazos.sum():,} {nombre} sin coordenadas válidas ({detalle})")
+    
+    # Sidebar con filtros
+    st.sidebar.header("🔍 Filtros")
+    
+    # Filtro por Comuna (multiselect)
+    comunas_disponibles = filtros_pqr.values('Comuna')
+    comunas_seleccionadas = st.sidebar.multiselect(
+        "Comuna",
+        options=comunas_disponibles,
+        default=comunas_disponibles
+    )
+    
+    # Filtro por Inventariado
+    inventariado_options = ['Todos', 'SI', 'NO']
+    inventariado_seleccionado = st.sidebar.selectbox(
+        "Inventariado",
+        options=inventariado_options,
+        index=0
+    )
+    
+    # Filtro por Requiere_acción
+    requiere_accion_options = ['Todos', 'SI', 'NO']
+    requiere_accion_seleccionado = st.sidebar.selectbox(
+        "Requiere Acción",
+        options=requiere_accion_options,
+        index=0
+    )
+    
+    # Checkbox para mostrar ruta óptima (afecta al mapa y a la exportación)
+    show_ruta_optima = st.sidebar.checkbox(
+        "Mostrar ruta óptima",
+        value=False
+    )
+    
+    # Aplicar filtros (máscaras sobre códigos precalculados, sin copias ni operaciones de texto)
+    filtros = {
+        'Comuna': comunas_seleccionadas,
+        'Inventariado': None if inventariado_seleccionado == 'Todos' else inventariado_seleccionado,
+        'Requiere_Acción': None if requiere_accion_seleccionado == 'Todos' else requiere_accion_seleccionado,
+    }
+    with timing.span('filtros'):
+        df_filtered = filtros_pqr.apply(df_pqr, filtros)
+    
+    df_ruta, resumen_ruta = None, None
+    if show_ruta_optima and not df_filtered.empty:
+        df_ruta, resumen_ruta = compute_route(df_filtered)
+    
+    estado_filtros = {
+        # Selección real (filter_key la compara como conjunto): sin comunas el mapa
+        # muestra todo el inventario y con todas solo los árboles con PQR
+        'comunas': comunas_seleccionadas,
+        'inventariado': inventariado_seleccionado,
+        'requiere_accion': requiere_accion_seleccionado,
+        'ruta': show_ruta_optima,
+    }
+    
+    render_map_section(df_filtered, df_inventario, comunas_seleccionadas, estado_filtros, df_ruta, resumen_ruta)
+    # Métricas y gráficos desde el cubo de conteos, con los mismos filtros
+    render_metrics_section(filtros)
+    render_charts_section(filtros)
+    render_table_section(df_filtered)
+    render_export_section(df_filtered, df_ruta)
+    
     # Créditos al final
     st.markdown("---")
     st.markdown(
@@ -622,5 +791,7 @@ def main():
 
 
 if __name__ == "__main__":
+    timing.start_page('Podas_2025')
     main()
+    timing.render_panel(timing.finish())
 
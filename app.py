@@ -1,10 +1,10 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
 from datetime import datetime
 import warnings
+from podas import timing
+from indicadores.cleaning import clean_month_block
+from indicadores.figures import indicator_grid, indicator_matrix
 warnings.filterwarnings('ignore')
 
 # Configuración de la página (DEBE SER LA PRIMERA LÍNEA DE STREAMLIT)
@@ -15,37 +15,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Función para limpiar datos numéricos
-def limpiar_numeros(valor):
-    if pd.isna(valor) or valor == '':
-        return np.nan
-    if isinstance(valor, str):
-        valor = valor.replace(',', '').replace('$', '').replace(' ', '')
-        if '(' in valor and ')' in valor:
-            valor = valor.split('(')[0]
-        try:
-            return float(valor)
-        except:
-            return np.nan
-    return float(valor)
-
-# Función para limpiar porcentajes
-def limpiar_porcentajes(valor):
-    if pd.isna(valor) or valor == '':
-        return np.nan
-    if isinstance(valor, str):
-        valor = valor.replace('%', '').replace(',', '')
-        try:
-            return float(valor)
-        except:
-            return np.nan
-    return float(valor)
-
-# Función para abreviar nombres largos
-def abreviar(texto, max_len=40):
-    return texto if len(texto) <= max_len else texto[:37] + "..."
-
 # Cargar y procesar datos
+@timing.timed('cargar_y_procesar_datos')
 @st.cache_data
 def cargar_y_procesar_datos():
     """Cargar y procesar todos los datos unificados"""
@@ -63,10 +34,10 @@ def cargar_y_procesar_datos():
             df_num = pd.read_csv("Númericos.csv")
         except FileNotFoundError:
             # No mostrar error aquí, lo manejaremos en main()
-            return None, None
+            return None, None, None
     except Exception as e:
         st.error(f"Error al leer el archivo numérico: {str(e)}")
-        return None, None
+        return None, None, None
     
     # Cargar datos porcentuales
     df_porc = None
@@ -74,31 +45,27 @@ def cargar_y_procesar_datos():
         df_porc = pd.read_csv("porcentaje.csv")
     except FileNotFoundError:
         # No mostrar error aquí, lo manejaremos en main()
-        return None, None
+        return None, None, None
     except Exception as e:
         st.error(f"Error al leer el archivo porcentual: {str(e)}")
-        return None, None
+        return None, None, None
     
     # Validar que ambos DataFrames se cargaron correctamente
     if df_num is None or df_porc is None:
-        return None, None
+        return None, None, None
     
     # Validar columnas requeridas
     required_cols = ['Área', 'Indicador']
     for col in required_cols:
         if col not in df_num.columns or col not in df_porc.columns:
             st.error(f"Error: Falta la columna '{col}' en uno de los archivos CSV.")
-            return None, None
-    
-    # Limpiar datos numéricos
-    for mes in month_order:
-        if mes in df_num.columns:
-            df_num[mes] = df_num[mes].apply(limpiar_numeros)
+            return None, None, None
     
-    # Limpiar datos porcentuales
-    for mes in month_order:
-        if mes in df_porc.columns:
-            df_porc[mes] = df_porc[mes].apply(limpiar_porcentajes)
+    # Limpiar el bloque de meses de cada archivo en una sola pasada
+    rechazos_num = clean_month_block(df_num, month_order, kind='numero')
+    rechazos_porc = clean_month_block(df_porc, month_order, kind='porcentaje')
+    rechazados = pd.concat([rechazos_num.assign(Archivo='numérico'), rechazos_porc.assign(Archivo='porcentual')],
+                           ignore_index=True)
     
     # Añadir columna Tipo
     df_num['Tipo'] = 'Numérico'
@@ -109,135 +76,31 @@ def cargar_y_procesar_datos():
         df = pd.concat([df_num, df_porc], ignore_index=True)
     except Exception as e:
         st.error(f"Error al combinar los datos: {str(e)}")
-        return None, None
+        return None, None, None
     
-    return df, month_order
+    return df, month_order, rechazados
 
-def crear_grafico_tendencias_numericas(df_melted, area, indicadores):
-    """Crear gráfico de tendencias para indicadores numéricos"""
-    if len(df_melted) == 0:
+@timing.timed('crear_grafico_tendencias_numericas')
+def crear_grafico_tendencias_numericas(df_numericos, area, month_order):
+    """Crear pequeños múltiplos de tendencia (un panel por indicador numérico)"""
+    if len(df_numericos) == 0:
         return None
     
-    # Crear gráfico con tooltips personalizados
-    fig = go.Figure()
-    
-    # Colores para diferentes indicadores
-    colores = px.colors.qualitative.Set3
-    
-    for i, indicador in enumerate(indicadores):
-        df_ind = df_melted[df_melted['Indicador'] == indicador].dropna(subset=['Valor'])
-        
-        if len(df_ind) > 0:
-            fig.add_trace(go.Scatter(
-                x=df_ind['Mes'],
-                y=df_ind['Valor'],
-                mode='lines+markers',
-                name=abreviar(indicador),
-                line=dict(width=3, color=colores[i % len(colores)]),
-                marker=dict(size=8),
-                hovertemplate=f'<b>{indicador}</b><br>' +
-                             'Mes: %{x}<br>' +
-                             'Valor: %{y:,.0f}' + ('<br><extra></extra>' if df_ind['Valor'].iloc[0] == int(df_ind['Valor'].iloc[0]) else '<br><extra></extra>')
-            ))
-    
-    # Configurar layout
-    fig.update_layout(
-        title=f"Tendencia: {', '.join([abreviar(i) for i in indicadores])} - {area}",
-        height=500,
-        showlegend=True,
-        legend=dict(
-            orientation="v",
-            yanchor="top",
-            y=1,
-            xanchor="left",
-            x=1.01
-        ),
-        xaxis=dict(
-            categoryorder='array',
-            categoryarray=['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 
-                          'Julio', 'Agosto', 'Septiembre']
-        )
-    )
-    
-    # Escala logarítmica si es necesario
-    valores = df_melted['Valor'].dropna()
-    if len(valores) > 0 and valores.max() / valores.min() > 100:
-        fig.update_layout(yaxis_type="log")
-    
-    return fig
+    # Una matriz indicador × mes para todos los paneles; cada panel tiene su escala Y
+    valores, nombres = indicator_matrix(df_numericos, month_order)
+    return indicator_grid(valores, nombres, month_order, tipo='linea',
+                          titulo=f"Tendencia de indicadores numéricos - {area}", formato='%{y:,.0f}')
 
-def crear_grafico_porcentuales(df_melted, area, indicadores):
-    """Crear gráfico para indicadores porcentuales"""
-    if len(df_melted) == 0:
+@timing.timed('crear_grafico_porcentuales')
+def crear_grafico_porcentuales(df_porcentajes, area, month_order):
+    """Crear pequeños múltiplos de indicadores porcentuales"""
+    if len(df_porcentajes) == 0:
         return None
     
-    # Crear gráfico con tooltips personalizados
-    fig = go.Figure()
-    
-    # Colores para diferentes indicadores
-    colores = px.colors.qualitative.Set2
-    
-    # Si hay 3 o menos indicadores, usar barras agrupadas
-    if len(indicadores) <= 3:
-        for i, indicador in enumerate(indicadores):
-            df_ind = df_melted[df_melted['Indicador'] == indicador].dropna(subset=['Valor'])
-            
-            if len(df_ind) > 0:
-                fig.add_trace(go.Bar(
-                    x=df_ind['Mes'],
-                    y=df_ind['Valor'],
-                    name=abreviar(indicador),
-                    marker_color=colores[i % len(colores)],
-                    text=[f"{val:.0f}%" if val == int(val) else f"{val:.1f}%" for val in df_ind['Valor']],
-                    textposition='outside',
-                    hovertemplate=f'<b>{indicador}</b><br>' +
-                                 'Mes: %{x}<br>' +
-                                 'Valor: %{y:.1f}%<br>' +
-                                 '<extra></extra>'
-                ))
-        
-        fig.update_layout(barmode='group')
-        
-    else:
-        # Si hay más de 3 indicadores, usar líneas
-        for i, indicador in enumerate(indicadores):
-            df_ind = df_melted[df_melted['Indicador'] == indicador].dropna(subset=['Valor'])
-            
-            if len(df_ind) > 0:
-                fig.add_trace(go.Scatter(
-                    x=df_ind['Mes'],
-                    y=df_ind['Valor'],
-                    mode='lines+markers',
-                    name=abreviar(indicador),
-                    line=dict(width=3, color=colores[i % len(colores)]),
-                    marker=dict(size=8),
-                    hovertemplate=f'<b>{indicador}</b><br>' +
-                                 'Mes: %{x}<br>' +
-                                 'Valor: %{y:.1f}%<br>' +
-                                 '<extra></extra>'
-                ))
-    
-    # Configurar layout
-    fig.update_layout(
-        title=f"Indicadores Porcentuales: {', '.join([abreviar(i) for i in indicadores])} - {area}",
-        height=500,
-        showlegend=True,
-        legend=dict(
-            orientation="v",
-            yanchor="top",
-            y=1,
-            xanchor="left",
-            x=1.01
-        ),
-        xaxis=dict(
-            categoryorder='array',
-            categoryarray=['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 
-                          'Julio', 'Agosto', 'Septiembre']
-        ),
-        yaxis=dict(range=[0, 120])  # Escala Y: 0% a 120%
-    )
-    
-    return fig
+    valores, nombres = indicator_matrix(df_porcentajes, month_order)
+    # Con 3 o menos indicadores, barras; con más, líneas. Escala Y: 0% a 120%
+    return indicator_grid(valores, nombres, month_order, tipo='barra' if len(nombres) <= 3 else 'linea',
+                          titulo=f"Indicadores porcentuales - {area}", formato='%{y:.1f}%', rango_y=[0, 120])
 
 def crear_resumen_ejecutivo(indicadores, area, df, df_filtered, month_order):
     """Crear resumen ejecutivo con KPIs principales"""
@@ -278,7 +141,7 @@ def main():
     st.markdown("---")
     
     # Cargar datos
-    df, month_order = cargar_y_procesar_datos()
+    df, month_order, rechazados = cargar_y_procesar_datos()
     
     if df is None or month_order is None:
         st.error("❌ Error al cargar los datos. Verifica que los archivos CSV estén en la carpeta.")
@@ -296,6 +159,11 @@ def main():
         st.error("❌ Error: El archivo CSV no contiene la columna 'Área'.")
         return
     
+    # Celdas que no se pudieron convertir a número (quedan vacías en los gráficos)
+    if len(rechazados):
+        with st.sidebar.expander(f"⚠️ {len(rechazados)} celdas no numéricas"):
+            st.dataframe(rechazados, use_container_width=True, hide_index=True)
+    
     # Sidebar para filtros
     st.sidebar.header("🔍 Filtros")
     
@@ -374,24 +242,10 @@ def main():
         df_numericos = df_filtered[df_filtered['Tipo'] == 'Numérico']
         
         if len(df_numericos) > 0:
-            # Convertir a formato largo para gráfico
-            df_melted = pd.melt(
-                df_numericos, 
-                id_vars=['Indicador', 'Área', 'Tipo'], 
-                value_vars=month_order,
-                var_name='Mes', 
-                value_name='Valor'
-            )
-            
-            # Convertir meses a orden cronológico usando pd.Categorical
-            df_melted['Mes'] = pd.Categorical(df_melted['Mes'], categories=month_order, ordered=True)
-            df_melted = df_melted.sort_values(['Indicador', 'Mes'])
-            
-            indicadores_numericos = df_numericos['Indicador'].unique()
-            
-            fig_numericos = crear_grafico_tendencias_numericas(df_melted, area, indicadores_numericos)
+            fig_numericos = crear_grafico_tendencias_numericas(df_numericos, area, month_order)
             if fig_numericos:
-                st.plotly_chart(fig_numericos, use_container_width=True)
+                with timing.span('plotly_chart numéricos'):
+                    st.plotly_chart(fig_numericos, use_container_width=True)
         else:
             st.info("No hay indicadores numéricos disponibles para los filtros seleccionados.")
     
@@ -401,24 +255,10 @@ def main():
         df_porcentajes = df_filtered[df_filtered['Tipo'] == 'Porcentual']
         
         if len(df_porcentajes) > 0:
-            # Convertir a formato largo para gráfico
-            df_melted = pd.melt(
-                df_porcentajes, 
-                id_vars=['Indicador', 'Área', 'Tipo'], 
-                value_vars=month_order,
-                var_name='Mes', 
-                value_name='Valor'
-            )
-            
-            # Convertir meses a orden cronológico usando pd.Categorical
-            df_melted['Mes'] = pd.Categorical(df_melted['Mes'], categories=month_order, ordered=True)
-            df_melted = df_melted.sort_values(['Indicador', 'Mes'])
-            
-            indicadores_porcentuales = df_porcentajes['Indicador'].unique()
-            
-            fig_porcentajes = crear_grafico_porcentuales(df_melted, area, indicadores_porcentuales)
+            fig_porcentajes = crear_grafico_porcentuales(df_porcentajes, area, month_order)
             if fig_porcentajes:
-                st.plotly_chart(fig_porcentajes, use_container_width=True)
+                with timing.span('plotly_chart porcentuales'):
+                    st.plotly_chart(fig_porcentajes, use_container_width=True)
         else:
             st.info("No hay indicadores porcentuales disponibles para los filtros seleccionados.")
     
@@ -499,4 +339,6 @@ def main():
     )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    timing.start_page('indicadores')
+    main()
+    timing.render_panel(timing.finish())
\ No newline at end of file
@@ -1,9 +1,16 @@
 import streamlit as st
-import pandas as pd
 import folium
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
+import pandas as pd
 import plotly.graph_objects as go
-import os
+
+from podas.cube import CountsCube
+from podas.datasets import IncrementalPqrData
+from podas.filters import FilterIndex
+from podas.map_cache import MapHtmlCache, filter_key
+from podas.map_layers import ZoomSwitch, add_density_layer, add_point_layer
+from podas.schema import memory_report
+from podas import timing
 
 # --- CONFIG ---
 st.set_page_config(
@@ -13,6 +20,37 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Radio de los hexágonos de densidad (m) y zoom desde el que se ven los puntos
+TAMANO_HEXAGONO_M = 250
+ZOOM_DETALLE = 15
+
+# Plantillas de popup del mapa ({campo} se reemplaza por el valor de la fila)
+POPUP_PQR = """
+<div style="font-family: Arial; font-size: 12px; width: 240px;">
+    <b>ID Luminaria:</b> {ID_Luminaria}<br>
+    <b>Sticker:</b> {Sticker}<br>
+    <b>PQR:</b> {PQR_corto}...<br>
+    <b>Comuna:</b> {Comuna}<br>
+    <b>Inventariado:</b> {Inventariado_txt}<br>
+</div>
+"""
+POPUP_DENSIDAD = """
+<div style="font-family: Arial; font-size: 12px; width: 200px;">
+    <b>PQR pendientes:</b> {Pendientes}<br>
+    <b>Podas ejecutadas:</b> {Ejecutadas}<br>
+    <b>Árboles CAM:</b> {Árboles}<br>
+</div>
+"""
+POPUP_CAM = """
+<div style="font-family: Arial; font-size: 12px; width: 240px;">
+    <b>ID Luminaria:</b> {ID_Luminaria}<br>
+    <b>Sticker:</b> {Sticker}<br>
+    <b>Nombre común:</b> {Nombre_popup}<br>
+</div>
+"""
+
+timing.start_page('app_v2')
+
 # Logo y título
 col1, col2, col3 = st.columns([1, 3, 1])
 with col2:
@@ -26,289 +64,212 @@ st.markdown("**Tablero de planeación y control de podas cruzado por ID de lumin
 st.markdown("---")
 
 # --- CARGA DE DATOS ---
-@st.cache_data
-def load_data():
-    """Cargar datos base y enriquecerlos usando ID_Luminaria"""
-
-    cam_layer = pd.DataFrame()
-
-    # 1. Datos base: PQR pendientes
-    df = pd.read_csv("data/pqr_pendientes_georreferenciadas.csv", encoding="utf-8")
-    df.columns = df.columns.str.strip()
-
-    # Normalizar columnas clave
-    if "Latitud" not in df.columns and "Lat" in df.columns:
-        df = df.rename(columns={"Lat": "Latitud"})
-    if "Longitud" not in df.columns and "Long" in df.columns:
-        df = df.rename(columns={"Long": "Longitud"})
-    if "inventariado" in df.columns:
-        df = df.rename(columns={"inventariado": "Inventariado"})
-
-    # Asegurar columna ID_Luminaria
-    if "ID_Luminaria" not in df.columns:
-        df["ID_Luminaria"] = None
-
-    # Inicializar columnas usadas en la app
-    df["Ejecutada"] = "NO"
-    df["Permiso_CAM"] = "NO"
-    df["NOMBRE COMÚN"] = None
-
-    # 2. Podas ejecutadas (marca por sticker)
-    if os.path.exists("data/podas_ejecutadas.csv"):
-        try:
-            ejecutadas = pd.read_csv("data/podas_ejecutadas.csv", encoding="utf-8")
-            ejecutadas.columns = ejecutadas.columns.str.strip()
-
-            sticker_col = "Sticker" if "Sticker" in ejecutadas.columns else "Stiker"
-            obs_col = "Observación" if "Observación" in ejecutadas.columns else ejecutadas.columns[1]
-
-            ejecutadas_filtradas = ejecutadas[
-                ejecutadas[obs_col].astype(str).str.contains("YA EJECUTADA", case=False, na=False)
-            ]
-
-            df["Sticker_tmp"] = df["Sticker"].astype(str).str.strip()
-            ejecutadas_filtradas["Sticker_tmp"] = ejecutadas_filtradas[sticker_col].astype(str).str.strip()
-
-            df.loc[df["Sticker_tmp"].isin(ejecutadas_filtradas["Sticker_tmp"]), "Ejecutada"] = "SI"
-            df = df.drop(columns=["Sticker_tmp"], errors="ignore")
-        except Exception as exc:
-            st.warning(f"Error al cargar podas ejecutadas: {exc}")
-
-    # 3. Inventario CAM (se enlaza por sticker, no dispone de ID_Luminaria)
-    if os.path.exists("data/inventario_cam.csv"):
-        try:
-            cam = pd.read_csv("data/inventario_cam.csv", encoding="utf-8-sig")
-            cam.columns = cam.columns.str.strip()
-
-            if 'Latitud' in cam.columns:
-                cam = cam.rename(columns={'Latitud': 'Lat'})
-            if 'Longitud' in cam.columns:
-                cam = cam.rename(columns={'Longitud': 'Long'})
-
-            nombre_col = None
-            for col in cam.columns:
-                if 'NOMBRE' in col.upper() and 'COM' in col.upper():
-                    nombre_col = col
-                    break
-
-            cols_needed = ['Sticker']
-            if nombre_col:
-                cols_needed.append(nombre_col)
-            if 'Lat' in cam.columns:
-                cols_needed.append('Lat')
-            if 'Long' in cam.columns:
-                cols_needed.append('Long')
-            if 'ID_Luminaria' in cam.columns:
-                cols_needed.append('ID_Luminaria')
-
-            cam_clean = cam[cols_needed].copy()
-            cam_clean = cam_clean.dropna(subset=['Sticker'])
-            cam_clean['Sticker'] = cam_clean['Sticker'].astype(str).str.strip()
-            cam_clean['Permiso_CAM'] = 'SI'
-
-            if nombre_col and nombre_col != 'NOMBRE COMÚN':
-                cam_clean = cam_clean.rename(columns={nombre_col: 'NOMBRE COMÚN'})
-
-            cam_layer = cam_clean.copy()
-            if 'Lat' in cam_layer.columns and 'Long' in cam_layer.columns:
-                cam_layer['Lat'] = pd.to_numeric(cam_layer['Lat'], errors='coerce')
-                cam_layer['Long'] = pd.to_numeric(cam_layer['Long'], errors='coerce')
-                cam_layer = cam_layer.dropna(subset=['Lat', 'Long'])
-            else:
-                cam_layer = pd.DataFrame()
-
-            df['Sticker_tmp'] = df['Sticker'].astype(str).str.strip()
-            cam_clean['Sticker_tmp'] = cam_clean['Sticker'].astype(str).str.strip()
-
-            df = df.merge(
-                cam_clean[['Sticker_tmp', 'Permiso_CAM', 'NOMBRE COMÚN']],
-                on='Sticker_tmp',
-                how='left',
-                suffixes=('', '_cam')
-            )
-            df['Permiso_CAM'] = df['Permiso_CAM'].fillna('NO')
-            if 'NOMBRE COMÚN_cam' in df.columns:
-                df['NOMBRE COMÚN'] = df['NOMBRE COMÚN'].fillna(df['NOMBRE COMÚN_cam'])
-                df = df.drop(columns=['NOMBRE COMÚN_cam'], errors='ignore')
-            df = df.drop(columns=['Sticker_tmp'], errors='ignore')
-        except Exception as exc:
-            st.warning(f"Error al cargar inventario CAM: {exc}")
-
-    # 4. Inventario forestal (enlace principal por ID_Luminaria)
-    if os.path.exists("data/Inventario_forestal.csv"):
-        try:
-            inv = pd.read_csv("data/Inventario_forestal.csv", encoding="utf-8")
-            inv.columns = inv.columns.str.strip()
-
-            if "ID_Luminaria" in inv.columns:
-                inv_clean = inv.copy()
-                inv_clean["ID_Luminaria"] = inv_clean["ID_Luminaria"].astype(str).str.strip()
-                inv_clean = inv_clean.drop_duplicates(subset=["ID_Luminaria"], keep="first")
-
-                cols_inv = [
-                    "ID_Luminaria",
-                    "Nombre_comun",
-                    "NOMBRE CIENTIFICO",
-                    "HT(m)",
-                    "CAP(cm)",
-                    "DAP(m)",
-                    "DIAMETRO DE COPAS (m)",
-                    "TRATAMIENTO, PODA ",
-                    "Sticker"
-                ]
-                cols_inv = [c for c in cols_inv if c in inv_clean.columns]
-
-                df["ID_Luminaria_tmp"] = df["ID_Luminaria"].astype(str).str.strip()
-                df = df.merge(
-                    inv_clean[cols_inv],
-                    left_on="ID_Luminaria_tmp",
-                    right_on="ID_Luminaria",
-                    how="left",
-                    suffixes=("", "_inv")
-                )
-                df = df.drop(columns=["ID_Luminaria_tmp"], errors="ignore")
-        except Exception as exc:
-            st.warning(f"Error al cargar inventario forestal: {exc}")
-
-    df['P.Q.R.S'] = df['P.Q.R.S'].astype(str)
-    df['Es_Nueva'] = df['P.Q.R.S'].str.contains(r'2025-0[1-9]|2025-1[0-2]', na=False, regex=True)
-
-    df['Latitud'] = pd.to_numeric(df['Latitud'], errors='coerce')
-    df['Longitud'] = pd.to_numeric(df['Longitud'], errors='coerce')
-    df = df.dropna(subset=['Latitud', 'Longitud']).copy()
-
-    df['Comuna_Num'] = df['Comuna'].str.extract(r'(\d+)').astype(float).fillna(0).astype(int)
-    df['Inventariado'] = df['Inventariado'].astype(str).str.strip().str.upper()
-    df['Ejecutada'] = df['Ejecutada'].astype(str).str.strip().str.upper()
-    df['Permiso_CAM'] = df['Permiso_CAM'].astype(str).str.strip().str.upper()
-
-    if 'NOMBRE COMÚN' not in df.columns:
-        df['NOMBRE COMÚN'] = None
-
-    if not cam_layer.empty:
-        if 'ID_Luminaria' in cam_layer.columns:
-            cam_layer['ID_Luminaria'] = cam_layer['ID_Luminaria'].astype(str).str.strip()
-        cam_layer = cam_layer.merge(
-            df[['Sticker', 'Comuna']].drop_duplicates(subset=['Sticker']),
-            on='Sticker',
-            how='left'
-        )
-        cam_layer = cam_layer.rename(columns={'Lat': 'Latitud', 'Long': 'Longitud'})
-        cam_layer['NOMBRE COMÚN'] = cam_layer['NOMBRE COMÚN'].astype(str)
+@st.cache_resource
+def get_data_source():
+    """Fuente de datos compartida entre sesiones; se recarga por etapas cuando cambia un CSV de data/"""
+    return IncrementalPqrData(warn=st.warning)
 
-    return df, cam_layer
+
+@st.cache_resource(max_entries=2)
+def get_filter_indexes(_df, _cam_layer, version):
+    """Índices de filtros de PQR y CAM; se reconstruyen solo cuando cambia la versión de los datos"""
+    filtros_pqr = FilterIndex(_df, {'Comuna': 'exact', 'NOMBRE COMÚN': 'lower'})
+    filtros_cam = FilterIndex(_cam_layer, {'Comuna': 'exact', 'NOMBRE COMÚN': 'lower'})
+    return filtros_pqr, filtros_cam
+
+
+@st.cache_resource(max_entries=2)
+def get_counts_cube(_df, version):
+    """Cubo de conteos de los PQR (ver podas.cube) para las estadísticas y el gráfico por comuna"""
+    return CountsCube(_df)
+
+
+@timing.timed('load_data')
+def load_data():
+    """Cargar datos base enriquecidos, recalculando solo las etapas cuyos archivos cambiaron"""
+    fuente = get_data_source()
+    # Las etapas que recalcula refresh aparecen como tramos hijos de load_data
+    for etapa, segundos in fuente.refresh().items():
+        timing.add(etapa, segundos)
+    # La versión se lee antes que los datos: una recarga concurrente nunca deja
+    # en caché un índice con una versión más nueva que sus datos
+    version = fuente.version
+    df, cam_layer = fuente.df, fuente.cam_layer
+    filtros_pqr, filtros_cam = get_filter_indexes(df, cam_layer, version)
+    cubo = get_counts_cube(df, version)
+    return df, cam_layer, fuente.last_timings, filtros_pqr, filtros_cam, cubo, version
 
 # Cargar datos
 with st.spinner("Cargando datos..."):
-    df, cam_layer = load_data()
+    df, cam_layer, tiempos_carga, filtros_pqr, filtros_cam, cubo, version_datos = load_data()
 
 # --- SIDEBAR ---
 with st.sidebar:
     st.header("🔍 Filtros")
 
-    comunas = sorted(df['Comuna'].unique())
+    comunas = filtros_pqr.values('Comuna')
     selected_comunas = st.multiselect("Comuna", options=comunas, default=comunas)
 
-    cam_nombres = sorted(cam_layer['NOMBRE COMÚN'].dropna().astype(str).str.strip().unique()) if not cam_layer.empty else []
-    cam_nombres = [n for n in cam_nombres if n and n.lower() != 'nan']
+    cam_nombres = filtros_cam.labels('NOMBRE COMÚN') if 'NOMBRE COMÚN' in filtros_cam else []
     selected_especies = st.multiselect("Nombre Común (CAM)", options=cam_nombres, default=[])
 
     show_cam_layer = st.checkbox("Mostrar capa Inventario CAM", value=True)
+    show_density = st.checkbox(
+        "Agregar en hexágonos con zoom bajo", value=True,
+        help="A escala ciudad el mapa muestra conteos por hexágono; los puntos aparecen al acercarse"
+    )
 
     st.markdown("---")
     st.subheader("📊 Estadísticas")
-    st.metric("Total Solicitudes", len(df))
-    st.metric("Inventariadas (SI)", len(df[df['Inventariado'] == 'SI']))
-    st.metric("Pendientes (NO)", len(df[df['Inventariado'] == 'NO']))
+    conteo_inventariado = cubo.counts('Inventariado', observed=False)
+    st.metric("Total Solicitudes", cubo.total())
+    st.metric("Inventariadas (SI)", int(conteo_inventariado.get('SI', 0)))
+    st.metric("Pendientes (NO)", int(conteo_inventariado.get('NO', 0)))
     st.metric("Registros CAM", len(cam_layer))
 
-# --- APLICAR FILTROS ---
-filtered_df = df.copy()
-
-if selected_comunas:
-    filtered_df = filtered_df[filtered_df['Comuna'].isin(selected_comunas)]
+    if tiempos_carga:
+        st.caption(
+            "Última recarga de datos: "
+            + ", ".join(f"{etapa} {seg * 1000:.0f} ms" for etapa, seg in tiempos_carga.items())
+        )
 
-if selected_especies:
-    especies_norm = [str(e).strip().lower() for e in selected_especies]
-    filtered_df = filtered_df[
-        filtered_df['NOMBRE COMÚN'].fillna('').astype(str).str.strip().str.lower().isin(especies_norm)
-    ]
+# --- APLICAR FILTROS ---
+# Máscaras sobre códigos precalculados (ver podas.filters); sin copias ni operaciones de texto
+filtros = {'Comuna': selected_comunas, 'NOMBRE COMÚN': selected_especies}
+with timing.span('filtros'):
+    filtered_df = filtros_pqr.apply(df, filtros)
+    cam_layer_filtered = filtros_cam.apply(
+        cam_layer, {columna: valores for columna, valores in filtros.items() if columna in filtros_cam}
+    )
 
-cam_layer_filtered = cam_layer.copy()
-if not cam_layer_filtered.empty:
-    if selected_comunas and 'Comuna' in cam_layer_filtered.columns:
-        cam_layer_filtered = cam_layer_filtered[cam_layer_filtered['Comuna'].isin(selected_comunas)]
-    if selected_especies:
-        especies_norm = [str(e).strip().lower() for e in selected_especies]
-        cam_layer_filtered = cam_layer_filtered[
-            cam_layer_filtered['NOMBRE COMÚN'].fillna('').astype(str).str.strip().str.lower().isin(especies_norm)
-        ]
+# --- MAPA ---
+@timing.timed('build_map_html')
+def build_map_html(filtered_df, cam_layer_filtered, show_cam_layer, show_density):
+    """
+    Construye el mapa y lo serializa a HTML.
 
-# --- CONTENIDO PRINCIPAL ---
-if filtered_df.empty:
-    st.warning("⚠️ No hay datos que coincidan con los filtros seleccionados.")
-else:
+    Returns:
+        Tupla (html, info); info tiene los conteos de la capa CAM para el pie del mapa
+    """
     center = [filtered_df['Latitud'].mean(), filtered_df['Longitud'].mean()]
     m = folium.Map(location=center, zoom_start=12, tiles="CartoDB positron")
 
     capa_base = folium.FeatureGroup(name="Solicitudes PQR", show=True)
     capa_cam = folium.FeatureGroup(name="Inventario CAM", show=show_cam_layer)
 
-    for _, row in filtered_df.iterrows():
-        inventariado_val = str(row.get('Inventariado', 'NO')).upper().strip()
-        color = '#2ca02c' if inventariado_val == 'SI' else '#d62728'
-
-        popup_html = f"""
-        <div style=\"font-family: Arial; font-size: 12px; width: 240px;\">
-            <b>ID Luminaria:</b> {row.get('ID_Luminaria', 'N/D')}<br>
-            <b>Sticker:</b> {row.get('Sticker', 'N/D')}<br>
-            <b>PQR:</b> {str(row.get('P.Q.R.S', ''))[:80]}...<br>
-            <b>Comuna:</b> {row.get('Comuna', 'N/D')}<br>
-            <b>Inventariado:</b> {inventariado_val}<br>
-        </div>
-        """
-
-        folium.CircleMarker(
-            location=[row['Latitud'], row['Longitud']],
-            radius=4,
-            color='black',
-            weight=1,
-            fill=True,
-            fillColor=color,
-            fillOpacity=0.85,
-            popup=folium.Popup(popup_html, max_width=300),
-            tooltip=f"{row.get('ID_Luminaria', '')}"
-        ).add_to(capa_base)
+    # Inventariado en mayúsculas y sin espacios (sin columna cuenta como 'NO'), para el popup y el color
+    inventariado_txt = (
+        filtered_df['Inventariado'].astype(str).str.upper().str.strip()
+        if 'Inventariado' in filtered_df.columns else 'NO'
+    )
+    capa_pqr = add_point_layer(
+        capa_base,
+        filtered_df.assign(PQR_corto=filtered_df['P.Q.R.S'].astype(str).str[:80], Inventariado_txt=inventariado_txt),
+        fields=['ID_Luminaria', 'Sticker', 'PQR_corto', 'Comuna', 'Inventariado_txt'],
+        base_style={'radius': 4, 'color': 'black', 'weight': 1, 'fill': True, 'fillOpacity': 0.85},
+        styles={'Inventariado_txt': {'SI': {'fillColor': '#2ca02c'}, '*': {'fillColor': '#d62728'}}},
+        popup=POPUP_PQR,
+        tooltip='{ID_Luminaria}',
+        missing='N/D',
+        control=False
+    )
 
+    capa_cam_puntos = None
     if show_cam_layer and not cam_layer_filtered.empty:
-        for _, row in cam_layer_filtered.iterrows():
-            popup_html = f"""
-            <div style=\"font-family: Arial; font-size: 12px; width: 240px;\">
-                <b>ID Luminaria:</b> {row.get('ID_Luminaria', 'N/D')}<br>
-                <b>Sticker:</b> {row.get('Sticker', 'N/D')}<br>
-                <b>Nombre común:</b> {row.get('NOMBRE COMÚN', row.get('Nombre_comun', 'N/D'))}<br>
-            </div>
-            """
-            folium.CircleMarker(
-                location=[row['Latitud'], row['Longitud']],
-                radius=5,
-                color='#072ac8',
-                weight=1,
-                fill=True,
-                fillColor='#072ac8',
-                fillOpacity=0.9,
-                popup=folium.Popup(popup_html, max_width=300),
-                tooltip=f"CAM: {row.get('ID_Luminaria', '')}"
-            ).add_to(capa_cam)
+        # Los árboles con la misma coordenada se dibujan como un solo marcador
+        # Nombre común de 'NOMBRE COMÚN' o, si falta, de 'Nombre_comun' (N/D sin ninguno)
+        nombre_popup = pd.Series(pd.NA, index=cam_layer_filtered.index, dtype=object)
+        for columna in ('NOMBRE COMÚN', 'Nombre_comun'):
+            if columna in cam_layer_filtered.columns:
+                nombre_popup = nombre_popup.fillna(cam_layer_filtered[columna].astype(object))
+        capa_cam_puntos = add_point_layer(
+            capa_cam,
+            cam_layer_filtered.assign(Nombre_popup=nombre_popup),
+            fields=['ID_Luminaria', 'Sticker', 'Nombre_popup'],
+            base_style={
+                'radius': 5,
+                'color': '#072ac8',
+                'weight': 1,
+                'fill': True,
+                'fillColor': '#072ac8',
+                'fillOpacity': 0.9
+            },
+            popup=POPUP_CAM,
+            tooltip='CAM: {ID_Luminaria}',
+            missing='N/D',
+            control=False,
+            colocated='group',
+            group_label='árboles en este punto'
+        )
 
     capa_base.add_to(m)
     if show_cam_layer and not cam_layer_filtered.empty:
         capa_cam.add_to(m)
 
+    if show_density:
+        # Conteos por hexágono con zoom bajo; marcadores individuales desde ZOOM_DETALLE
+        ejecutada = filtered_df['Ejecutada'].eq('SI')
+        capas_densidad = {'Pendientes': filtered_df[~ejecutada], 'Ejecutadas': filtered_df[ejecutada]}
+        if capa_cam_puntos is not None:
+            capas_densidad['Árboles'] = cam_layer_filtered.rename(columns={'Lat': 'Latitud', 'Long': 'Longitud'})
+        capa_densidad = add_density_layer(
+            m, capas_densidad, size_m=TAMANO_HEXAGONO_M,
+            popup=POPUP_DENSIDAD, tooltip='{Total} puntos', control=False
+        )
+        capas_puntos = [capa_pqr] + ([capa_cam_puntos] if capa_cam_puntos is not None else [])
+        ZoomSwitch([capa_densidad], capas_puntos, zoom=ZOOM_DETALLE).add_to(m)
+
     folium.LayerControl(collapsed=False).add_to(m)
 
+    info = {}
+    if capa_cam_puntos is not None:
+        info = {'cam_puntos': capa_cam_puntos.n_points, 'cam_agrupados': capa_cam_puntos.markers_saved}
+    with timing.span('serialización HTML'):
+        return m.get_root().render(), info
+
+
+@st.cache_resource
+def get_map_cache():
+    """Caché LRU del HTML de los mapas, compartida entre sesiones"""
+    return MapHtmlCache(max_entries=32)
+
+
+# --- CONTENIDO PRINCIPAL ---
+if filtered_df.empty:
+    st.warning("⚠️ No hay datos que coincidan con los filtros seleccionados.")
+else:
+    # El mapa solo se construye si esta combinación de filtros no está en la caché
+    cache_mapas = get_map_cache()
+    clave_mapa = filter_key(
+        version=version_datos,
+        # Selección real como conjunto: todas y ninguna comuna dibujan mapas distintos
+        comunas=selected_comunas,
+        especies=selected_especies,
+        cam=show_cam_layer,
+        densidad=show_density,
+    )
+    with timing.span('mapa (caché)'):
+        html_mapa, info_mapa, _ = cache_mapas.get_or_build(
+            clave_mapa,
+            lambda: build_map_html(filtered_df, cam_layer_filtered, show_cam_layer, show_density)
+        )
+
     st.subheader("🗺️ Mapa Interactivo")
-    st_folium(m, width=None, height=600, returned_objects=[])
+    with timing.span('components.html'):
+        components.html(html_mapa, height=600)
+    if info_mapa.get('cam_agrupados'):
+        st.caption(
+            f"🌳 {info_mapa['cam_puntos']:,} árboles CAM en "
+            f"{info_mapa['cam_puntos'] - info_mapa['cam_agrupados']:,} marcadores "
+            f"({info_mapa['cam_agrupados']:,} en coordenadas repetidas agrupados)"
+        )
+    # Aciertos y tamaño de la caché solo con el panel de depuración (?debug=1 o PODAS_TIMING_PANEL)
+    if timing.panel_requested():
+        estadisticas = cache_mapas.stats()
+        st.caption(
+            f"Caché de mapas: {estadisticas['hits']} aciertos, {estadisticas['misses']} fallos, "
+            f"{estadisticas['entries']} mapas ({estadisticas['bytes'] / 1e6:.1f} MB)"
+        )
 
     st.markdown("### Leyenda")
     st.markdown("""
@@ -318,12 +279,19 @@ else:
     """)
 
     st.subheader("📊 Inventario por Comuna")
-    resumen = filtered_df.groupby('Comuna').agg({
-        'Sticker': 'count',
-        'Inventariado': lambda x: (x == 'SI').sum()
-    }).reset_index()
-    resumen.columns = ['Comuna', 'Total', 'Inventariado_SI']
-    resumen['Inventariado_NO'] = resumen['Total'] - resumen['Inventariado_SI']
+    # Conteos desde el cubo; el filtro de especies no es una dimensión del cubo,
+    # así que con especies elegidas se cuenta un cubo del DataFrame filtrado
+    with timing.span('conteos por comuna'):
+        if cubo.covers(filtros):
+            conteo = cubo.counts(['Comuna', 'Inventariado'], filtros, observed=False).unstack('Inventariado')
+        else:
+            conteo = CountsCube(filtered_df).counts(['Comuna', 'Inventariado'], observed=False).unstack('Inventariado')
+        conteo = conteo[conteo.sum(axis=1) > 0]
+    resumen = pd.DataFrame({
+        'Comuna': conteo.index,
+        'Inventariado_SI': conteo.get('SI', 0),
+        'Inventariado_NO': conteo.sum(axis=1) - conteo.get('SI', 0),
+    })
 
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -345,12 +313,13 @@ else:
         height=400,
         showlegend=True
     )
-    st.plotly_chart(fig, use_container_width=True)
+    with timing.span('plotly_chart'):
+        st.plotly_chart(fig, use_container_width=True)
 
     st.subheader("📋 Detalle de Solicitudes")
     columnas_tabla = [
         'ID_Luminaria', 'Sticker', 'Comuna', 'P.Q.R.S', 'Inventariado',
-        'NOMBRE COMÚN', 'Nombre_comun'
+        'NOMBRE COMÚN', 'Nombre_comun', 'Cruce_forestal', 'Distancia_forestal_m'
     ]
     columnas_tabla = [c for c in columnas_tabla if c in filtered_df.columns]
     if columnas_tabla:
@@ -360,5 +329,16 @@ else:
             df_sorted = filtered_df.sort_values(['Comuna', 'Latitud'], ascending=[True, False])
         st.dataframe(df_sorted[columnas_tabla], use_container_width=True, height=400)
 
+with st.expander("🔑 Calidad de cruces por Sticker e ID_Luminaria"):
+    st.caption("Claves canónicas de cada fuente que no aparecen en las demás fuentes.")
+    if st.checkbox("Calcular reporte de claves sin cruce", value=False):
+        st.dataframe(get_data_source().key_report(), use_container_width=True, hide_index=True)
+
+with st.expander("💾 Memoria de los datos cargados"):
+    st.caption("Tamaño en memoria de cada tabla con el esquema compacto (categóricas, float32).")
+    st.dataframe(memory_report({'PQR': df, 'CAM': cam_layer}), use_container_width=True, hide_index=True)
+
 st.markdown("---")
 st.markdown("**Gestión de Podas - ESIP SAS ESP 2025 (V2)**")
+
+timing.render_panel(timing.finish())
@@ -0,0 +1,5 @@
+"""
+Benchmarks de los tableros de podas. Ejecutar desde la raíz del repositorio:
+
+    python -m benchmarks.<nombre_del_benchmark>
+"""
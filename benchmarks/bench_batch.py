@@ -0,0 +1,52 @@
+"""
+Generación por lotes de rutas por comuna: un proceso frente al pool, y
+comprobación de que los archivos escritos son idénticos en ambos casos.
+
+    python -m benchmarks.bench_batch
+"""
+
+import hashlib
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import random_points
+from podas.batch import route_all_comunas
+from podas.loaders import load_pqr
+
+
+def _digests(carpeta):
+    return {ruta.name: hashlib.sha256(ruta.read_bytes()).hexdigest() for ruta in sorted(Path(carpeta).iterdir())}
+
+
+def main(n_sintetico=12_000, comunas=10):
+    lat, lon = random_points(n_sintetico)
+    sintetico = pd.DataFrame({
+        'Sticker': np.char.zfill(np.arange(n_sintetico).astype(str), 6),
+        'Comuna': np.char.add('COMUNA ', np.char.zfill((np.arange(n_sintetico) % comunas + 1).astype(str), 2)),
+        'Inventariado': np.where(np.arange(n_sintetico) % 3 == 0, 'SI', 'NO'),
+        'Requiere_Acción': np.where(np.arange(n_sintetico) % 2 == 0, 'SI', 'NO'),
+        'Latitud': lat,
+        'Longitud': lon,
+    })
+    frames = [('PQR data/', load_pqr()), (f'sintético {n_sintetico:,}', sintetico)]
+
+    for nombre, df in frames:
+        huellas = {}
+        for workers in (1, None):
+            with tempfile.TemporaryDirectory() as carpeta:
+                t0 = time.perf_counter()
+                reporte = route_all_comunas(df, carpeta, workers=workers)
+                total = time.perf_counter() - t0
+                huellas[workers] = _digests(carpeta)
+            etiqueta = 'un proceso' if workers == 1 else 'pool'
+            print(f"{nombre:<16} | {etiqueta:<10} | {len(reporte):>3} comunas | "
+                  f"{reporte['puntos'].sum():>6,} puntos | {total:6.2f} s")
+        print(f"{nombre:<16} | archivos idénticos: {huellas[1] == huellas[None]} ({len(huellas[1])} archivos)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Costo de renderizar cada gráfico de barras de Podas_2025: el bloque anterior
+(plt.subplots + estilo + st.pyplot, que rasteriza a 200 dpi con bbox ajustado)
+frente a podas.charts (fallo de caché) y a servir el PNG desde st.cache_data
+(acierto), con los conteos reales de los PQR.
+
+    python -m benchmarks.bench_charts
+"""
+
+import io
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+import streamlit as st
+
+from podas.charts import COLOR_OTHER, COLORS_SI_NO, bar_chart_png, stacked_bar_png
+
+PQR_FILE = 'data/pqr_pendientes_georreferenciadas.csv'
+
+
+def old_bar_chart(labels, values, xlabel):
+    """Gráfico de barras como estaba en la app (pyplot + savefig de st.pyplot)."""
+    fig, ax = plt.subplots(figsize=(6, 4))
+    fig.patch.set_facecolor('#0E1117')
+    ax.set_facecolor('#0E1117')
+    colors = [COLORS_SI_NO.get(str(label).upper(), COLOR_OTHER) for label in labels]
+    ax.bar([str(label) for label in labels], values, color=colors, alpha=0.8, edgecolor='white', linewidth=1.5)
+    ax.set_ylabel('Conteo', color='white', fontsize=11)
+    ax.set_xlabel(xlabel, color='white', fontsize=11)
+    ax.tick_params(colors='white', labelsize=10)
+    ax.spines['bottom'].set_color('white')
+    ax.spines['top'].set_color('#0E1117')
+    ax.spines['right'].set_color('#0E1117')
+    ax.spines['left'].set_color('white')
+    ax.grid(axis='y', alpha=0.3, color='white', linestyle='--')
+    plt.tight_layout()
+    return _pyplot_png(fig)
+
+
+def old_stacked_chart(categories, stacks):
+    """Barras apiladas como estaban en la app."""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    fig.patch.set_facecolor('#0E1117')
+    ax.set_facecolor('#0E1117')
+    x_pos = range(len(categories))
+    bottom = None
+    for etiqueta, valores in stacks:
+        valores = pd.Series(valores).values
+        ax.bar(x_pos, valores, bottom=bottom, color=COLORS_SI_NO.get(etiqueta, COLOR_OTHER), label=etiqueta,
+               alpha=0.8, edgecolor='white', linewidth=1.5)
+        bottom = valores if bottom is None else bottom + valores
+    ax.set_xlabel('Comuna', color='white', fontsize=12)
+    ax.set_ylabel('Conteo', color='white', fontsize=12)
+    ax.set_title('Conteo de Inventariado por Comuna', color='white', fontsize=14, fontweight='bold', pad=20)
+    ax.set_xticks(x_pos)
+    ax.set_xticklabels(categories, rotation=45, ha='right', color='white', fontsize=10)
+    ax.tick_params(colors='white', labelsize=10)
+    ax.spines['bottom'].set_color('white')
+    ax.spines['top'].set_color('#0E1117')
+    ax.spines['right'].set_color('#0E1117')
+    ax.spines['left'].set_color('white')
+    ax.grid(axis='y', alpha=0.3, color='white', linestyle='--')
+    legend = ax.legend(title='Inventariado', title_fontsize=11, fontsize=10,
+                       facecolor='#0E1117', edgecolor='white', labelcolor='white')
+    legend.get_title().set_color('white')
+    plt.tight_layout()
+    return _pyplot_png(fig)
+
+
+def _pyplot_png(fig):
+    """Lo que hacía st.pyplot con la figura: PNG a 200 dpi con bbox ajustado."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight', facecolor='#0E1117')
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def cached_bar_chart(labels, values, xlabel):
+    return bar_chart_png(labels, values, xlabel)
+
+
+@st.cache_data(show_spinner=False)
+def cached_stacked_chart(categories, stacks):
+    return stacked_bar_png(categories, stacks, 'Comuna', title='Conteo de Inventariado por Comuna',
+                           legend_title='Inventariado')
+
+
+def _best_of(func, repeat=5):
+    tiempos = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos)
+
+
+def main():
+    df = pd.read_csv(PQR_FILE)
+    inventariado = df['Inventariado'].value_counts()
+    requiere = df['Requiere_Acción'].value_counts()
+    cruce = pd.crosstab(df['Comuna'], df['Inventariado'])[['SI', 'NO']]
+    comunas = tuple(cruce.index)
+    stacks = tuple((col, tuple(cruce[col].tolist())) for col in cruce.columns)
+
+    graficos = {
+        'Conteo por Inventariado': (
+            lambda: old_bar_chart(tuple(inventariado.index), tuple(inventariado.tolist()), 'Inventariado'),
+            lambda: bar_chart_png(tuple(inventariado.index), tuple(inventariado.tolist()), 'Inventariado'),
+            lambda: cached_bar_chart(tuple(inventariado.index), tuple(inventariado.tolist()), 'Inventariado'),
+        ),
+        'Conteo por Requiere Acción': (
+            lambda: old_bar_chart(tuple(requiere.index), tuple(requiere.tolist()), 'Requiere Acción'),
+            lambda: bar_chart_png(tuple(requiere.index), tuple(requiere.tolist()), 'Requiere Acción'),
+            lambda: cached_bar_chart(tuple(requiere.index), tuple(requiere.tolist()), 'Requiere Acción'),
+        ),
+        'Inventariado por Comuna': (
+            lambda: old_stacked_chart(list(comunas), stacks),
+            lambda: stacked_bar_png(comunas, stacks, 'Comuna', title='Conteo de Inventariado por Comuna',
+                                    legend_title='Inventariado'),
+            lambda: cached_stacked_chart(comunas, stacks),
+        ),
+    }
+    print(f"{'gráfico':<28} | {'antes (pyplot)':>14} | {'render (fallo)':>14} | {'caché (acierto)':>15} | PNG")
+    for nombre, (antes, render, cache) in graficos.items():
+        t_antes = _best_of(antes)
+        t_render = _best_of(render)
+        cache()
+        t_cache = _best_of(cache)
+        print(f"{nombre:<28} | {t_antes * 1000:11.1f} ms | {t_render * 1000:11.1f} ms | "
+              f"{t_cache * 1000:12.3f} ms | {len(render()) / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Compara la limpieza de los meses de indicadores con apply (una llamada por
+celda y mes) contra el motor columnar de indicadores.cleaning, sobre archivos
+leídos con pd.read_csv igual que en cargar_y_procesar_datos. Desde
+CELDAS_MINIMAS celdas el motor columnar tiene que ser más rápido que apply.
+
+    python -m benchmarks.bench_cleaning
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import MESES, indicator_frame
+from indicadores.cleaning import clean_month_block
+
+# Celdas desde las que se exige que el motor columnar le gane a apply
+CELDAS_MINIMAS = 100_000
+
+
+def limpiar_numeros(valor):
+    """Implementación celda a celda original de app.py (referencia)."""
+    if pd.isna(valor) or valor == '':
+        return np.nan
+    if isinstance(valor, str):
+        valor = valor.replace(',', '').replace('$', '').replace(' ', '')
+        if '(' in valor and ')' in valor:
+            valor = valor.split('(')[0]
+        try:
+            return float(valor)
+        except:
+            return np.nan
+    return float(valor)
+
+
+def limpiar_porcentajes(valor):
+    """Implementación celda a celda original de app.py (referencia)."""
+    if pd.isna(valor) or valor == '':
+        return np.nan
+    if isinstance(valor, str):
+        valor = valor.replace('%', '').replace(',', '')
+        try:
+            return float(valor)
+        except:
+            return np.nan
+    return float(valor)
+
+
+REFERENCIA = {'numero': limpiar_numeros, 'porcentaje': limpiar_porcentajes}
+
+
+def clean_apply(df, kind):
+    for mes in MESES:
+        if mes in df.columns:
+            df[mes] = df[mes].apply(REFERENCIA[kind])
+    return df
+
+
+def main(sizes=(1_000, 12_000, 100_000)):
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            for kind in ('numero', 'porcentaje'):
+                path = Path(tmp) / f'{kind}_{n}.csv'
+                indicator_frame(n, kind).to_csv(path, index=False)
+                leido = pd.read_csv(path)
+
+                esperado = leido.copy()
+                t0 = time.perf_counter()
+                clean_apply(esperado, kind)
+                t_apply = time.perf_counter() - t0
+
+                obtenido = leido.copy()
+                t0 = time.perf_counter()
+                rechazados = clean_month_block(obtenido, MESES, kind)
+                t_vector = time.perf_counter() - t0
+
+                pd.testing.assert_frame_equal(obtenido, esperado.astype({mes: 'float64' for mes in MESES}))
+                # Los rechazos son exactamente los textos que apply dejó en NaN
+                textos = leido[MESES].notna().to_numpy() & esperado[MESES].isna().to_numpy()
+                assert len(rechazados) == int(textos.sum())
+                print(f"{n:>7,} indicadores ({kind:<10}) | celdas: {n * len(MESES):>9,} | "
+                      f"apply: {t_apply * 1000:8.1f} ms | columnar: {t_vector * 1000:7.1f} ms "
+                      f"(x{t_apply / t_vector:5.1f}) | rechazos: {len(rechazados):,}")
+                if n * len(MESES) >= CELDAS_MINIMAS:
+                    assert t_vector < t_apply, f"columnar más lento que apply con {n * len(MESES):,} celdas"
+
+
+if __name__ == '__main__':
+    main()
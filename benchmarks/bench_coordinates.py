@@ -0,0 +1,74 @@
+"""
+Compara la limpieza de coordenadas fila a fila contra la versión vectorizada,
+sobre columnas leídas con pd.read_csv igual que en load_inventario_data.
+
+    python -m benchmarks.bench_coordinates
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import coordinate_strings
+from podas.coordinates import clean_coordinate_columns
+
+
+def clean_coordinate(value):
+    """Implementación fila a fila original de Podas_2025/app.py (referencia)."""
+    if pd.isna(value):
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            value = value.strip()
+            value = value.replace(',', '.')
+        result = float(value)
+        if abs(result) > 180:
+            return None
+        return result
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def clean_apply(df):
+    df['Latitud'] = df['Latitud'].apply(clean_coordinate)
+    df['Longitud'] = df['Longitud'].apply(clean_coordinate)
+    return df
+
+
+def main(sizes=(10_000, 100_000, 1_000_000)):
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            lat, lon = coordinate_strings(n)
+            path = Path(tmp) / f'inventario_{n}.csv'
+            pd.DataFrame({'Latitud': lat, 'Longitud': lon}).to_csv(path, index=False)
+
+            t0 = time.perf_counter()
+            leido = pd.read_csv(path)
+            t_lectura = time.perf_counter() - t0
+
+            esperado = leido.copy()
+            t0 = time.perf_counter()
+            clean_apply(esperado)
+            t_fila = time.perf_counter() - t0
+
+            obtenido = leido.copy()
+            t0 = time.perf_counter()
+            motivos = clean_coordinate_columns(obtenido)
+            t_vector = time.perf_counter() - t0
+
+            pd.testing.assert_frame_equal(obtenido, esperado.astype('float64'))
+            rechazos = int(motivos.notna().sum().sum())
+            carga_fila = t_lectura + t_fila
+            carga_vector = t_lectura + t_vector
+            print(f"{n:>9,} árboles | lectura CSV: {t_lectura * 1000:7.1f} ms | "
+                  f"limpieza apply: {t_fila * 1000:7.1f} ms | "
+                  f"vectorizada: {t_vector * 1000:6.1f} ms (x{t_fila / t_vector:4.1f}) | "
+                  f"carga en frío x{carga_fila / carga_vector:4.1f} | rechazos: {rechazos:,}")
+
+
+if __name__ == '__main__':
+    main()
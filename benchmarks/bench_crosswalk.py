@@ -0,0 +1,60 @@
+"""
+Cruces por índice de claves (Crosswalk) frente a columnas temporales + merge.
+
+    python -m benchmarks.bench_crosswalk
+"""
+
+import time
+
+import pandas as pd
+
+from podas.datasets import CAM_FILE, INVENTARIO_FILE, PQR_FILE, read_sources
+
+
+def _best_of(func, repeat=20):
+    tiempos = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos)
+
+
+def _merge_joins(pqr, cam, inv):
+    """Cruces como antes: normalizar con strip en cada join y hacer merge."""
+    df = pqr.assign(Sticker_tmp=pqr['Sticker'].astype(str).str.strip())
+    cam_tmp = cam.assign(Sticker_tmp=cam['Sticker'].astype(str).str.strip())
+    df = df.merge(cam_tmp[['Sticker_tmp', 'NOMBRE COMÚN']], on='Sticker_tmp', how='left', suffixes=('', '_cam'))
+    df['ID_Luminaria_tmp'] = df['ID_Luminaria'].astype(str).str.strip()
+    inv_tmp = inv.assign(ID_Luminaria=inv['ID_Luminaria'].astype(str).str.strip())
+    inv_tmp = inv_tmp.drop_duplicates(subset=['ID_Luminaria'], keep='first')
+    return df.merge(inv_tmp, left_on='ID_Luminaria_tmp', right_on='ID_Luminaria', how='left', suffixes=('', '_inv'))
+
+
+def _probe_joins(crosswalk):
+    """Cruces con el índice ya construido: una consulta hash por fila."""
+    fila_cam = crosswalk['cam', 'Sticker'].lookup(crosswalk['pqr', 'Sticker'])
+    fila_inv = crosswalk['forestal', 'ID_Luminaria'].lookup(crosswalk['pqr', 'ID_Luminaria'])
+    return fila_cam, fila_inv
+
+
+def main():
+    etapas, crosswalk = read_sources()
+    pqr, (cam, _), inv = etapas[PQR_FILE], etapas[CAM_FILE], etapas[INVENTARIO_FILE]
+
+    filas_merge = len(_merge_joins(pqr, cam, inv))
+    merge = _best_of(lambda: _merge_joins(pqr, cam, inv))
+    sondeo = _best_of(lambda: _probe_joins(crosswalk))
+    fila_cam, fila_inv = _probe_joins(crosswalk)
+
+    print(f"PQR: {len(pqr):,} | CAM: {len(cam):,} | forestal: {len(inv):,}")
+    print(f"strip + merge:        {merge * 1000:7.2f} ms  ({filas_merge:,} filas: las claves repetidas en CAM duplican PQR)")
+    print(f"consultas al índice:  {sondeo * 1000:7.2f} ms  ({len(fila_cam):,} filas, "
+          f"{(fila_cam >= 0).sum():,} con CAM y {(fila_inv >= 0).sum():,} con árbol)  ({merge / sondeo:.0f}x)")
+    print()
+    print(crosswalk.unmatched_report().to_string(index=False))
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 120)
+    main()
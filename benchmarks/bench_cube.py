@@ -0,0 +1,95 @@
+"""
+Métricas y gráficos de conteo: groupby / value_counts / crosstab sobre el
+DataFrame filtrado frente a consultas al cubo de conteos (podas.cube), con
+DataFrames sintéticos de distinto tamaño.
+
+    python -m benchmarks.bench_cube
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from podas.cube import CountsCube
+from podas.filters import FilterIndex
+
+TAMANOS = [10_000, 100_000, 1_000_000]
+
+FILTROS = {
+    'Comuna': [f"COMUNA {i:02d}" for i in range(1, 8)],
+    'Inventariado': None,
+    'Requiere_Acción': 'SI',
+}
+
+
+def synthetic_frame(n, seed=0):
+    """PQR sintéticos con las cinco dimensiones del cubo y algunos nulos."""
+    rng = np.random.default_rng(seed)
+    comuna = pd.Series(rng.choice([f"COMUNA {i:02d}" for i in range(1, 11)] + ['RURAL'], n), dtype=object)
+    comuna[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({
+        'Comuna': comuna,
+        'Inventariado': rng.choice(['SI', 'NO'], n),
+        'Requiere_Acción': rng.choice(['SI', 'NO'], n, p=[0.4, 0.6]),
+        'Ejecutada': rng.choice(['SI', 'NO'], n, p=[0.05, 0.95]),
+        'Permiso_CAM': rng.choice(['SI', 'NO'], n),
+    })
+
+
+def views_pandas(df_filtrado):
+    """Vistas como se calculaban en las apps, sobre el DataFrame filtrado."""
+    return (
+        df_filtrado.groupby('Comuna').size(),
+        df_filtrado['Inventariado'].value_counts(),
+        df_filtrado['Requiere_Acción'].value_counts(),
+        pd.crosstab(df_filtrado['Comuna'], df_filtrado['Inventariado']),
+    )
+
+
+def views_cube(cubo, filtros):
+    """Las mismas vistas desde el cubo."""
+    return (
+        cubo.counts('Comuna', filtros),
+        cubo.counts('Inventariado', filtros),
+        cubo.counts('Requiere_Acción', filtros),
+        cubo.crosstab('Comuna', 'Inventariado', filtros),
+    )
+
+
+def _best_of(func, repeat=7):
+    tiempos = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos)
+
+
+def main():
+    print(f"{'filas':>10} | {'cubo (1 vez)':>12} | {'filtrar + pandas':>16} | {'vistas pandas':>13} | "
+          f"{'vistas cubo':>11} | iguales")
+    for n in TAMANOS:
+        df = synthetic_frame(n)
+        indice = FilterIndex(df, {'Comuna': 'exact', 'Inventariado': 'upper', 'Requiere_Acción': 'upper'})
+        t0 = time.perf_counter()
+        cubo = CountsCube(df)
+        construir = time.perf_counter() - t0
+
+        filtrar_y_contar = _best_of(lambda: views_pandas(indice.apply(df, FILTROS)))
+        df_filtrado = indice.apply(df, FILTROS)
+        solo_pandas = _best_of(lambda: views_pandas(df_filtrado))
+        solo_cubo = _best_of(lambda: views_cube(cubo, FILTROS))
+
+        esperado = views_pandas(df_filtrado)
+        obtenido = views_cube(cubo, FILTROS)
+        iguales = (
+            all(e.sort_index().to_dict() == o.sort_index().to_dict() for e, o in zip(esperado[:3], obtenido[:3]))
+            and esperado[3].values.tolist() == obtenido[3].values.tolist()
+        )
+        print(f"{n:>10,} | {construir * 1000:9.1f} ms | {filtrar_y_contar * 1000:13.1f} ms | "
+              f"{solo_pandas * 1000:10.1f} ms | {solo_cubo * 1000:8.2f} ms | {iguales}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Agregación por hexágonos/cuadrados (podas.density) y peso de la capa resultante
+frente a dibujar cada punto.
+
+    python -m benchmarks.bench_density
+"""
+
+import json
+import time
+
+from benchmarks.synthetic import random_points
+from podas.density import SHAPES, density_grid, grid_to_feature_collection
+
+
+def _best_of(func, repeat=5):
+    tiempos = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos)
+
+
+def main():
+    for n in (10_000, 100_000, 1_000_000):
+        lat, lon = random_points(n, seed=n)
+        # Tres capas como en el mapa: árboles, PQR pendientes y podas ejecutadas
+        capas = {
+            'Árboles': (lat[: n * 8 // 10], lon[: n * 8 // 10]),
+            'Pendientes': (lat[n * 8 // 10: n * 9 // 10], lon[n * 8 // 10: n * 9 // 10]),
+            'Ejecutadas': (lat[n * 9 // 10:], lon[n * 9 // 10:]),
+        }
+        for shape in SHAPES:
+            agregar = _best_of(lambda: density_grid(capas, size_m=250, shape=shape))
+            grid = density_grid(capas, size_m=250, shape=shape)
+            poligonos = _best_of(lambda: grid_to_feature_collection(grid, size_m=250, shape=shape))
+            kb = len(json.dumps(grid_to_feature_collection(grid, size_m=250, shape=shape))) / 1e3
+            print(f"{n:>9,} puntos | {shape:<6} | agregación {agregar * 1000:7.1f} ms | "
+                  f"polígonos {poligonos * 1000:6.1f} ms | {len(grid):,} celdas | GeoJSON {kb:7.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Primera ejecución de esip_2025/App.py según la cantidad de indicadores.
+
+Con el detalle bajo demanda, la primera pintura solo dibuja un interruptor por
+indicador de la página visible (INDICADORES_POR_PAGINA por columna y área),
+así que su tiempo y la cantidad de gráficos ya no crecen con el total de
+indicadores. También se mide abrir todos los indicadores de la primera página.
+Con --antes REV se ejecuta además App.py de esa revisión de git (p. ej. la
+versión que dibujaba todos los expanders) sobre los mismos datos.
+
+    python -m benchmarks.bench_esip_render
+    python -m benchmarks.bench_esip_render --antes HEAD~1
+"""
+
+import argparse
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import indicator_frame
+
+REPO = Path(__file__).resolve().parent.parent
+APP = REPO / 'esip_2025' / 'App.py'
+
+
+def write_inputs(carpeta, n, seed=0):
+    """Ind_%.csv, Ind_n.csv y tipo_indicadores.csv sintéticos con n indicadores cada uno."""
+    rng = np.random.default_rng(seed)
+    indicator_frame(n, 'porcentaje', seed).to_csv(carpeta / 'Ind_%.csv', index=False)
+    df_num = indicator_frame(n, 'numero', seed + 1)
+    df_num.to_csv(carpeta / 'Ind_n.csv', index=False)
+    pd.DataFrame({'ID': df_num['ID'], 'Indicador': df_num['Indicador'], 'Área': df_num['Área'],
+                  'Tipo': rng.choice(['POS', 'NEG', 'NEU'], n)}).to_csv(carpeta / 'tipo_indicadores.csv', index=False)
+
+
+def run(app_path):
+    """Ejecuta la app y devuelve (ms, gráficos plotly, AppTest)."""
+    at = AppTest.from_file(str(app_path), default_timeout=600)
+    t0 = time.perf_counter()
+    at.run()
+    ms = (time.perf_counter() - t0) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return ms, len(at.get('plotly_chart')), at
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[30, 120, 480, 1920],
+                        help='Indicadores de cada tipo (porcentuales y numéricos)')
+    parser.add_argument('--antes', default=None, help='Revisión de git de App.py para comparar')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        carpeta = Path(tmp) / 'esip_2025'
+        carpeta.mkdir()
+        shutil.copy(APP, carpeta / 'App.py')
+        if args.antes:
+            fuente = subprocess.run(['git', 'show', f'{args.antes}:esip_2025/App.py'], cwd=REPO,
+                                    check=True, capture_output=True, text=True).stdout
+            (carpeta / 'App_antes.py').write_text(fuente, encoding='utf-8')
+
+        for n in args.tamanos:
+            write_inputs(carpeta, n)
+            ms, graficos, at = run(carpeta / 'App.py')
+            linea = f"{n:>5,}+{n:<5,} indicadores | primera pintura: {ms:8.0f} ms ({graficos} gráficos)"
+
+            for interruptor in at.toggle:
+                interruptor.set_value(True)
+            t0 = time.perf_counter()
+            at.run()
+            linea += (f" | página 1 abierta: {(time.perf_counter() - t0) * 1000:8.0f} ms "
+                      f"({len(at.get('plotly_chart'))} gráficos)")
+
+            if args.antes:
+                ms_antes, graficos_antes, _ = run(carpeta / 'App_antes.py')
+                linea += f" | {args.antes}: {ms_antes:8.0f} ms ({graficos_antes} gráficos)"
+            print(linea)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Filtros de la barra lateral: copia + máscaras de texto encadenadas frente a
+FilterIndex (códigos precalculados) sobre un DataFrame sintético de 100k filas.
+
+    python -m benchmarks.bench_filters
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from podas.filters import FilterIndex
+
+FILAS = 100_000
+
+
+def synthetic_frame(n=FILAS, seed=0):
+    """PQR sintéticos con los mismos problemas de formato que los CSV (mayúsculas, espacios)."""
+    rng = np.random.default_rng(seed)
+    especies = [f"Especie {i}" for i in range(200)]
+    nombre = pd.Series(rng.choice(especies, n), dtype=object)
+    ruido = rng.random(n)
+    nombre[ruido < 0.1] = nombre[ruido < 0.1].str.upper()
+    nombre[(ruido >= 0.1) & (ruido < 0.2)] = nombre[(ruido >= 0.1) & (ruido < 0.2)] + ' '
+    nombre[ruido >= 0.97] = np.nan
+    return pd.DataFrame({
+        'Comuna': rng.choice([f"Comuna {i}" for i in range(1, 11)] + ['Rural'], n),
+        'Inventariado': rng.choice(['SI', 'NO', 'si', 'No'], n),
+        'Requiere_Acción': rng.choice(['SI', 'NO'], n),
+        'NOMBRE COMÚN': nombre,
+        'Latitud': rng.uniform(2.88, 2.99, n),
+        'Longitud': rng.uniform(-75.33, -75.24, n),
+        'P.Q.R.S': rng.choice(['Poda de árbol', 'Tala', 'Revisión'], n),
+    })
+
+
+def chained_filters(df, comunas, inventariado, requiere, especies):
+    """Filtros como estaban en las apps: copia y una máscara de texto por filtro."""
+    filtrado = df.copy()
+    if comunas:
+        filtrado = filtrado[filtrado['Comuna'].isin(comunas)]
+    if inventariado != 'Todos':
+        filtrado = filtrado[filtrado['Inventariado'].astype(str).str.upper() == inventariado]
+    if requiere != 'Todos':
+        filtrado = filtrado[filtrado['Requiere_Acción'].astype(str).str.upper() == requiere]
+    if especies:
+        normalizadas = [str(e).strip().lower() for e in especies]
+        filtrado = filtrado[filtrado['NOMBRE COMÚN'].fillna('').astype(str).str.strip().str.lower().isin(normalizadas)]
+    return filtrado
+
+
+def _best_of(func, repeat=10):
+    tiempos = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos)
+
+
+def main():
+    df = synthetic_frame()
+    t0 = time.perf_counter()
+    indice = FilterIndex(df, {'Comuna': 'exact', 'Inventariado': 'upper', 'Requiere_Acción': 'upper',
+                              'NOMBRE COMÚN': 'lower'})
+    construir = time.perf_counter() - t0
+    print(f"{len(df):,} filas | índice construido en {construir * 1000:.1f} ms (una vez al cargar)")
+
+    casos = {
+        'sin filtros': ([], 'Todos', 'Todos', []),
+        '3 comunas': (['Comuna 1', 'Comuna 2', 'Comuna 3'], 'Todos', 'Todos', []),
+        'comunas + SI + NO': (['Comuna 1', 'Comuna 2', 'Comuna 3'], 'SI', 'NO', []),
+        'todos + 5 especies': ([f"Comuna {i}" for i in range(1, 8)], 'SI', 'SI',
+                               [f"Especie {i}" for i in range(5)]),
+    }
+    for nombre, (comunas, inventariado, requiere, especies) in casos.items():
+        filtros = {
+            'Comuna': comunas,
+            'Inventariado': None if inventariado == 'Todos' else inventariado,
+            'Requiere_Acción': None if requiere == 'Todos' else requiere,
+            'NOMBRE COMÚN': especies,
+        }
+        antes = _best_of(lambda: chained_filters(df, comunas, inventariado, requiere, especies))
+        ahora = _best_of(lambda: indice.apply(df, filtros))
+        solo_mascara = _best_of(lambda: indice.select(filtros))
+        esperado = chained_filters(df, comunas, inventariado, requiere, especies)
+        iguales = esperado.index.equals(indice.apply(df, filtros).index)
+        print(f"{nombre:<20} | encadenados {antes * 1000:7.2f} ms | FilterIndex {ahora * 1000:6.2f} ms "
+              f"(máscara {solo_mascara * 1000:5.2f} ms) | {antes / ahora:5.0f}x | "
+              f"{len(esperado):,} filas | iguales: {iguales}")
+
+
+if __name__ == '__main__':
+    main()
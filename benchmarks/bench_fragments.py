@@ -0,0 +1,63 @@
+"""
+Tiempo de rerun por interacción en Podas_2025/app.py, antes y después de
+separar la página en secciones st.fragment.
+
+Antes, cada widget volvía a ejecutar todo el script; ahora un widget dentro de
+una sección vuelve a ejecutar solo esa sección. AppTest siempre ejecuta el
+script completo, así que "antes" es el tiempo del rerun completo y "después"
+el tiempo de la sección que contiene el widget (st.session_state
+['tiempos_secciones'], registrado por timed_section en la app).
+
+    python -m benchmarks.bench_fragments
+"""
+
+import os
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP = Path(__file__).resolve().parent.parent / 'Podas_2025' / 'app.py'
+
+
+def _checkbox(at, etiqueta):
+    return next(cb for cb in at.checkbox if cb.label == etiqueta)
+
+
+def _number_input(at, etiqueta):
+    return next(ni for ni in at.number_input if ni.label == etiqueta)
+
+
+# (nombre, sección que contiene el widget, acción sobre el AppTest)
+INTERACCIONES = [
+    ('capa inventario (on)', 'Mapa', lambda at: _checkbox(at, 'Mostrar capa Inventario Forestal').check()),
+    ('hexágonos (off)', 'Mapa', lambda at: _checkbox(at, 'Agregar en hexágonos con zoom bajo').uncheck()),
+    ('capa inventario (off)', 'Mapa', lambda at: _checkbox(at, 'Mostrar capa Inventario Forestal').uncheck()),
+    ('hexágonos (on, en caché)', 'Mapa', lambda at: _checkbox(at, 'Agregar en hexágonos con zoom bajo').check()),
+    ('cuadrillas = 5', 'Exportar', lambda at: _number_input(at, 'Cuadrillas').set_value(5)),
+    ('paradas por día = 40', 'Exportar', lambda at: _number_input(at, 'Paradas por cuadrilla y día').set_value(40)),
+]
+
+
+def main():
+    # La app lee data/ con rutas relativas a su carpeta
+    os.chdir(APP.parent)
+    at = AppTest.from_file(str(APP), default_timeout=300)
+    t0 = time.perf_counter()
+    at.run()
+    print(f"primera ejecución (carga de datos y cachés): {(time.perf_counter() - t0) * 1000:8.0f} ms")
+    print(f"{'interacción':<28} {'sección':<10} {'antes (rerun completo)':>24} {'después (fragmento)':>22}")
+    for nombre, seccion, accion in INTERACCIONES:
+        accion(at)
+        t0 = time.perf_counter()
+        at.run()
+        completo = (time.perf_counter() - t0) * 1000
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        fragmento = at.session_state['tiempos_secciones'][seccion]
+        print(f"{nombre:<28} {seccion:<10} {completo:>21.0f} ms {fragmento:>19.0f} ms "
+              f"({completo / fragmento:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
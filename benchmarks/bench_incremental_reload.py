@@ -0,0 +1,74 @@
+"""
+Recarga incremental de IncrementalPqrData frente a la reconstrucción completa.
+
+Trabaja sobre una copia de data/ en una carpeta temporal:
+
+    python -m benchmarks.bench_incremental_reload
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from podas.datasets import (
+    CAM_FILE, EJECUTADAS_FILE, INVENTARIO_FILE, IncrementalPqrData, build_enriched_pqr,
+)
+
+
+def _touch(ruta, linea=None):
+    """Agrega una línea (o solo actualiza la fecha) para que la recarga detecte el cambio."""
+    if linea is not None:
+        contenido = Path(ruta).read_text(encoding='utf-8')
+        separador = '' if contenido.endswith('\n') else '\n'
+        with open(ruta, 'a', encoding='utf-8') as fh:
+            fh.write(separador + linea + '\n')
+    stat = os.stat(ruta)
+    os.utime(ruta, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _report(nombre, tiempos):
+    total = sum(tiempos.values())
+    detalle = ', '.join(f"{etapa}: {seg * 1000:.1f} ms" for etapa, seg in tiempos.items())
+    print(f"{nombre:<32} {total * 1000:7.1f} ms  ({detalle})")
+
+
+def main():
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        data_dir = tmp / 'data'
+        shutil.copytree('data', data_dir)
+        fuente = IncrementalPqrData(data_dir, cache_dir=tmp / 'cache')
+
+        t0 = time.perf_counter()
+        build_enriched_pqr(data_dir)
+        _report('reconstrucción completa', {'build_enriched_pqr': time.perf_counter() - t0})
+
+        _report('primera carga', fuente.refresh())
+        _report('sin cambios', fuente.refresh())
+
+        sticker = fuente.df.loc[fuente.df['Ejecutada'] == 'NO', 'Sticker'].iloc[0]
+        _touch(data_dir / EJECUTADAS_FILE, f"9999,{sticker},YA EJECUTADA")
+        _report(f'cambia {EJECUTADAS_FILE}', fuente.refresh())
+
+        esperado, _ = build_enriched_pqr(data_dir)
+        pd.testing.assert_frame_equal(fuente.df, esperado)
+        assert (fuente.df.loc[fuente.df['Sticker'] == sticker, 'Ejecutada'] == 'SI').all()
+
+        _touch(data_dir / INVENTARIO_FILE)
+        _report(f'cambia {INVENTARIO_FILE}', fuente.refresh())
+        _touch(data_dir / CAM_FILE)
+        _report(f'cambia {CAM_FILE}', fuente.refresh())
+
+        esperado, cam_esperado = build_enriched_pqr(data_dir)
+        pd.testing.assert_frame_equal(fuente.df, esperado)
+        pd.testing.assert_frame_equal(fuente.cam_layer, cam_esperado)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
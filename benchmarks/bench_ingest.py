@@ -0,0 +1,54 @@
+"""
+Ingesta de los libros XLSX: pd.read_excel (openpyxl en modo normal) frente a
+la lectura en streaming de podas.ingest, y lectura de las tablas de data/
+desde el CSV frente al Parquet que escribe la herramienta.
+
+    python -m benchmarks.bench_ingest
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from podas.ingest import WORKBOOKS, ingest_workbooks, read_sheet, sheet_names
+
+DATA_DIR = Path('data')
+
+
+def _timed(func):
+    t0 = time.perf_counter()
+    resultado = func()
+    return resultado, time.perf_counter() - t0
+
+
+def main():
+    libros = [Path(nombre) for nombre in WORKBOOKS if Path(nombre).exists()]
+
+    print(f"{'libro':<28} | {'filas':>6} | {'read_excel':>10} | {'streaming':>10}")
+    for libro in libros:
+        hoja = sheet_names(libro)[0]
+        _, t_excel = _timed(lambda: pd.read_excel(libro, sheet_name=hoja))
+        df, t_stream = _timed(lambda: read_sheet(libro, hoja))
+        print(f"{libro.name:<28} | {len(df):>6,} | {t_excel:8.2f} s | {t_stream:8.2f} s")
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        for workers in (1, None):
+            estadisticas, total = _timed(lambda: ingest_workbooks(libros, carpeta, workers=workers))
+            filas = int(estadisticas.drop_duplicates(['libro', 'hoja'])['filas'].sum())
+            etiqueta = 'un proceso' if workers == 1 else 'pool'
+            print(f"ingesta completa ({etiqueta}): {filas:,} filas en {total:.2f} s ({filas / total:,.0f} filas/s)")
+
+        print(f"\n{'tabla':<36} | {'CSV':>8} | {'Parquet':>8}")
+        for csv in sorted(DATA_DIR.glob('*.csv')):
+            parquet = Path(carpeta) / (csv.stem + '.parquet')
+            if not parquet.exists():
+                continue
+            _, t_csv = _timed(lambda: pd.read_csv(csv, low_memory=False))
+            _, t_parquet = _timed(lambda: pd.read_parquet(parquet))
+            print(f"{csv.stem:<36} | {t_csv * 1000:5.1f} ms | {t_parquet * 1000:5.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
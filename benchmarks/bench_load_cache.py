@@ -0,0 +1,55 @@
+"""
+Carga en frío (CSV + cruces) frente a carga en caliente (caché Parquet) de app_v2.
+
+    python -m benchmarks.bench_load_cache
+"""
+
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from podas.datasets import build_enriched_pqr, load_enriched_pqr
+
+
+def _best_of(func, repeat):
+    tiempos = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        resultado = func()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos), resultado
+
+
+def main(repeat=5):
+    cache_dir = Path(tempfile.mkdtemp()) / 'app_v2'
+    try:
+        frio, (df, cam_layer) = _best_of(lambda: build_enriched_pqr(), repeat)
+
+        t0 = time.perf_counter()
+        _, desde_cache = load_enriched_pqr(cache_dir=cache_dir)
+        primera = time.perf_counter() - t0
+        assert not desde_cache
+
+        caliente, ((df_cache, cam_cache), desde_cache) = _best_of(
+            lambda: load_enriched_pqr(cache_dir=cache_dir), repeat
+        )
+        assert desde_cache
+
+        pd.testing.assert_frame_equal(df.reset_index(drop=True), df_cache, check_dtype=False)
+        pd.testing.assert_frame_equal(cam_layer.reset_index(drop=True), cam_cache, check_dtype=False)
+        tamano = sum(f.stat().st_size for f in cache_dir.iterdir())
+
+        print(f"filas: {len(df):,} PQR enriquecidos, {len(cam_layer):,} CAM")
+        print(f"frío (CSV + cruces):                {frio * 1000:8.1f} ms")
+        print(f"primera carga (CSV + escribir caché): {primera * 1000:6.1f} ms")
+        print(f"caliente (huella + Parquet):        {caliente * 1000:8.1f} ms  ({frio / caliente:.1f}x)")
+        print(f"tamaño de la caché:                 {tamano / 1024:8.1f} KiB")
+    finally:
+        shutil.rmtree(cache_dir.parent, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Caché LRU del HTML del mapa (podas.map_cache): costo de construir el mapa
+frente a servirlo desde la caché, en una secuencia de filtros donde unas pocas
+combinaciones se repiten mucho (como en el uso real del tablero).
+
+    python -m benchmarks.bench_map_cache
+"""
+
+import time
+
+import folium
+import numpy as np
+
+from podas.datasets import load_enriched_pqr
+from podas.map_cache import MapHtmlCache, filter_key
+from podas.map_layers import ZoomSwitch, add_density_layer, add_point_layer
+
+CONSULTAS = 200
+
+
+def build_map_html(pqr, cam, comunas, con_cam):
+    """Mapa como el de app_v2: PQR, capa CAM agrupada y hexágonos de densidad."""
+    if comunas:
+        pqr = pqr[pqr['Comuna'].isin(comunas)]
+        cam = cam[cam['Comuna'].isin(comunas)]
+    m = folium.Map(location=[2.94, -75.29], zoom_start=12, tiles="CartoDB positron")
+    capas = [add_point_layer(m, pqr, ['ID_Luminaria', 'Sticker', 'Comuna', 'Inventariado'],
+                             popup='{Sticker}', control=False)]
+    if con_cam:
+        capas.append(add_point_layer(m, cam, ['ID_Luminaria', 'Sticker', 'NOMBRE COMÚN'],
+                                     popup='{Sticker}', control=False, colocated='group'))
+    densidad = add_density_layer(m, {'PQR': pqr, 'Árboles': cam if con_cam else cam.iloc[0:0]}, control=False)
+    ZoomSwitch([densidad], capas).add_to(m)
+    return m.get_root().render(), {}
+
+
+def main():
+    (pqr, cam), _ = load_enriched_pqr()
+    comunas = sorted(pqr['Comuna'].dropna().unique())
+
+    # Estados de filtro con popularidad tipo Zipf: "todas las comunas" es el más visto
+    rng = np.random.default_rng(0)
+    estados = [([], True), ([], False)] + [([c], True) for c in comunas] + [([c], False) for c in comunas]
+    pesos = 1 / np.arange(1, len(estados) + 1)
+    secuencia = rng.choice(len(estados), CONSULTAS, p=pesos / pesos.sum())
+
+    cache = MapHtmlCache(max_entries=8)
+    t_fallos, t_aciertos = [], []
+    for indice in secuencia:
+        comunas_sel, con_cam = estados[indice]
+        clave = filter_key(version=1, comunas=comunas_sel, cam=con_cam)
+        t0 = time.perf_counter()
+        _, _, desde_cache = cache.get_or_build(clave, lambda: build_map_html(pqr, cam, comunas_sel, con_cam))
+        (t_aciertos if desde_cache else t_fallos).append(time.perf_counter() - t0)
+
+    sin_cache = sum(t_fallos) / len(t_fallos) * CONSULTAS
+    con_cache = sum(t_fallos) + sum(t_aciertos)
+    estadisticas = cache.stats()
+    print(f"{CONSULTAS} reruns, {len(estados)} combinaciones de filtros, LRU de {cache.max_entries} mapas")
+    print(f"construir el mapa (fallo):  {np.mean(t_fallos) * 1000:8.1f} ms promedio")
+    print(f"servir desde caché (acierto): {np.mean(t_aciertos) * 1000:6.3f} ms promedio")
+    print(f"aciertos {estadisticas['hits']} / fallos {estadisticas['misses']} "
+          f"(tasa {estadisticas['hit_rate']:.0%}), {estadisticas['bytes'] / 1e6:.1f} MB en caché")
+    print(f"tiempo total de mapas: {sin_cache:6.2f} s sin caché -> {con_cache:6.2f} s con caché")
+
+
+if __name__ == '__main__':
+    main()
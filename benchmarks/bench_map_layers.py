@@ -0,0 +1,130 @@
+"""
+Compara la construcción del mapa con un folium.CircleMarker por fila contra la
+capa GeoJSON única (podas.map_layers), con las capas PQR y de inventario
+forestal de data/. Mide tiempo de construcción + serialización y tamaño HTML.
+
+    python -m benchmarks.bench_map_layers
+"""
+
+import re
+import time
+
+import folium
+import pandas as pd
+
+from podas.coordinates import clean_coordinate_columns
+from podas.map_layers import add_point_layer
+
+ESTILO_INVENTARIO = {
+    'radius': 6, 'color': 'blue', 'weight': 1, 'fill': True,
+    'fillColor': 'blue', 'fillOpacity': 0.6
+}
+POPUP_INVENTARIO = (
+    "<b>Sticker:</b> {Sticker}<br>"
+    "<b>Nombre común:</b> {Nombre_comun}<br>"
+    "<b>Nombre científico:</b> {NOMBRE CIENTIFICO}<br>"
+    "<b>Altura (m):</b> {HT(m)}<br>"
+    "<b>CAP (cm):</b> {CAP(cm)}"
+)
+POPUP_PQR = (
+    "<b>Sticker:</b> {Sticker}<br>"
+    "<b>P.Q.R.S:</b> {P.Q.R.S}<br>"
+    "<b>Comuna:</b> {Comuna}<br>"
+    "<b>Inventariado:</b> {Inventariado}<br>"
+    "<b>Requiere Acción:</b> {Requiere_Acción}"
+)
+
+
+def load_frames():
+    pqr = pd.read_csv('data/pqr_pendientes_georreferenciadas.csv', dtype={'Sticker': str})
+    inventario = pd.read_csv('data/Inventario_forestal.csv', dtype={'Sticker': str})
+    clean_coordinate_columns(pqr)
+    clean_coordinate_columns(inventario)
+    return pqr, inventario.dropna(subset=['Latitud', 'Longitud'])
+
+
+def fill(plantilla, row):
+    return re.sub(r'\{([^{}]+)\}', lambda campo: str(row.get(campo.group(1), 'N/A')), plantilla)
+
+
+def build_per_row(pqr, inventario):
+    """Construcción original: un CircleMarker por fila."""
+    m = folium.Map(location=[2.94, -75.30], zoom_start=12)
+    for _, row in pqr.iterrows():
+        color = '#70e000' if str(row.get('Inventariado', 'NO')).upper() == 'SI' else '#d80032'
+        size = 8 if str(row.get('Requiere_Acción', 'NO')).upper() == 'SI' else 6
+        popup_text = fill(POPUP_PQR, row)
+        folium.CircleMarker(
+            location=[float(row['Latitud']), float(row['Longitud'])],
+            radius=size, popup=folium.Popup(popup_text, max_width=300),
+            color='black', weight=1, fill=True, fillColor=color, fillOpacity=0.7,
+            tooltip=f"Sticker: {row.get('Sticker', 'N/A')}"
+        ).add_to(m)
+    for _, row in inventario.iterrows():
+        popup_text = fill(POPUP_INVENTARIO, row)
+        folium.CircleMarker(
+            location=[float(row['Latitud']), float(row['Longitud'])],
+            popup=folium.Popup(popup_text, max_width=300),
+            tooltip=f"Inventario - Sticker: {row.get('Sticker', 'N/A')}",
+            **ESTILO_INVENTARIO
+        ).add_to(m)
+    return m
+
+
+def build_geojson(pqr, inventario, colocated=None):
+    """Construcción con una capa GeoJSON por DataFrame."""
+    m = folium.Map(location=[2.94, -75.30], zoom_start=12)
+    add_point_layer(
+        m, pqr,
+        fields=['Sticker', 'P.Q.R.S', 'Comuna', 'Inventariado', 'Requiere_Acción'],
+        base_style={'color': 'black', 'weight': 1, 'fill': True, 'fillOpacity': 0.7},
+        styles={
+            'Inventariado': {'SI': {'fillColor': '#70e000'}, '*': {'fillColor': '#d80032'}},
+            'Requiere_Acción': {'SI': {'radius': 8}, '*': {'radius': 6}},
+        },
+        popup=POPUP_PQR, tooltip='Sticker: {Sticker}', control=False
+    )
+    capa = add_point_layer(
+        m, inventario,
+        fields=['Sticker', 'Nombre_comun', 'NOMBRE CIENTIFICO', 'HT(m)', 'CAP(cm)'],
+        base_style=ESTILO_INVENTARIO,
+        popup=POPUP_INVENTARIO, tooltip='Inventario - Sticker: {Sticker}', control=False,
+        colocated=colocated
+    )
+    m.markers = len(capa.data['features'])
+    return m
+
+
+def build_geojson_grouped(pqr, inventario):
+    """Como build_geojson, con los árboles de coordenadas repetidas en un solo marcador."""
+    return build_geojson(pqr, inventario, colocated='group')
+
+
+def measure(builder, pqr, inventario):
+    t0 = time.perf_counter()
+    m = builder(pqr, inventario)
+    t_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    html = m.get_root().render()
+    t_render = time.perf_counter() - t0
+    return t_build, t_render, len(html.encode('utf-8')), getattr(m, 'markers', len(inventario))
+
+
+def main():
+    pqr, inventario = load_frames()
+    print(f"PQR: {len(pqr):,} puntos | Inventario forestal: {len(inventario):,} puntos")
+    resultados = {}
+    for nombre, builder in [('CircleMarker por fila', build_per_row),
+                            ('GeoJSON por capa', build_geojson),
+                            ('GeoJSON agrupado', build_geojson_grouped)]:
+        t_build, t_render, size, marcadores = measure(builder, pqr, inventario)
+        resultados[nombre] = (t_build + t_render, size)
+        print(f"{nombre:<22} | construcción: {t_build * 1000:8.1f} ms | "
+              f"render HTML: {t_render * 1000:8.1f} ms | HTML: {size / 1e6:6.2f} MB | "
+              f"marcadores inventario: {marcadores:,}")
+    (t_a, s_a), (t_b, s_b), _ = resultados.values()
+    print(f"Mejora: tiempo x{t_a / t_b:.1f} | tamaño x{s_a / s_b:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Memoria por sesión de los DataFrames cargados, antes y después del esquema
+compacto (podas.schema). st.cache_data serializa con pickle y entrega una
+copia por sesión: se mide también el tamaño y el tiempo de esa copia.
+
+    python -m benchmarks.bench_memory
+"""
+
+import pickle
+import time
+
+import pandas as pd
+
+from podas.coordinates import clean_coordinate_columns
+from podas.datasets import (CAM_FILE, DATA_DIR, INVENTARIO_FILE, PQR_FILE, flag_ejecutadas, merge_sources,
+                            read_sources)
+from podas.keys import canonical_sticker
+from podas.schema import compact_frame, memory_report
+
+
+def _copy_cost(df, repeat=5):
+    """Bytes y mejor tiempo de la copia pickle que st.cache_data hace por sesión."""
+    datos = pickle.dumps(df)
+    mejor = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        pickle.loads(pickle.dumps(df))
+        mejor = min(mejor, time.perf_counter() - t0)
+    return len(datos), mejor
+
+
+def _podas_2025_frame(nombre):
+    """DataFrame como lo carga Podas_2025/app.py antes de compactar."""
+    df = pd.read_csv(DATA_DIR / nombre, dtype={'Sticker': str})
+    df['Sticker'] = canonical_sticker(df['Sticker'])
+    clean_coordinate_columns(df)
+    return df
+
+
+def main():
+    etapas, crosswalk = read_sources()
+    cam_clean, cam_layer = etapas[CAM_FILE]
+    df, cam_layer = merge_sources(etapas[PQR_FILE], cam_clean, cam_layer, etapas[INVENTARIO_FILE], crosswalk)
+    flag_ejecutadas(df, crosswalk)
+
+    tablas = {
+        'app_v2 PQR': df,
+        'app_v2 CAM': cam_layer,
+        'Podas_2025 PQR': _podas_2025_frame(PQR_FILE),
+        'Podas_2025 inventario': _podas_2025_frame(INVENTARIO_FILE),
+    }
+    compactas = {nombre: compact_frame(tabla) for nombre, tabla in tablas.items()}
+    pd.set_option('display.width', 140)
+    print(memory_report(tablas, compactas).to_string(index=False))
+    print()
+    for nombre in tablas:
+        bytes_antes, t_antes = _copy_cost(tablas[nombre])
+        bytes_despues, t_despues = _copy_cost(compactas[nombre])
+        print(f"{nombre:<22} copia por sesión: {bytes_antes / 1e6:6.2f} MB {t_antes * 1000:6.2f} ms -> "
+              f"{bytes_despues / 1e6:6.2f} MB {t_despues * 1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Tiempo y longitud de la ruta optimizada frente al orden por Comuna y Latitud.
+
+    python -m benchmarks.bench_routing
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import random_points
+from podas.routing import plan_route
+
+
+def main(sizes=(500, 1_500, 3_000)):
+    pqr = pd.read_csv('data/pqr_pendientes_georreferenciadas.csv')
+    frames = [('PQR data/', pqr)]
+    for n in sizes:
+        lat, lon = random_points(n)
+        comunas = np.char.add('COMUNA ', np.char.zfill((np.arange(n) % 10 + 1).astype(str), 2))
+        frames.append((f'sintético {n:,}', pd.DataFrame({'Comuna': comunas, 'Latitud': lat, 'Longitud': lon})))
+
+    for nombre, df in frames:
+        t0 = time.perf_counter()
+        _, resumen = plan_route(df)
+        elapsed = time.perf_counter() - t0
+        print(f"{nombre:<16} | {resumen['puntos']:>5,} puntos | {elapsed * 1000:7.1f} ms | "
+              f"ruta: {resumen['km_ruta']:8.1f} km | orden actual: {resumen['km_orden_actual']:9.1f} km | "
+              f"ahorro: {resumen['ahorro_pct']:5.1f} %")
+
+
+if __name__ == '__main__':
+    main()
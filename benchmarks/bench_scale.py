@@ -0,0 +1,311 @@
+"""
+Escalabilidad del pipeline de podas con datos sintéticos de 10k, 100k y 1M
+árboles (benchmarks.synthetic.write_dataset: las cuatro fuentes con las
+columnas y proporciones de data/).
+
+Cada etapa se mide dos veces: una para el tiempo y otra bajo tracemalloc para
+el pico de memoria (tracemalloc frena la ejecución, así que no se mezcla con
+el tiempo). Las etapas se agrupan en:
+
+- carga: lo que hacen load_data (app_v2) y load_pqr_data /
+  load_inventario_data (Podas_2025) la primera vez, antes de quedar en caché
+- indices: FilterIndex y CountsCube, una vez por versión de los datos
+- rerun: lo que se repite en cada interacción (filtros, conteos, mapa)
+
+Una app deja de ser interactiva cuando la suma de sus etapas de rerun supera
+el presupuesto (--presupuesto, 1 s por defecto). Los resultados se escriben en
+JSON con la versión del código y de las librerías; --comparar muestra la
+razón frente a un JSON anterior con los mismos tamaños y semilla.
+
+    python -m benchmarks.bench_scale
+    python -m benchmarks.bench_scale --tamanos 10000 100000 --comparar benchmarks/results/anterior.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_dataset
+from podas.cube import CountsCube
+from podas.datasets import (CAM_FILE, EJECUTADAS_FILE, INVENTARIO_FILE, PQR_FILE, flag_ejecutadas, merge_sources,
+                            read_cam, read_ejecutadas, read_inventario, read_pqr)
+from podas.filters import FilterIndex
+from podas.keys import Crosswalk
+from podas.loaders import load_inventario, load_pqr
+from podas.schema import compact_frame
+
+# Cambia cuando cambian las etapas o el generador: solo se comparan resultados con la misma versión
+SUITE_VERSION = 1
+TAMANOS = (10_000, 100_000, 1_000_000)
+DATOS_DIR = Path('.cache') / 'bench_scale'
+RESULTADOS_DIR = Path('benchmarks') / 'results'
+# Por encima de estos puntos el mapa no se construye (el HTML pasa de cientos de MB)
+MAX_PUNTOS_MAPA = 300_000
+# Comunas elegidas en el rerun de ejemplo
+COMUNAS_FILTRO = ['COMUNA 01', 'COMUNA 02', 'COMUNA 03']
+
+
+def _measure(func, memoria=True):
+    """Ejecuta func y devuelve (resultado, segundos, pico de memoria en bytes o None)."""
+    t0 = time.perf_counter()
+    resultado = func()
+    segundos = time.perf_counter() - t0
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            func()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def _map_html(pqr, arboles, campos_pqr, campos_arboles):
+    """Mapa como el de las apps: puntos PQR, árboles agrupados por coordenada y densidad."""
+    import folium
+    from podas.map_layers import ZoomSwitch, add_density_layer, add_point_layer
+
+    m = folium.Map(location=[2.94, -75.30], zoom_start=12)
+    capa_pqr = add_point_layer(
+        m, pqr, fields=campos_pqr,
+        base_style={'radius': 6, 'color': 'black', 'weight': 1, 'fill': True, 'fillOpacity': 0.7},
+        styles={'Inventariado': {'SI': {'fillColor': '#70e000'}, '*': {'fillColor': '#d80032'}}},
+        popup='<b>Sticker:</b> {Sticker}', tooltip='{Sticker}', control=False
+    )
+    capa_arboles = add_point_layer(
+        m, arboles, fields=campos_arboles,
+        base_style={'radius': 5, 'color': 'blue', 'weight': 1, 'fill': True, 'fillColor': 'blue'},
+        popup='<b>Sticker:</b> {Sticker}', tooltip='{Sticker}', control=False,
+        colocated='group', group_label='árboles en este punto'
+    )
+    capa_densidad = add_density_layer(m, {'PQR': pqr, 'Árboles': arboles}, size_m=250,
+                                      popup='{Total} puntos', control=False)
+    ZoomSwitch([capa_densidad], [capa_pqr, capa_arboles], zoom=15).add_to(m)
+    return m.get_root().render()
+
+
+class ScaleRun:
+    """
+    Mide las etapas de un tamaño y acumula los resultados.
+
+    Args:
+        memoria: Si se mide el pico de memoria de cada etapa
+    """
+
+    def __init__(self, memoria=True):
+        self.memoria = memoria
+        self.etapas = []
+
+    def stage(self, grupo, app, nombre, func, filas=None):
+        """Mide una etapa y devuelve su resultado."""
+        resultado, segundos, pico = _measure(func, memoria=self.memoria)
+        self.etapas.append({
+            'grupo': grupo,
+            'app': app,
+            'etapa': nombre,
+            'segundos': round(segundos, 6),
+            'pico_mb': None if pico is None else round(pico / 1e6, 2),
+            'filas': filas if filas is not None else (len(resultado) if hasattr(resultado, '__len__') else None),
+        })
+        print(f"  {grupo:<7} | {app:<10} | {nombre:<26} | {segundos * 1000:10.1f} ms"
+              + ('' if pico is None else f" | pico {pico / 1e6:8.1f} MB"))
+        return resultado
+
+    def skip(self, grupo, app, nombre, motivo):
+        """Registra una etapa que no se ejecutó."""
+        self.etapas.append({'grupo': grupo, 'app': app, 'etapa': nombre, 'omitida': motivo})
+        print(f"  {grupo:<7} | {app:<10} | {nombre:<26} | omitida: {motivo}")
+
+    def rerun_seconds(self):
+        """Segundos de las etapas de rerun por app (None si alguna se omitió)."""
+        totales = {}
+        for etapa in self.etapas:
+            if etapa['grupo'] != 'rerun':
+                continue
+            actual = totales.get(etapa['app'], 0.0)
+            totales[etapa['app']] = None if actual is None or 'omitida' in etapa else actual + etapa['segundos']
+        return totales
+
+
+def run_size(data_dir, memoria=True, max_puntos_mapa=MAX_PUNTOS_MAPA):
+    """
+    Ejecuta todas las etapas sobre los CSV de data_dir.
+
+    Returns:
+        ScaleRun con las etapas medidas
+    """
+    run = ScaleRun(memoria=memoria)
+    ignorar = lambda mensaje: None
+
+    # app_v2: etapas de podas.datasets (build_enriched_pqr) una por una
+    pqr = run.stage('carga', 'app_v2', 'read_pqr', lambda: read_pqr(data_dir))
+    ejecutadas = run.stage('carga', 'app_v2', 'read_ejecutadas', lambda: read_ejecutadas(data_dir, warn=ignorar))
+    cam_clean, cam_layer = run.stage('carga', 'app_v2', 'read_cam', lambda: read_cam(data_dir, warn=ignorar))
+    inventario = run.stage('carga', 'app_v2', 'read_inventario', lambda: read_inventario(data_dir, warn=ignorar))
+
+    def crosswalk():
+        indice = Crosswalk()
+        for nombre, tabla in [('pqr', pqr), ('ejecutadas', ejecutadas), ('cam', cam_clean), ('forestal', inventario)]:
+            indice.add(nombre, tabla)
+        return indice
+    claves = run.stage('carga', 'app_v2', 'Crosswalk', crosswalk, filas=len(pqr))
+    df, cam = run.stage('carga', 'app_v2', 'merge_sources',
+                        lambda: merge_sources(pqr, cam_clean, cam_layer, inventario, claves, warn=ignorar),
+                        filas=len(pqr))
+    df = run.stage('carga', 'app_v2', 'flag_ejecutadas + compact',
+                   lambda: compact_frame(flag_ejecutadas(df.copy(), claves)))
+    cam = run.stage('carga', 'app_v2', 'compact CAM', lambda: compact_frame(cam))
+
+    # Podas_2025: load_pqr_data y load_inventario_data (podas.loaders)
+    pqr_2025 = run.stage('carga', 'Podas_2025', 'load_pqr_data', lambda: load_pqr(Path(data_dir) / PQR_FILE))
+    inv_2025 = run.stage('carga', 'Podas_2025', 'load_inventario_data',
+                         lambda: load_inventario(Path(data_dir) / INVENTARIO_FILE))
+
+    columnas_filtro = {'Comuna': 'exact', 'NOMBRE COMÚN': 'lower'}
+    filtros_pqr = run.stage('indices', 'app_v2', 'FilterIndex PQR', lambda: FilterIndex(df, columnas_filtro),
+                            filas=len(df))
+    filtros_cam = run.stage('indices', 'app_v2', 'FilterIndex CAM', lambda: FilterIndex(cam, columnas_filtro),
+                            filas=len(cam))
+    cubo = run.stage('indices', 'app_v2', 'CountsCube', lambda: CountsCube(df), filas=len(df))
+    filtros_2025 = run.stage('indices', 'Podas_2025', 'FilterIndex PQR', lambda: FilterIndex(pqr_2025, {
+        'Comuna': 'exact', 'Inventariado': 'upper', 'Requiere_Acción': 'upper',
+    }), filas=len(pqr_2025))
+    cubo_2025 = run.stage('indices', 'Podas_2025', 'CountsCube', lambda: CountsCube(pqr_2025), filas=len(pqr_2025))
+
+    seleccion = {'Comuna': COMUNAS_FILTRO}
+    df_f = run.stage('rerun', 'app_v2', 'filtros PQR', lambda: filtros_pqr.apply(df, seleccion))
+    cam_f = run.stage('rerun', 'app_v2', 'filtros CAM', lambda: filtros_cam.apply(
+        cam, {columna: valores for columna, valores in seleccion.items() if columna in filtros_cam}
+    ))
+    run.stage('rerun', 'app_v2', 'conteos', lambda: (cubo.counts('Inventariado', seleccion),
+                                                     cubo.counts('Comuna', seleccion)), filas=len(df_f))
+    pqr_2025_f = run.stage('rerun', 'Podas_2025', 'filtros PQR', lambda: filtros_2025.apply(pqr_2025, seleccion))
+    run.stage('rerun', 'Podas_2025', 'conteos',
+              lambda: cubo_2025.crosstab('Comuna', 'Inventariado', seleccion), filas=len(pqr_2025_f))
+
+    # Mapa: construcción + serialización a HTML (un fallo de caché en podas.map_cache)
+    # Podas_2025 muestra solo los árboles de los stickers de las comunas elegidas
+    cam_f = cam_f.rename(columns={'Lat': 'Latitud', 'Long': 'Longitud'})
+    inv_2025_f = inv_2025[inv_2025['Sticker'].isin(pqr_2025_f['Sticker'].unique())]
+    mapas = [
+        ('app_v2', df_f, cam_f, ['ID_Luminaria', 'Sticker', 'Comuna', 'Inventariado'],
+         ['ID_Luminaria', 'Sticker', 'NOMBRE COMÚN']),
+        ('Podas_2025', pqr_2025_f, inv_2025_f, ['Sticker', 'P.Q.R.S', 'Comuna', 'Inventariado', 'Requiere_Acción'],
+         ['Sticker', 'Nombre_comun', 'NOMBRE CIENTIFICO', 'HT(m)', 'CAP(cm)']),
+    ]
+    for app, puntos, arboles, campos, campos_arboles in mapas:
+        if len(puntos) + len(arboles) > max_puntos_mapa:
+            run.skip('rerun', app, 'mapa HTML', f"{len(puntos) + len(arboles):,} puntos > {max_puntos_mapa:,}")
+            continue
+        run.stage('rerun', app, 'mapa HTML', lambda: _map_html(puntos, arboles, campos, campos_arboles),
+                  filas=len(puntos) + len(arboles))
+    return run
+
+
+def _metadata(seed):
+    """Versión del código, de las librerías y del equipo, para comparar resultados en el tiempo."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versiones = {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__}
+    for modulo in ('pyarrow', 'folium'):
+        try:
+            versiones[modulo] = __import__(modulo).__version__
+        except ImportError:
+            versiones[modulo] = None
+    return {
+        'suite_version': SUITE_VERSION,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'semilla': seed,
+        'versiones': versiones,
+        'equipo': {'plataforma': platform.platform(), 'cpus': os.cpu_count()},
+    }
+
+
+def _dataset(n, seed, datos_dir):
+    """Carpeta con los CSV sintéticos de n árboles; se reutiliza si ya se generó."""
+    carpeta = Path(datos_dir) / f"v{SUITE_VERSION}_{n}_{seed}"
+    if not all((carpeta / nombre).exists() for nombre in (PQR_FILE, EJECUTADAS_FILE, CAM_FILE, INVENTARIO_FILE)):
+        t0 = time.perf_counter()
+        filas = write_dataset(carpeta, n, seed=seed)
+        print(f"  datos generados en {time.perf_counter() - t0:.1f} s: "
+              + ", ".join(f"{nombre} {cantidad:,}" for nombre, cantidad in filas.items()))
+    return carpeta
+
+
+def compare(actual, anterior):
+    """Imprime la razón de tiempos frente a un resultado anterior (>1 = más lento ahora)."""
+    if anterior.get('suite_version') != actual['suite_version'] or anterior.get('semilla') != actual['semilla']:
+        print("El resultado anterior usa otra versión de la suite o otra semilla: no se compara")
+        return
+    previos = {
+        (t['arboles'], e['grupo'], e['app'], e['etapa']): e.get('segundos')
+        for t in anterior['tamanos'] for e in t['etapas']
+    }
+    print(f"\nFrente a {anterior.get('commit')} ({anterior.get('fecha')}):")
+    for tamano in actual['tamanos']:
+        for etapa in tamano['etapas']:
+            antes = previos.get((tamano['arboles'], etapa['grupo'], etapa['app'], etapa['etapa']))
+            if antes and etapa.get('segundos'):
+                print(f"  {tamano['arboles']:>9,} | {etapa['app']:<10} | {etapa['etapa']:<26} | "
+                      f"{antes * 1000:10.1f} ms -> {etapa['segundos'] * 1000:10.1f} ms | "
+                      f"x{etapa['segundos'] / antes:5.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_scale', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tamanos', type=int, nargs='+', default=list(TAMANOS), help='Árboles por conjunto')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--presupuesto', type=float, default=1.0,
+                        help='Segundos de rerun por encima de los cuales la app deja de ser interactiva')
+    parser.add_argument('--max-puntos-mapa', type=int, default=MAX_PUNTOS_MAPA)
+    parser.add_argument('--sin-memoria', action='store_true', help='No medir el pico de memoria (la mitad de tiempo)')
+    parser.add_argument('--datos', default=str(DATOS_DIR), help='Carpeta de los CSV sintéticos generados')
+    parser.add_argument('--salida', default=None, help='JSON de resultados (por defecto, en benchmarks/results)')
+    parser.add_argument('--comparar', default=None, help='JSON de un resultado anterior')
+    args = parser.parse_args(argv)
+
+    resultados = dict(_metadata(args.semilla), presupuesto_rerun_s=args.presupuesto, tamanos=[])
+    for n in sorted(args.tamanos):
+        print(f"\n{n:,} árboles")
+        carpeta = _dataset(n, args.semilla, args.datos)
+        run = run_size(carpeta, memoria=not args.sin_memoria, max_puntos_mapa=args.max_puntos_mapa)
+        rerun = run.rerun_seconds()
+        interactiva = {app: None if s is None else s <= args.presupuesto for app, s in rerun.items()}
+        resultados['tamanos'].append({'arboles': n, 'etapas': run.etapas, 'rerun_s': rerun, 'interactiva': interactiva})
+
+    print(f"\nRerun (filtros + conteos + mapa) frente al presupuesto de {args.presupuesto:.1f} s:")
+    for tamano in resultados['tamanos']:
+        for app, segundos in tamano['rerun_s'].items():
+            estado = ('sin medir (mapa omitido)' if segundos is None
+                      else f"{segundos:6.2f} s -> {'interactiva' if tamano['interactiva'][app] else 'NO interactiva'}")
+            print(f"  {tamano['arboles']:>9,} árboles | {app:<10} | {estado}")
+
+    salida = Path(args.salida) if args.salida else (
+        RESULTADOS_DIR / f"scale_{resultados['fecha'][:10]}_{resultados['commit'] or 'sin_commit'}.json"
+    )
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(resultados, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\nResultados -> {salida}")
+
+    if args.comparar:
+        compare(resultados, json.loads(Path(args.comparar).read_text(encoding='utf-8')))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
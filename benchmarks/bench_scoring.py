@@ -0,0 +1,178 @@
+"""
+Compara el precálculo de valoraciones de esip_2025/App.py con apply por fila
+y por mes (18 columnas de texto) contra el motor de indicadores.scoring, y
+comprueba que etiquetas y colores sean idénticos. Incluye los CSV reales de
+esip_2025/ si están disponibles. También mide la latencia del simulador de
+umbrales (re-valorar todo y contar los badges que cambian) contra el
+presupuesto de PRESUPUESTO_SIMULADOR_MS.
+
+    python -m benchmarks.bench_scoring
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import indicator_frame
+from indicadores import scoring
+from indicadores.cleaning import clean_month_block
+
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto', 'Septiembre']
+ESIP_DIR = Path(__file__).resolve().parent.parent / 'esip_2025'
+# Latencia máxima (p95) del simulador para usarlo en vivo
+PRESUPUESTO_SIMULADOR_MS = 50
+
+
+def valorar_porcentaje(val, indicador):
+    """Implementación fila a fila original de esip_2025/App.py (referencia)."""
+    if pd.isna(val):
+        return "N/A", "gray"
+    ind_norm = (indicador or "").strip().casefold()
+    if ind_norm in ['tasa de accidentes laborales', 'prevalencia de enfermedades']:
+        return ("Alto", "green") if float(val) == 0 else ("Bajo", "red")
+    v = float(val)
+    if v >= 90: return "Alto", "green"
+    elif v >= 80: return "Medio", "orange"
+    else: return "Bajo", "red"
+
+
+def valorar_numerico(actual, anterior, tipo):
+    """Implementación fila a fila original de esip_2025/App.py (referencia)."""
+    tipo = (tipo or "NEU").upper()
+    if tipo == "NEU":
+        return "N/A", "gray"
+    if pd.isna(actual) or pd.isna(anterior) or anterior == 0:
+        return "N/A", "gray"
+    cambio = (actual - anterior) / anterior * 100.0
+    if tipo == "POS":
+        if cambio >= 5:      return "Alto", "green"
+        elif cambio >= -5:   return "Medio", "orange"
+        else:                return "Bajo", "red"
+    if tipo == "NEG":
+        if cambio <= -10:    return "Alto", "green"
+        elif cambio <= 10:   return "Medio", "orange"
+        else:                return "Bajo", "red"
+    return "N/A", "gray"
+
+
+def score_apply(df_perc, df_num):
+    """Precálculo original: dos columnas de texto por mes en cada DataFrame."""
+    for m in MESES:
+        vals = df_perc.apply(lambda r: valorar_porcentaje(r[m], r['Indicador']), axis=1)
+        df_perc[f"{m}_Val"] = [v[0] for v in vals]
+        df_perc[f"{m}_Color"] = [v[1] for v in vals]
+    for i, m in enumerate(MESES):
+        if i == 0:
+            df_num[f"{m}_Val"] = "N/A"
+            df_num[f"{m}_Color"] = "gray"
+        else:
+            ant = MESES[i - 1]
+            vals = df_num.apply(lambda r: valorar_numerico(r[m], r[ant], r['Tipo']), axis=1)
+            df_num[f"{m}_Val"] = [v[0] for v in vals]
+            df_num[f"{m}_Color"] = [v[1] for v in vals]
+
+
+def score_vector(df_perc, df_num):
+    val_perc = scoring.score_percentages(df_perc[MESES].to_numpy(dtype='float64'),
+                                         scoring.zero_target_mask(df_perc['Indicador']))
+    val_num = scoring.score_month_over_month(df_num[MESES].to_numpy(dtype='float64'), df_num['Tipo'])
+    return val_perc, val_num
+
+
+def synthetic_frames(n, seed=0):
+    """Indicadores limpios con ceros, vacíos, excepciones de accidentalidad y los tres Tipos."""
+    rng = np.random.default_rng(seed)
+    df_perc = indicator_frame(n, 'porcentaje', seed)
+    clean_month_block(df_perc, MESES, 'porcentaje')
+    cero = rng.random(n) < 0.05
+    df_perc.loc[cero, 'Indicador'] = rng.choice([' Tasa de accidentes laborales', 'Prevalencia de enfermedades '],
+                                                int(cero.sum()))
+    df_perc.loc[cero, MESES] = np.where(rng.random((int(cero.sum()), len(MESES))) < 0.5, 0.0,
+                                        df_perc.loc[cero, MESES])
+    df_num = indicator_frame(n, 'numero', seed + 1)
+    clean_month_block(df_num, MESES, 'numero')
+    df_num[MESES] = df_num[MESES].mask(rng.random((n, len(MESES))) < 0.05, 0.0)
+    df_num['Tipo'] = rng.choice(['POS', 'NEG', 'NEU'], n)
+    return df_perc, df_num
+
+
+def esip_frames():
+    """Los CSV de esip_2025/ con la misma limpieza y unión de Tipo que App.py (None si faltan)."""
+    rutas = [ESIP_DIR / 'Ind_%.csv', ESIP_DIR / 'Ind_n.csv', ESIP_DIR / 'tipo_indicadores.csv']
+    if not all(r.exists() for r in rutas):
+        return None
+    leer = lambda ruta: pd.read_csv(ruta, sep=None, engine='python', encoding='utf-8-sig')
+    df_perc, df_num, tipo_df = (leer(r) for r in rutas)
+    df_perc[MESES] = df_perc[MESES].replace({r'%': '', r',': ''}, regex=True).apply(pd.to_numeric, errors='coerce')
+    df_num[MESES] = df_num[MESES].replace({r',': '', r'"': ''}, regex=True).apply(pd.to_numeric, errors='coerce')
+    df_num = df_num.merge(tipo_df[['ID', 'Tipo']], on='ID', how='left')
+    df_num['Tipo'] = df_num['Tipo'].fillna('NEU').str.upper()
+    return df_perc, df_num
+
+
+def compare(nombre, df_perc, df_num):
+    esperado_perc, esperado_num = df_perc.copy(), df_num.copy()
+    t0 = time.perf_counter()
+    score_apply(esperado_perc, esperado_num)
+    t_apply = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    val_perc, val_num = score_vector(df_perc, df_num)
+    t_vector = time.perf_counter() - t0
+
+    for esperado, codigos in ((esperado_perc, val_perc), (esperado_num, val_num)):
+        assert (esperado[[f"{m}_Val" for m in MESES]].to_numpy() == scoring.labels(codigos)).all()
+        assert (esperado[[f"{m}_Color" for m in MESES]].to_numpy() == scoring.colors(codigos)).all()
+    columnas = [f"{m}_{s}" for m in MESES for s in ('Val', 'Color')]
+    memoria_apply = sum(int(e[columnas].memory_usage(deep=True, index=False).sum())
+                        for e in (esperado_perc, esperado_num))
+    memoria_vector = val_perc.nbytes + val_num.nbytes
+    print(f"{nombre:<22} | apply: {t_apply * 1000:8.1f} ms | vectorizado: {t_vector * 1000:6.2f} ms "
+          f"(x{t_apply / t_vector:6.1f}) | valoraciones: {memoria_apply / 1e6:6.2f} MB -> "
+          f"{memoria_vector / 1e6:6.3f} MB")
+
+
+def simulate(nombre, df_perc, df_num, repeticiones=50, seed=0):
+    """Re-valoración con cortes aleatorios, como al mover los controles del simulador."""
+    rng = np.random.default_rng(seed)
+    mat_perc = df_perc[MESES].to_numpy(dtype='float64')
+    cero_perc = scoring.zero_target_mask(df_perc['Indicador'])
+    mat_num = df_num[MESES].to_numpy(dtype='float64')
+    tipos_num = df_num['Tipo'].to_numpy(dtype=object)
+    val_perc = scoring.score_percentages(mat_perc, cero_perc)
+    val_num = scoring.score_month_over_month(mat_num, tipos_num)
+
+    tiempos = []
+    for _ in range(repeticiones):
+        p_medio, p_alto = np.sort(rng.uniform(50, 120, 2))
+        umbrales = {'porcentaje_alto': p_alto, 'porcentaje_medio': p_medio,
+                    'pos_alto': rng.uniform(0, 20), 'pos_medio': rng.uniform(-20, 0),
+                    'neg_alto': rng.uniform(-20, 0), 'neg_medio': rng.uniform(0, 20)}
+        t0 = time.perf_counter()
+        sim_perc = scoring.score_percentages(mat_perc, cero_perc, umbrales)
+        sim_num = scoring.score_month_over_month(mat_num, tipos_num, umbrales)
+        cambios = int(scoring.badge_changes(val_perc, sim_perc)['Badges'].sum()
+                      + scoring.badge_changes(val_num, sim_num)['Badges'].sum())
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    p95 = np.percentile(tiempos, 95)
+    veredicto = 'OK' if p95 <= PRESUPUESTO_SIMULADOR_MS else 'EXCEDE'
+    print(f"{nombre:<22} | simulador p50: {np.percentile(tiempos, 50):6.2f} ms | p95: {p95:6.2f} ms "
+          f"({veredicto} <= {PRESUPUESTO_SIMULADOR_MS} ms) | último: {cambios:,} badges cambian")
+
+
+def main(sizes=(120, 1_200, 12_000)):
+    casos = []
+    reales = esip_frames()
+    if reales is not None:
+        casos.append((f"esip_2025 ({len(reales[0])}+{len(reales[1])})", reales))
+    casos += [(f"{n:,}+{n:,} indicadores", synthetic_frames(n)) for n in sizes]
+    for nombre, (df_perc, df_num) in casos:
+        compare(nombre, df_perc, df_num)
+    for nombre, (df_perc, df_num) in casos:
+        simulate(nombre, df_perc, df_num)
+
+
+if __name__ == '__main__':
+    main()
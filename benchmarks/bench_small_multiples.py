@@ -0,0 +1,108 @@
+"""
+Compara las figuras por indicador contra los pequeños múltiplos de
+indicadores.figures: tiempo de armado en el servidor y tamaño del JSON que
+se envía al navegador.
+
+- app.py: una traza go.Scatter por indicador, filtrando el formato largo
+  (df_melted) por cada indicador
+- esip_2025/App.py: una figura px.line por indicador
+
+Los tamaños incluyen los de las áreas reales (9 indicadores en promedio y 41
+como máximo). Cada enfoque se arma una vez antes de medir, para no cargarle
+al primero la inicialización de los validadores de plotly. La columna
+"sin plantilla" es el JSON sin layout.template (unos 7 KB iguales en todas
+las figuras; en la app, st.plotly_chart usa el tema de Streamlit).
+
+    python -m benchmarks.bench_small_multiples
+"""
+
+import json
+import time
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from benchmarks.synthetic import indicator_frame
+from indicadores.cleaning import clean_month_block
+from indicadores.figures import indicator_grid, indicator_matrix
+
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto', 'Septiembre']
+
+
+def traces_per_indicator(df):
+    """Armado original de crear_grafico_tendencias_numericas en app.py (referencia)."""
+    df_melted = pd.melt(df, id_vars=['Indicador', 'Área'], value_vars=MESES, var_name='Mes', value_name='Valor')
+    df_melted['Mes'] = pd.Categorical(df_melted['Mes'], categories=MESES, ordered=True)
+    df_melted = df_melted.sort_values(['Indicador', 'Mes'])
+    fig = go.Figure()
+    colores = px.colors.qualitative.Set3
+    for i, indicador in enumerate(df['Indicador'].unique()):
+        df_ind = df_melted[df_melted['Indicador'] == indicador].dropna(subset=['Valor'])
+        if len(df_ind) > 0:
+            fig.add_trace(go.Scatter(x=df_ind['Mes'], y=df_ind['Valor'], mode='lines+markers', name=indicador,
+                                     line=dict(width=3, color=colores[i % len(colores)]), marker=dict(size=8),
+                                     hovertemplate=f'<b>{indicador}</b><br>Mes: %{{x}}<br>Valor: %{{y:,.0f}}'
+                                                   '<br><extra></extra>'))
+    fig.update_layout(height=500, showlegend=True, xaxis=dict(categoryorder='array', categoryarray=MESES))
+    return [fig]
+
+
+def figure_per_indicator(df):
+    """Armado original de esip_2025/App.py: una figura px.line por indicador (referencia)."""
+    figuras = []
+    for _, row in df.iterrows():
+        vals = [row[m] if not pd.isna(row[m]) else None for m in MESES]
+        fig = px.line(x=MESES, y=vals, markers=True, title="Evolución (%)")
+        fig.update_layout(margin=dict(l=0, r=0, t=40, b=0), height=260)
+        figuras.append(fig)
+    return figuras
+
+
+def small_multiples(df):
+    valores, nombres = indicator_matrix(df, MESES)
+    return [indicator_grid(valores, nombres, MESES)]
+
+
+def _without_template(carga):
+    """Bytes del JSON de una figura sin layout.template."""
+    figura = json.loads(carga)
+    figura['layout'].pop('template', None)
+    return len(json.dumps(figura, separators=(',', ':')).encode('utf-8'))
+
+
+def measure(armar, df):
+    """Tiempo de armado y serialización (como en st.plotly_chart) y bytes del JSON, con y sin plantilla."""
+    t0 = time.perf_counter()
+    figuras = armar(df)
+    cargas = [fig.to_json() for fig in figuras]
+    ms = (time.perf_counter() - t0) * 1000
+    return ms, sum(len(c.encode('utf-8')) for c in cargas), sum(map(_without_template, cargas)), len(figuras)
+
+
+def main(sizes=(5, 9, 20, 41, 60, 240)):
+    print(f"{'indicadores':>11} | {'enfoque':<26} | {'figuras':>7} | {'servidor':>10} | {'JSON':>10} | "
+          f"{'sin plantilla':>13}")
+    for n in sizes:
+        df = indicator_frame(n, 'numero')
+        df['Indicador'] = [f"Indicador {i} - {area}" for i, area in enumerate(df['Área'])]
+        clean_month_block(df, MESES, 'numero')
+        enfoques = (
+            ('app.py: traza por indicador', traces_per_indicator),
+            ('esip: figura por indicador', figure_per_indicator),
+            ('pequeños múltiplos', small_multiples),
+        )
+        for _, armar in enfoques:
+            armar(df.head(2))
+        resultados = [(nombre, *measure(armar, df)) for nombre, armar in enfoques]
+        _, ms_nuevo, bytes_nuevo, datos_nuevo, _ = resultados[-1]
+        for nombre, ms, bytes_json, bytes_datos, figuras in resultados:
+            linea = (f"{n:>11,} | {nombre:<26} | {figuras:>7,} | {ms:>7.1f} ms | {bytes_json / 1024:>7.1f} KB | "
+                     f"{bytes_datos / 1024:>10.1f} KB")
+            if nombre != 'pequeños múltiplos':
+                linea += (f" | pequeños múltiplos: {ms_nuevo / ms:4.2f}x tiempo, {bytes_nuevo / bytes_json:4.2f}x JSON, "
+                          f"{datos_nuevo / bytes_datos:4.2f}x sin plantilla")
+            print(linea)
+
+if __name__ == '__main__':
+    main()
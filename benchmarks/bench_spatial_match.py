@@ -0,0 +1,69 @@
+"""
+Cruce espacial PQR -> árbol más cercano: GridIndex frente a fuerza bruta.
+
+    python -m benchmarks.bench_spatial_match
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import random_points
+from podas.datasets import CAM_FILE, INVENTARIO_FILE, PQR_FILE, SPATIAL_MATCH_M, merge_sources, read_sources
+from podas.spatial import GridIndex, planar_m
+
+
+def _best_of(func, repeat=5):
+    tiempos = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos)
+
+
+def _brute_force(lat, lon, arboles_lat, arboles_lon, max_dist_m, bloque=2000):
+    """Distancia de cada consulta a todos los árboles, por bloques para acotar memoria."""
+    lat0 = float(np.nanmean(arboles_lat))
+    arboles = planar_m(arboles_lat, arboles_lon, lat0)
+    arboles[~np.isfinite(arboles).all(axis=1)] = np.inf
+    consultas = planar_m(lat, lon, lat0)
+    filas = np.full(len(lat), -1, dtype=np.intp)
+    for inicio in range(0, len(lat), bloque):
+        xy = consultas[inicio:inicio + bloque]
+        distancia = np.hypot(xy[:, None, 0] - arboles[None, :, 0], xy[:, None, 1] - arboles[None, :, 1])
+        cercano = np.argmin(np.nan_to_num(distancia, nan=np.inf), axis=1)
+        dentro = distancia[np.arange(len(xy)), cercano] <= max_dist_m
+        filas[inicio:inicio + bloque] = np.where(dentro, cercano, -1)
+    return filas
+
+
+def main():
+    etapas, crosswalk = read_sources()
+    pqr, (cam, cam_layer), inv = etapas[PQR_FILE], etapas[CAM_FILE], etapas[INVENTARIO_FILE]
+
+    df, _ = merge_sources(pqr, cam, cam_layer, inv, crosswalk)
+    merge = _best_of(lambda: merge_sources(pqr, cam, cam_layer, inv, crosswalk))
+    solo_claves = _best_of(lambda: merge_sources(pqr, cam, cam_layer, inv, crosswalk, max_dist_m=0))
+    print(f"PQR: {len(pqr):,} | forestal: {len(inv):,} | radio: {SPATIAL_MATCH_M:.0f} m")
+    print(f"merge_sources solo claves:   {solo_claves * 1000:7.2f} ms")
+    print(f"merge_sources con espacial:  {merge * 1000:7.2f} ms")
+    for columna in ('Cruce_CAM', 'Cruce_forestal'):
+        print(f"  {columna}: {df[columna].value_counts().to_dict()}")
+    print()
+
+    arboles_lat, arboles_lon = inv['Latitud'].to_numpy(), inv['Longitud'].to_numpy()
+    for n in (1_000, 10_000, 50_000):
+        lat, lon = random_points(n, seed=n)
+        construir = _best_of(lambda: GridIndex(arboles_lat, arboles_lon, cell_m=SPATIAL_MATCH_M))
+        indice = GridIndex(arboles_lat, arboles_lon, cell_m=SPATIAL_MATCH_M)
+        malla = _best_of(lambda: indice.nearest(lat, lon, SPATIAL_MATCH_M))
+        bruta = _best_of(lambda: _brute_force(lat, lon, arboles_lat, arboles_lon, SPATIAL_MATCH_M), repeat=1)
+        filas, _ = indice.nearest(lat, lon, SPATIAL_MATCH_M)
+        iguales = np.array_equal(filas, _brute_force(lat, lon, arboles_lat, arboles_lon, SPATIAL_MATCH_M))
+        print(f"{n:>7,} consultas: malla {(construir + malla) * 1000:8.2f} ms | fuerza bruta {bruta * 1000:9.2f} ms "
+              f"({bruta / (construir + malla):.0f}x) | {(filas >= 0).sum():,} con árbol | iguales: {iguales}")
+
+
+if __name__ == '__main__':
+    main()
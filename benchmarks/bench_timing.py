@@ -0,0 +1,71 @@
+"""
+Costo de los tramos de podas.timing con la medición apagada (sin registro
+abierto) y encendida, frente a la misma función sin instrumentar.
+
+    python -m benchmarks.bench_timing
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from podas import timing
+
+LLAMADAS = 200_000
+
+
+def _etapa():
+    return None
+
+
+@timing.timed('etapa')
+def _etapa_medida():
+    return None
+
+
+def _por_llamada(func, llamadas=LLAMADAS):
+    t0 = time.perf_counter()
+    for _ in range(llamadas):
+        func()
+    return (time.perf_counter() - t0) / llamadas * 1e9
+
+
+def main():
+    base = _por_llamada(_etapa)
+    apagado = _por_llamada(_etapa_medida)
+
+    def con_span():
+        with timing.span('etapa'):
+            pass
+    span_apagado = _por_llamada(con_span)
+
+    timing.start('bench')
+    encendido = _por_llamada(_etapa_medida, llamadas=20_000)
+    timing.finish()
+
+    print(f"sin instrumentar: {base:7.0f} ns por llamada")
+    print(f"timed apagado:    {apagado:7.0f} ns por llamada (+{apagado - base:.0f} ns)")
+    print(f"span apagado:     {span_apagado:7.0f} ns por bloque")
+    print(f"timed encendido:  {encendido:7.0f} ns por llamada")
+
+    # Registro de un rerun típico (una veintena de tramos) en JSONL
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = Path(carpeta) / 'tiempos.jsonl'
+        t0 = time.perf_counter()
+        for _ in range(1_000):
+            timer = timing.start('bench')
+            for i in range(20):
+                with timer.span(f"etapa {i}"):
+                    pass
+            timing.append_record(ruta, timer.record())
+            timing._local.timer = None
+        por_rerun = (time.perf_counter() - t0) / 1_000 * 1e6
+        registros = timing.read_log(ruta)
+        print(f"registro JSONL:   {por_rerun:7.1f} µs por rerun de 20 tramos "
+              f"({ruta.stat().st_size / len(registros):.0f} bytes por línea)")
+        print(json.dumps(timing.latency_summary(registros).to_dict('records'), ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Generador de datos sintéticos alrededor del casco urbano de Neiva.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Caja aproximada de Neiva (latitud, longitud)
+LAT_MIN, LAT_MAX = 2.88, 2.99
+LON_MIN, LON_MAX = -75.33, -75.24
+
+
+def coordinate_strings(n, seed=0):
+    """
+    Coordenadas en texto con la misma suciedad que Inventario_forestal.csv:
+    comas decimales, espacios, separadores de miles, vacíos y valores fuera de rango.
+
+    Returns:
+        Tupla (latitudes, longitudes) como Series de texto
+    """
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(LAT_MIN, LAT_MAX, n).round(6)
+    lon = rng.uniform(LON_MIN, LON_MAX, n).round(6)
+    return _dirty_strings(lat, rng), _dirty_strings(lon, rng)
+
+
+def _dirty_strings(valores, rng):
+    """Coordenadas en texto con la suciedad de coordinate_strings (12 % de las filas)."""
+    n = len(valores)
+    texto = pd.Series(valores.astype(str), dtype=object)
+    tipo = rng.random(n)
+    coma = tipo < 0.05
+    texto[coma] = texto[coma].str.replace('.', ',', regex=False)
+    espacios = (tipo >= 0.05) & (tipo < 0.08)
+    texto[espacios] = ' ' + texto[espacios] + ' '
+    miles = (tipo >= 0.08) & (tipo < 0.10)
+    texto[miles] = (valores[miles] * 1e6).astype(np.int64).astype(str)
+    texto[miles] = texto[miles].str.replace(r'(\d)(?=(\d{3})+$)', r'\1,', regex=True)
+    texto[(tipo >= 0.10) & (tipo < 0.11)] = None
+    texto[(tipo >= 0.11) & (tipo < 0.115)] = 'S/D'
+    texto[(tipo >= 0.115) & (tipo < 0.12)] = '999'
+    return texto
+
+
+def random_points(n, seed=0):
+    """
+    Puntos uniformes dentro de la caja de Neiva.
+
+    Returns:
+        Tupla (latitudes, longitudes) como arreglos NumPy
+    """
+    rng = np.random.default_rng(seed)
+    return rng.uniform(LAT_MIN, LAT_MAX, n), rng.uniform(LON_MIN, LON_MAX, n)
+
+
+# Proporciones de data/: 1.382 PQR y 182 podas ejecutadas por 10.134 árboles
+PQR_POR_ARBOL = 0.136
+EJECUTADAS_POR_PQR = 0.13
+# Fracción de árboles que comparten coordenada con el anterior (grupos de repetidos)
+ARBOLES_REPETIDOS = 0.2
+# Desviación (grados, unos 8 m) entre un PQR inventariado y su árbol
+JITTER_PQR = 7e-5
+
+ESPECIES = [
+    ('Oití', 'Licania tomentosa'), ('Neem', 'Azadirachta indica'), ('Samán', 'Samanea saman'),
+    ('Mango', 'Mangifera indica'), ('Guayacan trebol', 'Platymiscium pinnatum'),
+    ('Pomarrosa', 'Syzygium jambos'), ('Caucho', 'Ficus elastica'), ('Acacia', 'Acacia mangium'),
+] + [(f'Especie {i}', f'Genus species{i}') for i in range(235)]
+TIPOS_PQR = ['P.Q.R. Verbal', 'P.Q.R', 'INTERVENTORIA', None, 'P.Q.R. Escrita', 'P.Q.R. Interventoria',
+             'Derecho de petición']
+PESOS_TIPOS = [0.22, 0.19, 0.16, 0.15, 0.11, 0.09, 0.08]
+ESTADOS_PQR = ['Pendiente', None, 'PENDIENTE', 'pendiente']
+PESOS_ESTADOS = [0.81, 0.15, 0.02, 0.02]
+
+
+def _comunas(lat, lon):
+    """Comuna según la posición: franja sur RURAL y una rejilla de 2 x 5 comunas."""
+    fila = np.clip(((lat - LAT_MIN - 0.01) / (LAT_MAX - LAT_MIN - 0.01) * 2).astype(int), 0, 1)
+    columna = np.clip(((lon - LON_MIN) / (LON_MAX - LON_MIN) * 5).astype(int), 0, 4)
+    nombres = np.char.add('COMUNA ', np.char.zfill((fila * 5 + columna + 1).astype(str), 2))
+    return np.where(lat < LAT_MIN + 0.01, 'RURAL', nombres)
+
+
+def synthetic_sources(n_trees, seed=0):
+    """
+    Las cuatro fuentes de podas.datasets con las columnas, formatos y
+    proporciones de data/ para n_trees árboles: stickers numéricos de 6 cifras
+    y compuestos ('2275-71'), coordenadas sucias en el inventario, árboles con
+    la misma coordenada y PQR cerca de su árbol cuando está inventariado.
+
+    Returns:
+        Diccionario {archivo de podas.datasets: DataFrame}
+    """
+    from podas.datasets import CAM_FILE, EJECUTADAS_FILE, INVENTARIO_FILE, PQR_FILE
+
+    rng = np.random.default_rng(seed)
+    lat, lon = random_points(n_trees, seed=seed)
+    repetido = rng.random(n_trees) < ARBOLES_REPETIDOS
+    repetido[0] = False
+    origen = np.maximum.accumulate(np.where(repetido, 0, np.arange(n_trees)))
+    lat, lon = lat[origen].round(6), lon[origen].round(6)
+
+    sticker = np.char.zfill((rng.permutation(n_trees) + 1).astype(str), 6).astype(object)
+    sticker[rng.random(n_trees) < 0.001] = None
+    luminaria = (1_600_000 + rng.permutation(n_trees)).astype(str)
+    especie = np.minimum(rng.zipf(1.6, n_trees) - 1, len(ESPECIES) - 1)
+    comun, cientifico = (np.array(columna, dtype=object)[especie] for columna in zip(*ESPECIES))
+    cap = rng.gamma(2.0, 30.0, n_trees).round(0)
+    forestal = pd.DataFrame({
+        'ID': np.arange(1, n_trees + 1),
+        'PROCESO': rng.choice(['Mantenimiento', 'Proyectos', 'Inventario cambiante'], n_trees,
+                              p=[0.953, 0.031, 0.016]),
+        'BARRIO': np.char.add('Barrio ', (rng.zipf(1.4, n_trees) % 180).astype(str)),
+        'CODIGO': np.char.add(rng.integers(1, 60, n_trees).astype(str), rng.choice(list('ABCD'), n_trees)),
+        'Nombre_comun': comun,
+        'NOMBRE CIENTIFICO': cientifico,
+        'Latitud': _dirty_strings(lat, rng),
+        'Longitud': _dirty_strings(lon, rng),
+        'CAP(cm)': cap,
+        'DAP(m)': (cap / np.pi / 100).round(2),
+        'HT(m)': rng.uniform(1.5, 20, n_trees).round(1),
+        'DIAMETRO DE COPAS (m)': rng.uniform(0.5, 12, n_trees).round(1),
+        'VOLUMEN (m3)': rng.gamma(1.5, 0.2, n_trees).round(3),
+        'ESTADO FISICO (B,R,M, MM)': rng.choice(['B', 'R', 'b', 'M', 'MM', 'r'], n_trees,
+                                                p=[0.78, 0.19, 0.013, 0.011, 0.004, 0.002]),
+        'AFECTACIÓN ALUMBRADO (A,M,B) ': rng.choice([None, 'A', '/', 'X', 'N', 'M'], n_trees,
+                                                    p=[0.596, 0.373, 0.015, 0.009, 0.006, 0.001]),
+        'TRATAMIENTO, PODA ': rng.choice([None, 'X', 'x', '/'], n_trees, p=[0.5, 0.344, 0.15, 0.006]),
+        'ID_Luminaria': luminaria,
+        'Sticker': sticker,
+    })
+    cam = forestal[['ID', 'Sticker', 'Latitud', 'Longitud', 'Nombre_comun']]
+
+    n_pqr = max(1, round(n_trees * PQR_POR_ARBOL))
+    arbol = rng.integers(0, n_trees, n_pqr)
+    inventariado = rng.random(n_pqr) < 0.46
+    compuesto = ~inventariado & (rng.random(n_pqr) < 0.08)
+    pqr_sticker = np.char.zfill((n_trees + 1 + np.arange(n_pqr)).astype(str), 6).astype(object)
+    pqr_sticker[inventariado] = sticker[arbol[inventariado]]
+    pqr_sticker[compuesto] = np.char.add(
+        np.char.add(rng.integers(1000, 4000, compuesto.sum()).astype(str), '-'),
+        rng.choice(['35', '66', '71', '120'], compuesto.sum())
+    )
+    pqr_luminaria = (3_000_000 + np.arange(n_pqr)).astype(str).astype(object)
+    pqr_luminaria[inventariado] = luminaria[arbol[inventariado]]
+    pqr_lat = np.where(inventariado, lat[arbol], rng.uniform(LAT_MIN, LAT_MAX, n_pqr))
+    pqr_lon = np.where(inventariado, lon[arbol], rng.uniform(LON_MIN, LON_MAX, n_pqr))
+    pqr_lat = (pqr_lat + rng.normal(0, JITTER_PQR, n_pqr)).round(8)
+    pqr_lon = (pqr_lon + rng.normal(0, JITTER_PQR, n_pqr)).round(8)
+    fechas = rng.integers(0, 365, n_pqr)
+    pqr = pd.DataFrame({
+        'ID': np.arange(1, n_pqr + 1),
+        'Sticker': pqr_sticker,
+        'ID_Luminaria': pqr_luminaria,
+        'Comuna': _comunas(pqr_lat, pqr_lon),
+        'Tipo': rng.choice(np.array(TIPOS_PQR, dtype=object), n_pqr, p=PESOS_TIPOS),
+        'Estado': rng.choice(np.array(ESTADOS_PQR, dtype=object), n_pqr, p=PESOS_ESTADOS),
+        'P.Q.R.S': [f"MTTONVA2024{1 + d // 31:02d}{1 + d % 28:02d}{i % 1000:03d} - SOLICITANTE {i}"
+                    for i, d in enumerate(fechas.tolist())],
+        'Latitud': pqr_lat,
+        'Longitud': pqr_lon,
+        'Requiere_Acción': np.where(rng.random(n_pqr) < 0.39, 'SI', 'NO'),
+        'Inventariado': np.where(inventariado, 'SI', 'NO'),
+    })
+
+    n_ejecutadas = max(1, round(n_pqr * EJECUTADAS_POR_PQR))
+    ejecutadas = pd.DataFrame({
+        'ID': np.arange(1, n_ejecutadas + 1),
+        'Sticker': pqr['Sticker'].dropna().sample(n_ejecutadas, random_state=seed).to_numpy(),
+        'Observación': 'YA EJECUTADA',
+    })
+    return {PQR_FILE: pqr, EJECUTADAS_FILE: ejecutadas, CAM_FILE: cam, INVENTARIO_FILE: forestal}
+
+
+def write_dataset(out_dir, n_trees, seed=0):
+    """
+    Escribe en out_dir los CSV de synthetic_sources con los nombres de data/.
+
+    Returns:
+        Diccionario {archivo: filas escritas}
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    filas = {}
+    for nombre, df in synthetic_sources(n_trees, seed=seed).items():
+        df.to_csv(out_dir / nombre, index=False, encoding='utf-8')
+        filas[nombre] = len(df)
+    return filas
+
+
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto', 'Septiembre',
+         'Octubre', 'Noviembre', 'Diciembre']
+AREAS = ['Alumbrado Público', 'Atención al Usuario', 'Gestión Ambiental', 'Financiera', 'Talento Humano',
+         'Mantenimiento', 'Jurídica']
+
+
+def indicator_frame(n_rows, kind='numero', seed=0):
+    """
+    Indicadores con los formatos de Numericos.csv / porcentaje.csv: miles con
+    coma ("43,662"), pesos (" $  972,551 ", "-$  163,815 "), sufijos entre
+    paréntesis, porcentajes ("25%"), vacíos y textos no numéricos.
+
+    Args:
+        n_rows: Cantidad de indicadores (varios años y áreas apilados)
+        kind: 'numero' o 'porcentaje'
+
+    Returns:
+        DataFrame con 'ID', 'Área', 'Indicador' y una columna de texto por mes
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'ID': np.arange(1, n_rows + 1),
+        'Área': rng.choice(AREAS, n_rows),
+        'Indicador': pd.Series(np.arange(n_rows) % 300).map('Indicador {}'.format),
+    })
+    for mes in MESES:
+        valores = rng.integers(0, 1_000_000, n_rows)
+        tipo = rng.random(n_rows)
+        if kind == 'numero':
+            texto = pd.Series(valores.astype(str), dtype=object)
+            miles = tipo < 0.35
+            texto[miles] = pd.Series(valores[miles]).map('{:,}'.format).to_numpy()
+            pesos = (tipo >= 0.35) & (tipo < 0.45)
+            texto[pesos] = pd.Series(valores[pesos]).map(' $  {:,} '.format).to_numpy()
+            negativos = (tipo >= 0.45) & (tipo < 0.47)
+            texto[negativos] = pd.Series(valores[negativos]).map('-$  {:,} '.format).to_numpy()
+            parentesis = (tipo >= 0.47) & (tipo < 0.50)
+            texto[parentesis] = texto[parentesis] + ' (parcial)'
+        else:
+            texto = pd.Series((valores % 150).astype(str), dtype=object) + '%'
+            decimales = tipo < 0.2
+            texto[decimales] = pd.Series(valores[decimales] % 15000 / 100).map('{:,}%'.format).to_numpy()
+        texto[(tipo >= 0.50) & (tipo < 0.60)] = None
+        texto[(tipo >= 0.60) & (tipo < 0.61)] = 'N/A'
+        df[mes] = texto
+    return df
@@ -2,9 +2,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
 from datetime import datetime
 import warnings
+from indicadores.cleaning import clean_month_block
 warnings.filterwarnings('ignore')
 
 # Configuración de la página (DEBE SER LA PRIMERA LÍNEA DE STREAMLIT)
@@ -15,32 +15,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Función para limpiar datos numéricos
-def limpiar_numeros(valor):
-    if pd.isna(valor) or valor == '':
-        return np.nan
-    if isinstance(valor, str):
-        valor = valor.replace(',', '').replace('$', '').replace(' ', '')
-        if '(' in valor and ')' in valor:
-            valor = valor.split('(')[0]
-        try:
-            return float(valor)
-        except:
-            return np.nan
-    return float(valor)
-
-# Función para limpiar porcentajes
-def limpiar_porcentajes(valor):
-    if pd.isna(valor) or valor == '':
-        return np.nan
-    if isinstance(valor, str):
-        valor = valor.replace('%', '').replace(',', '')
-        try:
-            return float(valor)
-        except:
-            return np.nan
-    return float(valor)
-
 # Función para abreviar nombres largos
 def abreviar(texto, max_len=40):
     return texto if len(texto) <= max_len else texto[:37] + "..."
@@ -62,24 +36,20 @@ def cargar_y_procesar_datos():
             df_num = pd.read_csv("Númericos.csv")
         except FileNotFoundError:
             st.error("No se encontró el archivo de datos numéricos. Busca 'Numericos.csv' o 'Númericos.csv'")
-            return None, None
+            return None, None, None
     
     # Cargar datos porcentuales
     try:
         df_porc = pd.read_csv("porcentaje.csv")
     except FileNotFoundError:
         st.error("No se encontró el archivo 'porcentaje.csv'")
-        return None, None
+        return None, None, None
     
-    # Limpiar datos numéricos
-    for mes in month_order:
-        if mes in df_num.columns:
-            df_num[mes] = df_num[mes].apply(limpiar_numeros)
-    
-    # Limpiar datos porcentuales
-    for mes in month_order:
-        if mes in df_porc.columns:
-            df_porc[mes] = df_porc[mes].apply(limpiar_porcentajes)
+    # Limpiar el bloque de meses de cada archivo en una sola pasada
+    rechazos_num = clean_month_block(df_num, month_order, kind='numero')
+    rechazos_porc = clean_month_block(df_porc, month_order, kind='porcentaje')
+    rechazados = pd.concat([rechazos_num.assign(Archivo='numérico'), rechazos_porc.assign(Archivo='porcentual')],
+                           ignore_index=True)
     
     # Añadir columna Tipo
     df_num['Tipo'] = 'Numérico'
@@ -88,7 +58,7 @@ def cargar_y_procesar_datos():
     # Unir ambos datasets
     df = pd.concat([df_num, df_porc], ignore_index=True)
     
-    return df, month_order
+    return df, month_order, rechazados
 
 def crear_grafico_tendencias_numericas(df_melted, area, indicadores):
     """Crear gráfico de tendencias para indicadores numéricos"""
@@ -255,12 +225,17 @@ def main():
     st.markdown("---")
     
     # Cargar datos
-    df, month_order = cargar_y_procesar_datos()
+    df, month_order, rechazados = cargar_y_procesar_datos()
     
     if df is None:
         st.error("❌ Error al cargar los datos. Verifica que los archivos CSV estén en la carpeta.")
         st.stop()
     
+    # Celdas que no se pudieron convertir a número (quedan vacías en los gráficos)
+    if len(rechazados):
+        with st.sidebar.expander(f"⚠️ {len(rechazados)} celdas no numéricas"):
+            st.dataframe(rechazados, use_container_width=True, hide_index=True)
+    
     # Sidebar para filtros
     st.sidebar.header("🔍 Filtros")
     
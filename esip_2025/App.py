@@ -1,10 +1,32 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import contextlib
 import os
+import sys
+import time
 from pathlib import Path
+from types import SimpleNamespace
+
+# Los módulos compartidos (podas.timing, indicadores) viven en la raíz del repositorio;
+# en un despliegue solo de esta carpeta, indicadores/ se copia junto a App.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from indicadores import figures, scoring
+
+# Medición de tiempos opcional: si la app se despliega sin el paquete podas
+# (ver ARCHIVOS_ESENCIALES.md), las llamadas de timing no hacen nada
+try:
+    from podas import timing
+except ImportError:
+    timing = SimpleNamespace(
+        start_page=lambda page: None,
+        span=lambda name: contextlib.nullcontext(),
+        add=lambda name, seconds: None,
+        finish=lambda: None,
+        render_panel=lambda record: None,
+    )
 
 st.set_page_config(page_title="Indicadores ESIP 2025", layout="wide", page_icon="bar_chart")
+timing.start_page('esip_2025')
 
 # Encabezado con título y logo a la derecha
 header_left, header_right = st.columns([0.75, 0.25])
@@ -56,9 +78,10 @@ if missing:
         st.error(f"Falta el archivo: {f}")
     st.stop()
 
-df_perc = load_csv(f_perc)
-df_num  = load_csv(f_num)
-tipo_df = load_csv(f_tipo)
+with timing.span('carga CSV'):
+    df_perc = load_csv(f_perc)
+    df_num  = load_csv(f_num)
+    tipo_df = load_csv(f_tipo)
 
 # Meses
 meses = ['Enero','Febrero','Marzo','Abril','Mayo','Junio','Julio','Agosto','Septiembre']
@@ -89,58 +112,26 @@ def to_float_cols(df, cols, is_percent=False):
                        .apply(pd.to_numeric, errors='coerce'))
     return clean
 
-df_perc = to_float_cols(df_perc, meses, is_percent=True)
-df_num  = to_float_cols(df_num, meses, is_percent=False)
+with timing.span('limpieza'):
+    df_perc = to_float_cols(df_perc, meses, is_percent=True)
+    df_num  = to_float_cols(df_num, meses, is_percent=False)
 
 # Unir 'Tipo' a numéricos
 df_num = df_num.merge(tipo_df[['ID','Tipo']], on='ID', how='left')
 df_num['Tipo'] = df_num['Tipo'].fillna('NEU').str.upper()
 
-# === Reglas de valoración ===
-def valorar_porcentaje(val, indicador):
-    if pd.isna(val):
-        return "N/A", "gray"
-    ind_norm = (indicador or "").strip().casefold()
-    # Excepciones: 0% = Alto; >0% = Bajo
-    if ind_norm in ['tasa de accidentes laborales', 'prevalencia de enfermedades']:
-        return ("Alto","green") if float(val) == 0 else ("Bajo","red")
-    v = float(val)
-    if v >= 90: return "Alto", "green"
-    elif v >= 80: return "Medio", "orange"
-    else: return "Bajo", "red"
-
-def valorar_numerico(actual, anterior, tipo):
-    tipo = (tipo or "NEU").upper()
-    if tipo == "NEU":
-        return "N/A", "gray"
-    if pd.isna(actual) or pd.isna(anterior) or anterior == 0:
-        return "N/A", "gray"
-    cambio = (actual - anterior) / anterior * 100.0
-    if tipo == "POS":
-        if cambio >= 5:      return "Alto", "green"
-        elif cambio >= -5:   return "Medio", "orange"
-        else:                return "Bajo", "red"
-    if tipo == "NEG":
-        if cambio <= -10:    return "Alto", "green"
-        elif cambio <= 10:   return "Medio", "orange"
-        else:                return "Bajo", "red"
-    return "N/A", "gray"
-
-# Precalcular valoraciones
-for m in meses:
-    vals = df_perc.apply(lambda r: valorar_porcentaje(r[m], r['Indicador']), axis=1)
-    df_perc[f"{m}_Val"]   = [v[0] for v in vals]
-    df_perc[f"{m}_Color"] = [v[1] for v in vals]
-
-for i, m in enumerate(meses):
-    if i == 0:
-        df_num[f"{m}_Val"] = "N/A"
-        df_num[f"{m}_Color"] = "gray"
-    else:
-        ant = meses[i-1]
-        vals = df_num.apply(lambda r: valorar_numerico(r[m], r[ant], r['Tipo']), axis=1)
-        df_num[f"{m}_Val"]   = [v[0] for v in vals]
-        df_num[f"{m}_Color"] = [v[1] for v in vals]
+# Valoraciones precalculadas: matrices int8 de códigos (indicador × mes), alineadas
+# por posición con las filas de df_perc y df_num (ver indicadores.scoring)
+t0 = time.perf_counter()
+df_perc = df_perc.reset_index(drop=True)
+df_num = df_num.reset_index(drop=True)
+mat_perc = df_perc[meses].to_numpy(dtype='float64')
+cero_perc = scoring.zero_target_mask(df_perc['Indicador'])
+mat_num = df_num[meses].to_numpy(dtype='float64')
+tipos_num = df_num['Tipo'].to_numpy(dtype=object)
+val_perc = scoring.score_percentages(mat_perc, cero_perc)
+val_num = scoring.score_month_over_month(mat_num, tipos_num)
+timing.add('valoraciones', time.perf_counter() - t0)
 
 # Utilidad para badge de color
 def color_badge(text, color):
@@ -152,6 +143,66 @@ def color_badge(text, color):
     }.get(color, "#6b7280")
     return f"<span style='background:{css}20;color:{css};padding:2px 7px;border-radius:6px;font-weight:600;font-size:0.85rem;'>{text}</span>"
 
+# Indicadores por página en cada columna de un área; los gráficos de la página
+# y los badges de un indicador solo se construyen cuando el usuario los abre
+INDICADORES_POR_PAGINA = 10
+
+def render_indicator_detail(row, codigos, tipo):
+    """Badges por mes de un indicador abierto ('perc' o 'num')."""
+    cols = st.columns(9)
+    for i, m in enumerate(meses):
+        v = row[m]
+        c = scoring.COLORES[codigos[i]]
+        txt = scoring.ETIQUETAS[codigos[i]]
+        if pd.isna(v):
+            val_str = "-"
+        else:
+            val_str = f"{v:.1f}%" if tipo == 'perc' else f"{int(v)}"
+        arrow = ""
+        if i > 0:
+            prev = row[meses[i-1]]
+            if not pd.isna(v) and not pd.isna(prev):
+                if v > prev: arrow = "▲"
+                elif v < prev: arrow = "▼"
+                else: arrow = "▶"
+        with cols[i]:
+            st.markdown(f"**{m[:3]}**", help=m)
+            st.markdown(color_badge(txt, c), unsafe_allow_html=True)
+            st.markdown(f"{arrow} `{val_str}`")
+
+def render_indicator_list(subset, codigos, tipo, area):
+    """
+    Lista paginada de indicadores de un área: un interruptor para el gráfico
+    de pequeños múltiplos de la página, uno por indicador y, solo para los
+    abiertos, el detalle de render_indicator_detail.
+    """
+    if subset.empty:
+        st.info("Sin indicadores para mostrar.")
+        return
+    paginas = -(-len(subset) // INDICADORES_POR_PAGINA)
+    pagina = 1
+    if paginas > 1:
+        # La clave incluye el total de páginas: si la búsqueda lo cambia, vuelve a la primera
+        pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1,
+                                 key=f"pagina:{tipo}:{area}:{paginas}")
+    inicio = (pagina - 1) * INDICADORES_POR_PAGINA
+    pagina_df = subset.iloc[inicio:inicio + INDICADORES_POR_PAGINA]
+    if paginas > 1:
+        st.caption(f"Indicadores {inicio + 1}–{inicio + len(pagina_df)} de {len(subset)}")
+    # Un solo gráfico de pequeños múltiplos para los indicadores de la página
+    if st.toggle("📈 Gráficos de la página", key=f"graficos:{tipo}:{area}:{paginas}:{pagina}"):
+        matriz = mat_perc if tipo == 'perc' else mat_num
+        nombres = pagina_df['Indicador'].astype(str).tolist()
+        fig = figures.indicator_grid(matriz[pagina_df.index.to_numpy()], nombres, meses,
+                                     tipo='linea' if tipo == 'perc' else 'barra', columnas=2,
+                                     formato='%{y:.1f}%' if tipo == 'perc' else '%{y:,.0f}')
+        st.plotly_chart(fig, use_container_width=True, key=f"{tipo}:{area}:{pagina}")
+    for _, row in pagina_df.iterrows():
+        titulo = row['Indicador'] if tipo == 'perc' else f"{row['Indicador']}  |  Tipo: {row['Tipo']}"
+        if st.toggle(titulo, key=f"abrir:{tipo}:{area}:{row['ID']}:{row.name}"):
+            with st.container(border=True):
+                render_indicator_detail(row, codigos[row.name], tipo)
+
 # Áreas
 areas = sorted(pd.concat([df_perc['Área'], df_num['Área']]).dropna().unique())
 
@@ -161,6 +212,42 @@ with st.sidebar:
     area_sel = st.multiselect("Áreas", areas, default=areas)
     buscar = st.text_input("Buscar indicador (contiene)", "")
 
+# Simulador de umbrales: re-valora todas las matrices con los cortes elegidos
+# en un solo paso vectorizado y muestra cuántos badges cambian
+with st.sidebar:
+    st.markdown("---")
+    simular = st.checkbox("Simular umbrales (¿qué pasaría si…?)", value=False)
+    if simular:
+        u = scoring.UMBRALES
+        st.caption("Porcentuales: Medio desde / Alto desde (%)")
+        p_medio, p_alto = st.slider("Cortes %", 0.0, 150.0, (u['porcentaje_medio'], u['porcentaje_alto']), 1.0,
+                                    label_visibility="collapsed")
+        st.caption("Numéricos POS: cambio mínimo para Medio / Alto (%)")
+        pos_medio, pos_alto = st.slider("Cortes POS", -50.0, 50.0, (u['pos_medio'], u['pos_alto']), 0.5,
+                                        label_visibility="collapsed")
+        st.caption("Numéricos NEG: cambio máximo para Alto / Medio (%)")
+        neg_alto, neg_medio = st.slider("Cortes NEG", -50.0, 50.0, (u['neg_alto'], u['neg_medio']), 0.5,
+                                        label_visibility="collapsed")
+        umbrales = {'porcentaje_alto': p_alto, 'porcentaje_medio': p_medio, 'pos_alto': pos_alto,
+                    'pos_medio': pos_medio, 'neg_alto': neg_alto, 'neg_medio': neg_medio}
+
+        t0 = time.perf_counter()
+        sim_perc = scoring.score_percentages(mat_perc, cero_perc, umbrales)
+        sim_num = scoring.score_month_over_month(mat_num, tipos_num, umbrales)
+        cambios = pd.concat([scoring.badge_changes(val_perc, sim_perc).assign(Tipo='%'),
+                             scoring.badge_changes(val_num, sim_num).assign(Tipo='Numérico')],
+                            ignore_index=True)
+        t_sim = time.perf_counter() - t0
+        timing.add('simulador de umbrales', t_sim)
+
+        st.metric("Badges que cambian", f"{int(cambios['Badges'].sum()):,}",
+                  help=f"De {val_perc.size + val_num.size:,} badges (indicadores × meses)")
+        st.caption(f"Recalculado en {t_sim * 1000:.1f} ms")
+        if not cambios.empty:
+            st.dataframe(cambios, use_container_width=True, hide_index=True)
+        val_perc, val_num = sim_perc, sim_num
+
+t0 = time.perf_counter()
 for area in areas:
     if area not in area_sel:
         continue
@@ -173,32 +260,7 @@ for area in areas:
         subset = df_perc[(df_perc['Área'] == area)]
         if buscar:
             subset = subset[subset['Indicador'].str.contains(buscar, case=False, na=False)]
-        if subset.empty:
-            st.info("Sin indicadores para mostrar.")
-        for _, row in subset.iterrows():
-            with st.expander(row['Indicador']):
-                vals = [row[m] if not pd.isna(row[m]) else None for m in meses]
-                fig = px.line(x=meses, y=vals, markers=True, title="Evolución (%)")
-                fig.update_layout(margin=dict(l=0,r=0,t=40,b=0), height=260)
-                st.plotly_chart(fig, use_container_width=True, key=f"perc:{area}:{row['ID']}:{row.name}")
-
-                cols = st.columns(9)
-                for i, m in enumerate(meses):
-                    v = row[m]
-                    c = row.get(f"{m}_Color","gray")
-                    txt = row.get(f"{m}_Val","N/A")
-                    val_str = "-" if pd.isna(v) else f"{v:.1f}%"
-                    arrow = ""
-                    if i > 0:
-                        prev = row[meses[i-1]]
-                        if not pd.isna(v) and not pd.isna(prev):
-                            if v > prev: arrow = "▲"
-                            elif v < prev: arrow = "▼"
-                            else: arrow = "▶"
-                    with cols[i]:
-                        st.markdown(f"**{m[:3]}**", help=m)
-                        st.markdown(color_badge(txt, c), unsafe_allow_html=True)
-                        st.markdown(f"{arrow} `{val_str}`")
+        render_indicator_list(subset, val_perc, 'perc', area)
 
     # NUMÉRICOS
     with col2:
@@ -206,32 +268,9 @@ for area in areas:
         subset = df_num[(df_num['Área'] == area)]
         if buscar:
             subset = subset[subset['Indicador'].str.contains(buscar, case=False, na=False)]
-        if subset.empty:
-            st.info("Sin indicadores para mostrar.")
-        for _, row in subset.iterrows():
-            with st.expander(f"{row['Indicador']}  |  Tipo: {row['Tipo']}"):
-                vals = [row[m] if not pd.isna(row[m]) else 0 for m in meses]
-                fig = px.bar(x=meses, y=vals, title="Evolución (conteos)")
-                fig.update_layout(margin=dict(l=0,r=0,t=40,b=0), height=260)
-                st.plotly_chart(fig, use_container_width=True, key=f"num:{area}:{row['ID']}:{row.name}")
-
-                cols = st.columns(9)
-                for i, m in enumerate(meses):
-                    v = row[m]
-                    c = row.get(f"{m}_Color","gray")
-                    txt = row.get(f"{m}_Val","N/A")
-                    val_str = "-" if pd.isna(v) else f"{int(v)}"
-                    arrow = ""
-                    if i > 0:
-                        prev = row[meses[i-1]]
-                        if not pd.isna(v) and not pd.isna(prev):
-                            if v > prev: arrow = "▲"
-                            elif v < prev: arrow = "▼"
-                            else: arrow = "▶"
-                    with cols[i]:
-                        st.markdown(f"**{m[:3]}**", help=m)
-                        st.markdown(color_badge(txt, c), unsafe_allow_html=True)
-                        st.markdown(f"{arrow} `{val_str}`")
+        render_indicator_list(subset, val_num, 'num', area)
+
+timing.add('indicadores y gráficos', time.perf_counter() - t0)
 
 st.success("Dashboard generado con éxito")
 
@@ -241,4 +280,6 @@ st.markdown(
     "Desarrollado por: Alejandra Valderrama. Jefe de Investigaciones y Desarrollo Social ESIP SAS ESP"
     "</div>",
     unsafe_allow_html=True,
-)
\ No newline at end of file
+)
+
+timing.render_panel(timing.finish())
@@ -0,0 +1,4 @@
+"""
+Módulos compartidos por los tableros de indicadores (app.py,
+dashboard_indicadores_final.py y esip_2025/App.py).
+"""
@@ -0,0 +1,142 @@
+"""
+Limpieza vectorizada de los valores mensuales de los indicadores.
+
+Reemplaza ``df[mes].apply(limpiar_numeros)`` y ``apply(limpiar_porcentajes)``
+(una llamada de Python por celda, mes por mes) por una sola pasada sobre el
+bloque de meses completo, con los mismos resultados:
+
+- numérico: se quitan ',', '$' y los espacios (separadores de miles como
+  "43,662") y, si hay paréntesis, lo que va desde el primer '('
+  ("12 (parcial)" -> 12)
+- porcentaje: se quitan '%', ',' y los espacios
+
+Las celdas del bloque se unen en una sola cadena: los caracteres se quitan
+con un único str.translate y el corte en '(' con una sola búsqueda que solo
+toca las celdas con paréntesis. La conversión es float() por tramos de TRAMO
+celdas, y solo los tramos con algún texto no numérico se convierten celda
+por celda. Las celdas de texto que no quedan como número se devuelven como
+NaN y se informan en el reporte de rechazos.
+"""
+
+import re
+import string
+
+import numpy as np
+import pandas as pd
+
+# Caracteres que se eliminan y si se corta en el primer '(' según el tipo de valor
+REGLAS = {
+    'numero': {'quitar': str.maketrans('', '', ',$' + string.whitespace), 'parentesis': True},
+    'porcentaje': {'quitar': str.maketrans('', '', '%,' + string.whitespace), 'parentesis': False},
+}
+
+# Separador de celdas en la cadena unida (no aparece en los CSV de indicadores)
+_SEPARADOR = '\x00'
+# Desde el primer '(' de una celda hasta su final, si después hay un ')'
+_PARENTESIS = re.compile(r'\((?=[^\x00]*\))[^\x00]*')
+# Celdas por tramo de conversión
+TRAMO = 1024
+
+
+def _to_float(celdas):
+    """float() de cada celda; NaN en las que no son número."""
+    numeros = np.full(len(celdas), np.nan)
+    for i, celda in enumerate(celdas):
+        try:
+            numeros[i] = float(celda)
+        except ValueError:
+            pass
+    return numeros
+
+
+def parse_values(values, kind='numero'):
+    """
+    Convierte valores numéricos o en texto a float en una sola pasada.
+
+    Args:
+        values: Serie o arreglo (de cualquier forma) con los valores
+        kind: 'numero' o 'porcentaje' (ver REGLAS)
+
+    Returns:
+        Tupla (numeros, rechazados): arreglo float64 y máscara booleana de las
+        celdas no vacías que no se pudieron convertir, ambos con la forma de values
+    """
+    regla = REGLAS[kind]
+    arreglo = np.asarray(values)
+    forma = arreglo.shape
+    if arreglo.dtype.kind in 'biuf':
+        return arreglo.astype('float64'), np.zeros(forma, dtype=bool)
+
+    celdas = arreglo.astype(object).ravel()
+    nulos = pd.isna(celdas)
+    # Los nulos se convierten como 'nan' para que no interrumpan los tramos de float()
+    celdas[nulos] = 'nan'
+    celdas = celdas.tolist()
+    try:
+        unido = _SEPARADOR.join(celdas)
+    except TypeError:
+        # Floats o ints de Python (columnas que no son solo texto)
+        celdas = [str(celda) for celda in celdas]
+        unido = _SEPARADOR.join(celdas)
+    if unido.count(_SEPARADOR) != len(celdas) - 1:
+        # Un NUL dentro de una celda la partiría: se reemplaza por un carácter que float() rechaza
+        unido = _SEPARADOR.join(celda.replace(_SEPARADOR, '\ufffd') for celda in celdas)
+
+    unido = unido.translate(regla['quitar'])
+    if regla['parentesis'] and '(' in unido:
+        unido = _PARENTESIS.sub('', unido)
+    celdas = unido.split(_SEPARADOR)
+
+    numeros = np.empty(len(celdas))
+    for inicio in range(0, len(celdas), TRAMO):
+        tramo = celdas[inicio:inicio + TRAMO]
+        try:
+            numeros[inicio:inicio + len(tramo)] = list(map(float, tramo))
+        except ValueError:
+            numeros[inicio:inicio + len(tramo)] = _to_float(tramo)
+
+    # Rechazadas: celdas no nulas que quedaron en NaN, salvo las que quedaron vacías
+    rechazados = ~nulos & np.isnan(numeros)
+    candidatas = np.flatnonzero(rechazados)
+    rechazados[candidatas] = [celdas[i] != '' for i in candidatas]
+    return numeros.reshape(forma), rechazados.reshape(forma)
+
+
+def clean_month_block(df, columns, kind='numero'):
+    """
+    Limpia las columnas de meses de un DataFrame en una sola pasada.
+
+    Args:
+        df: DataFrame de indicadores (se modifica en sitio)
+        columns: Columnas a limpiar (las ausentes se ignoran)
+        kind: 'numero' o 'porcentaje' (ver REGLAS)
+
+    Returns:
+        DataFrame de rechazos con 'Fila', 'Indicador' (si existe), 'Columna' y
+        'Valor' original de cada celda que no se pudo convertir
+    """
+    columnas = [c for c in columns if c in df.columns]
+    reporte = pd.DataFrame(columns=['Fila', 'Indicador', 'Columna', 'Valor'])
+    if not columnas:
+        return reporte
+    bloque = df[columnas].to_numpy(dtype=object)
+    rechazados = np.zeros(bloque.shape, dtype=bool)
+    # Las columnas que pandas ya leyó como números no pasan por el texto
+    de_texto = [j for j, c in enumerate(columnas) if df[c].dtype.kind not in 'biuf']
+    if de_texto:
+        numeros, rechazados[:, de_texto] = parse_values(bloque[:, de_texto], kind)
+        for k, j in enumerate(de_texto):
+            df[columnas[j]] = numeros[:, k]
+    for j, columna in enumerate(columnas):
+        if j not in de_texto:
+            df[columna] = df[columna].astype('float64')
+
+    filas, cols = np.nonzero(rechazados)
+    if len(filas):
+        reporte = pd.DataFrame({
+            'Fila': df.index[filas],
+            'Indicador': df['Indicador'].to_numpy()[filas] if 'Indicador' in df.columns else None,
+            'Columna': np.asarray(columnas, dtype=object)[cols],
+            'Valor': bloque[filas, cols],
+        })
+    return reporte
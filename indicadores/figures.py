@@ -0,0 +1,146 @@
+"""
+Figuras de pequeños múltiplos para los tableros de indicadores.
+
+Todos los indicadores de un área se dibujan en una sola figura a partir de la
+matriz indicador × mes (indicator_matrix), en lugar de una figura o una traza
+armada filtrando el formato largo por cada indicador:
+
+- sparkline_grid: un panel por indicador sobre un único par de ejes; las
+  líneas son una sola traza WebGL (las barras, una sola traza de barras) y
+  los nombres una traza de texto. No hay ejes ni anotaciones por indicador y
+  las coordenadas y los valores viajan como arreglos binarios compactos
+  (int16/float32), así que el JSON solo crece con los valores
+- indicator_grid: sparkline_grid con el formato de tooltip de los tableros
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Paneles por fila y alto en píxeles de cada fila
+COLUMNAS = 3
+ALTO_FILA = 90
+COLOR = '#2563eb'
+# Alto de un panel y separación vertical entre filas, en unidades del eje Y
+_ALTO_PANEL = 1.0
+_PASO_FILA = 1.6
+
+
+def abbreviate(texto, max_len=40):
+    """Nombre recortado con '...' si supera max_len caracteres."""
+    return texto if len(texto) <= max_len else texto[:max_len - 3] + "..."
+
+
+def indicator_matrix(df, meses, columna='Indicador'):
+    """
+    Matriz de valores y nombres de los indicadores de un DataFrame ancho.
+
+    Returns:
+        Tupla (valores, nombres): matriz float64 (indicadores × meses) y lista
+        de nombres en el orden de las filas
+    """
+    return df[list(meses)].to_numpy(dtype='float64'), df[columna].astype(str).tolist()
+
+
+def _normalize(valores, rango_y=None):
+    """Valores llevados a [0, 1] por fila (mínimo y máximo propios) o al rango_y común."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if rango_y is not None:
+            minimo, maximo = rango_y
+            return np.clip((valores - minimo) / (maximo - minimo), 0.0, 1.0)
+        minimo = np.min(np.where(np.isnan(valores), np.inf, valores), axis=1, keepdims=True)
+        maximo = np.max(np.where(np.isnan(valores), -np.inf, valores), axis=1, keepdims=True)
+        rango = maximo - minimo
+        normalizado = np.where(rango > 0, (valores - minimo) / rango, 0.5)
+    normalizado[np.isnan(valores)] = np.nan
+    return normalizado
+
+
+def _compact_values(valores):
+    """
+    Valores originales para el tooltip en float32 si no cambian a dos
+    decimales (conteos y porcentajes); si no, en float64.
+    """
+    reducidos = valores.astype('float32')
+    with np.errstate(invalid='ignore'):
+        iguales = np.abs(reducidos - valores) < 0.005
+    return reducidos if np.all(iguales | np.isnan(valores)) else valores
+
+
+def sparkline_grid(valores, nombres, meses, tipo='linea', columnas=COLUMNAS, titulo=None,
+                   formato='%{customdata:,.1f}', rango_y=None, color=COLOR):
+    """
+    Un panel por indicador sobre un único par de ejes.
+
+    Cada panel ocupa len(meses) posiciones en X y una unidad en Y; sin
+    rango_y cada indicador se normaliza a su propio mínimo y máximo. El
+    tooltip muestra el mes y el valor original (en customdata).
+
+    Args:
+        valores: Matriz float (indicadores × meses); NaN = mes sin dato
+        nombres: Nombre de cada indicador (fila de valores)
+        meses: Nombres de los meses (columnas de valores)
+        tipo: 'linea' o 'barra'
+        columnas: Paneles por fila
+        titulo: Título de la figura
+        formato: Formato del valor original en el tooltip (plantilla de plotly sobre customdata)
+        rango_y: Rango común a todos los paneles (None = escala propia por indicador)
+
+    Returns:
+        go.Figure
+    """
+    valores = np.asarray(valores, dtype='float64')
+    n, m = valores.shape
+    columnas = max(1, min(columnas, n))
+    filas = max(1, -(-n // columnas))
+    fila, columna = np.divmod(np.arange(n), columnas)
+    normalizado = _normalize(valores, rango_y)
+
+    # Los paneles quedan a m + 2 posiciones: X entera (int16) y una columna NaN que separa las líneas
+    ancho = m + 2
+    base_y = ((filas - 1 - fila) * _PASO_FILA).astype('float32')
+    x = (columna[:, None] * ancho + np.arange(m + 1)[None, :]).astype('int16')
+    originales = np.full((n, m + 1), np.nan)
+    originales[:, :m] = valores
+    originales = _compact_values(originales)
+    etiquetas = np.array([mes[:3] for mes in meses] + [''], dtype=object)
+    plantilla = f'%{{text}}: {formato}<extra></extra>'
+
+    if tipo == 'barra':
+        # Las barras no necesitan la columna separadora
+        alto = np.nan_to_num(normalizado * 0.9 * _ALTO_PANEL).astype('float32')
+        serie = go.Bar(x=x[:, :m].ravel(), y=alto.ravel(), base=np.repeat(base_y, m),
+                       customdata=originales[:, :m].ravel(), text=np.tile(etiquetas[:m], n), textposition='none',
+                       width=0.8, marker_color=color, hovertemplate=plantilla)
+    else:
+        y = np.full((n, m + 1), np.nan, dtype='float32')
+        y[:, :m] = base_y[:, None] + normalizado * _ALTO_PANEL
+        serie = go.Scattergl(x=x.ravel(), y=y.ravel(), customdata=originales.ravel(), text=np.tile(etiquetas, n),
+                             mode='lines+markers', line=dict(width=1.5, color=color),
+                             marker=dict(size=4, color=color), connectgaps=False, hovertemplate=plantilla)
+
+    fig = go.Figure([
+        serie,
+        go.Scatter(x=(columna * ancho).astype('int16'), y=base_y + np.float32(1.35), mode='text',
+                   text=[abbreviate(t, 38) for t in nombres], textposition='middle right',
+                   textfont=dict(size=10), hoverinfo='skip'),
+    ])
+    fig.update_xaxes(visible=False)
+    fig.update_yaxes(visible=False)
+    fig.update_layout(title=titulo, height=filas * ALTO_FILA + 60, showlegend=False, bargap=0,
+                      margin=dict(l=10, r=10, t=50 if titulo else 10, b=10))
+    return fig
+
+
+def indicator_grid(valores, nombres, meses, tipo='linea', titulo=None, formato='%{y:,.0f}', rango_y=None,
+                   columnas=COLUMNAS):
+    """
+    Figura de pequeños múltiplos (ver sparkline_grid) con el formato de
+    tooltip de los tableros, escrito sobre '%{y...}'.
+
+    Returns:
+        go.Figure, o None si no hay indicadores
+    """
+    if len(nombres) == 0:
+        return None
+    return sparkline_grid(valores, nombres, meses, tipo=tipo, columnas=columnas, titulo=titulo,
+                          formato=formato.replace('%{y', '%{customdata'), rango_y=rango_y)
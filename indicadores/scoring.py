@@ -0,0 +1,133 @@
+"""
+Motor vectorizado de valoraciones (Alto/Medio/Bajo) de esip_2025/App.py.
+
+Las reglas de valorar_porcentaje y valorar_numerico se evalúan sobre la
+matriz indicador × mes completa con operaciones de arreglos, en lugar de un
+apply por fila y por mes. El resultado es una matriz int8 de códigos (ver
+ETIQUETAS y COLORES) alineada por posición con las filas del DataFrame:
+
+- porcentaje: >= 90 Alto, >= 80 Medio, si no Bajo; en los indicadores de
+  INDICADORES_CERO (accidentalidad) 0 % es Alto y cualquier otro valor Bajo
+- numérico: cambio mes a mes (actual - anterior) / anterior * 100 según el
+  Tipo del indicador; POS: >= 5 Alto, >= -5 Medio; NEG: <= -10 Alto,
+  <= 10 Medio; NEU, primer mes, vacíos o anterior en 0 quedan N/A
+"""
+
+import numpy as np
+import pandas as pd
+
+# Códigos de valoración (índices de ETIQUETAS y COLORES)
+NA, BAJO, MEDIO, ALTO = 0, 1, 2, 3
+ETIQUETAS = np.array(['N/A', 'Bajo', 'Medio', 'Alto'], dtype=object)
+COLORES = np.array(['gray', 'red', 'orange', 'green'], dtype=object)
+
+# Cortes por defecto (los de valorar_porcentaje y valorar_numerico)
+UMBRALES = {
+    'porcentaje_alto': 90.0,
+    'porcentaje_medio': 80.0,
+    'pos_alto': 5.0,
+    'pos_medio': -5.0,
+    'neg_alto': -10.0,
+    'neg_medio': 10.0,
+}
+
+# Indicadores donde 0 % es Alto y cualquier valor mayor es Bajo (comparados con strip().casefold())
+INDICADORES_CERO = ['tasa de accidentes laborales', 'prevalencia de enfermedades']
+
+
+def _umbrales(umbrales):
+    return UMBRALES if umbrales is None else {**UMBRALES, **umbrales}
+
+
+def zero_target_mask(indicadores):
+    """Máscara de los indicadores de INDICADORES_CERO."""
+    nombres = pd.Series(indicadores, dtype=object).fillna('').astype(str)
+    return nombres.str.strip().str.casefold().isin(INDICADORES_CERO).to_numpy()
+
+
+def score_percentages(valores, cero, umbrales=None):
+    """
+    Valoración de los indicadores porcentuales.
+
+    Args:
+        valores: Matriz float (indicadores × meses) en porcentaje
+        cero: Máscara por indicador de zero_target_mask
+        umbrales: Cortes que reemplazan a los de UMBRALES (solo las claves dadas)
+
+    Returns:
+        Matriz int8 de códigos con la forma de valores
+    """
+    u = _umbrales(umbrales)
+    valores = np.asarray(valores, dtype='float64')
+    codigos = np.select(
+        [valores >= u['porcentaje_alto'], valores >= u['porcentaje_medio']], [ALTO, MEDIO], BAJO
+    ).astype(np.int8)
+    cero = np.asarray(cero, dtype=bool)
+    codigos[cero] = np.where(valores[cero] == 0, ALTO, BAJO)
+    codigos[np.isnan(valores)] = NA
+    return codigos
+
+
+def score_month_over_month(valores, tipos, umbrales=None):
+    """
+    Valoración de los indicadores numéricos por cambio contra el mes anterior.
+
+    Args:
+        valores: Matriz float (indicadores × meses)
+        tipos: Tipo por indicador ('POS', 'NEG' o 'NEU', ya en mayúsculas)
+        umbrales: Cortes que reemplazan a los de UMBRALES (solo las claves dadas)
+
+    Returns:
+        Matriz int8 de códigos con la forma de valores (el primer mes es N/A)
+    """
+    u = _umbrales(umbrales)
+    valores = np.asarray(valores, dtype='float64')
+    tipos = np.asarray(tipos, dtype=object)
+    codigos = np.zeros(valores.shape, dtype=np.int8)
+    if valores.shape[1] < 2:
+        return codigos
+    actual, anterior = valores[:, 1:], valores[:, :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cambio = (actual - anterior) / anterior * 100.0
+    pos = (tipos == 'POS')[:, None]
+    neg = (tipos == 'NEG')[:, None]
+    codigos[:, 1:] = np.select(
+        [pos & (cambio >= u['pos_alto']), pos & (cambio >= u['pos_medio']), pos,
+         neg & (cambio <= u['neg_alto']), neg & (cambio <= u['neg_medio']), neg],
+        [ALTO, MEDIO, BAJO, ALTO, MEDIO, BAJO],
+        NA,
+    )
+    invalidos = np.isnan(actual) | np.isnan(anterior) | (anterior == 0)
+    codigos[:, 1:][invalidos] = NA
+    return codigos
+
+
+def labels(codigos):
+    """Etiquetas ('Alto', 'Medio', ...) de una matriz de códigos."""
+    return ETIQUETAS[codigos]
+
+
+def colors(codigos):
+    """Colores del badge ('green', 'orange', ...) de una matriz de códigos."""
+    return COLORES[codigos]
+
+
+def badge_changes(antes, despues):
+    """
+    Badges que cambian entre dos matrices de códigos (p. ej. umbrales por
+    defecto contra simulados).
+
+    Returns:
+        DataFrame con 'De', 'A' y 'Badges' por cada transición que ocurre,
+        de la más frecuente a la menos
+    """
+    n = len(ETIQUETAS)
+    conteos = np.bincount((np.asarray(antes, dtype=np.intp) * n + np.asarray(despues, dtype=np.intp)).ravel(),
+                          minlength=n * n).reshape(n, n)
+    np.fill_diagonal(conteos, 0)
+    de, a = np.nonzero(conteos)
+    return (
+        pd.DataFrame({'De': ETIQUETAS[de], 'A': ETIQUETAS[a], 'Badges': conteos[de, a]})
+        .sort_values('Badges', ascending=False, kind='stable')
+        .reset_index(drop=True)
+    )
@@ -0,0 +1,3 @@
+"""
+Módulos compartidos por los tableros de podas (app_v2.py y Podas_2025/app.py).
+"""
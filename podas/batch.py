@@ -0,0 +1,252 @@
+"""
+Generación por lotes de rutas óptimas por comuna, sin Streamlit.
+
+En Podas_2025 el CSV ruta_optima.csv se descarga para una combinación de
+filtros a la vez. Esta herramienta carga los PQR igual que la app
+(podas.loaders.load_pqr), calcula con podas.routing la ruta de cada comuna en un pool de
+procesos (una tarea por comuna) y escribe, por comuna, el CSV en orden de
+visita, el GeoJSON de puntos y recorrido y un mapa HTML independiente, más
+resumen_comunas.csv con kilómetros y tiempos.
+
+La mejora local de la ruta corre hasta el óptimo local (sin límite de
+tiempo) y los identificadores de los elementos del mapa se numeran en orden,
+así que los archivos son idénticos con cualquier número de procesos.
+
+    python -m podas.batch                            # data/ -> salidas/rutas
+    python -m podas.batch --out rutas --workers 4
+    python -m podas.batch --pendientes --comunas "COMUNA 01" "COMUNA 02"
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from podas.loaders import PQR_FILE, load_pqr
+from podas.routing import plan_route
+from podas.scheduling import pending_requests, work_order_geojson
+
+# Columnas de cada archivo de ruta, en este orden (las ausentes se ignoran)
+COLUMNAS_RUTA = [
+    'Orden_ruta', 'Sticker', 'ID_Luminaria', 'P.Q.R.S', 'Comuna', 'Inventariado',
+    'Requiere_Acción', 'Latitud', 'Longitud', 'Distancia_tramo_km', 'Distancia_acumulada_km',
+]
+
+# Mismos colores y popup que el mapa de Podas_2025
+COLOR_VERDE = '#70e000'
+COLOR_ROJO = '#d80032'
+POPUP_RUTA = (
+    "<b>Orden:</b> {Orden_ruta}<br>"
+    "<b>Sticker:</b> {Sticker}<br>"
+    "<b>P.Q.R.S:</b> {P.Q.R.S}<br>"
+    "<b>Inventariado:</b> {Inventariado}<br>"
+    "<b>Requiere Acción:</b> {Requiere_Acción}"
+)
+
+
+def comuna_slug(comuna):
+    """Nombre de archivo de una comuna: 'COMUNA 01' -> 'comuna_01'."""
+    if comuna is None or pd.isna(comuna):
+        return 'sin_comuna'
+    texto = unicodedata.normalize('NFKD', str(comuna)).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '_', texto.lower()).strip('_') or 'sin_comuna'
+
+
+def _stable_ids(mapa):
+    """
+    Numera en orden los elementos del mapa en lugar de los uuid aleatorios de
+    folium, para que el HTML de una misma ruta sea idéntico en cada ejecución.
+    """
+    pendientes = [mapa.get_root()]
+    contador = 0
+    while pendientes:
+        elemento = pendientes.pop(0)
+        elemento._id = f"{contador:05d}"
+        contador += 1
+        pendientes.extend(elemento._children.values())
+
+
+def route_map_html(df_ruta, lat_col='Latitud', lon_col='Longitud'):
+    """
+    Mapa HTML independiente de una ruta: puntos PQR con el estilo de
+    Podas_2025, recorrido y marcadores de inicio y fin.
+
+    Args:
+        df_ruta: DataFrame en orden de visita (ver podas.routing.plan_route)
+        lat_col: Columna de latitud
+        lon_col: Columna de longitud
+
+    Returns:
+        Texto HTML
+    """
+    import folium
+    from podas.map_layers import add_point_layer
+
+    coordenadas = df_ruta[[lat_col, lon_col]].astype(float).values.tolist()
+    mapa = folium.Map(location=df_ruta[[lat_col, lon_col]].astype(float).mean().tolist(),
+                      zoom_start=14, tiles='OpenStreetMap')
+    add_point_layer(
+        mapa,
+        df_ruta,
+        fields=['Orden_ruta', 'Sticker', 'P.Q.R.S', 'Inventariado', 'Requiere_Acción'],
+        lat_col=lat_col,
+        lon_col=lon_col,
+        base_style={'color': 'black', 'weight': 1, 'fill': True, 'fillOpacity': 0.7},
+        styles={
+            'Inventariado': {'SI': {'fillColor': COLOR_VERDE}, '*': {'fillColor': COLOR_ROJO}},
+            'Requiere_Acción': {'SI': {'radius': 8}, '*': {'radius': 6}},
+        },
+        popup=POPUP_RUTA,
+        tooltip='{Orden_ruta}. Sticker: {Sticker}',
+        control=False
+    )
+    if len(coordenadas) > 1:
+        folium.PolyLine(locations=coordenadas, color='green', weight=3, opacity=0.7,
+                        tooltip='Ruta óptima').add_to(mapa)
+        folium.Marker(location=coordenadas[0], tooltip='INICIO - Punto de partida',
+                      icon=folium.Icon(color='green', icon='play', prefix='fa')).add_to(mapa)
+        folium.Marker(location=coordenadas[-1], tooltip='FIN - Punto final',
+                      icon=folium.Icon(color='darkred', icon='stop', prefix='fa')).add_to(mapa)
+        mapa.fit_bounds([[min(c[0] for c in coordenadas), min(c[1] for c in coordenadas)],
+                         [max(c[0] for c in coordenadas), max(c[1] for c in coordenadas)]])
+    _stable_ids(mapa)
+    return mapa.get_root().render()
+
+
+def route_comuna(comuna, df, out_dir, formats=('csv', 'geojson', 'html'), time_limit=None):
+    """
+    Calcula y escribe la ruta de una comuna (se ejecuta en un proceso del pool).
+
+    Args:
+        comuna: Nombre de la comuna
+        df: PQR de la comuna
+        out_dir: Carpeta de salida
+        formats: Archivos a escribir ('csv', 'geojson' y/o 'html')
+        time_limit: Segundos máximos de mejora local (None = hasta el óptimo local)
+
+    Returns:
+        Diccionario con 'Comuna', 'archivo', 'puntos', 'km_ruta',
+        'km_orden_actual', 'ahorro_pct', 'ruta_s' y 'escritura_s'
+    """
+    out_dir = Path(out_dir)
+    t0 = time.perf_counter()
+    df_ruta, resumen = plan_route(df, time_limit=time_limit)
+    ruta_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    base = out_dir / f"ruta_optima_{comuna_slug(comuna)}"
+    df_ruta = df_ruta[[c for c in COLUMNAS_RUTA if c in df_ruta.columns]]
+    if 'csv' in formats:
+        df_ruta.to_csv(base.with_suffix('.csv'), index=False)
+    if not df_ruta.empty:
+        if 'geojson' in formats:
+            base.with_suffix('.geojson').write_text(
+                json.dumps(work_order_geojson(df_ruta), ensure_ascii=False), encoding='utf-8'
+            )
+        if 'html' in formats:
+            base.with_suffix('.html').write_text(route_map_html(df_ruta), encoding='utf-8')
+    return {
+        'Comuna': comuna,
+        'archivo': base.name,
+        'puntos': resumen['puntos'],
+        'km_ruta': round(resumen['km_ruta'], 3),
+        'km_orden_actual': round(resumen['km_orden_actual'], 3),
+        'ahorro_pct': round(resumen['ahorro_pct'], 2),
+        'ruta_s': ruta_s,
+        'escritura_s': time.perf_counter() - t0,
+    }
+
+
+def route_all_comunas(df, out_dir, workers=None, formats=('csv', 'geojson', 'html'), time_limit=None):
+    """
+    Rutas de todas las comunas, una tarea por comuna en un pool de procesos.
+
+    Las comunas se reparten de mayor a menor número de puntos (el costo de la
+    ruta crece más que linealmente) y el resumen se escribe ordenado por comuna.
+
+    Args:
+        df: PQR (ver load_pqr); las filas sin coordenadas se descartan
+        out_dir: Carpeta de salida (se crea si no existe)
+        workers: Procesos del pool (None = uno por CPU; 1 = en este proceso)
+        formats: Archivos a escribir por comuna ('csv', 'geojson' y/o 'html')
+        time_limit: Segundos máximos de mejora local por comuna (None = sin límite)
+
+    Returns:
+        DataFrame con una fila por comuna (ver route_comuna); también se
+        escribe en resumen_comunas.csv sin las columnas de tiempo
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    puntos = df.dropna(subset=['Latitud', 'Longitud'])
+    comunas = puntos['Comuna'].astype(object).where(puntos['Comuna'].notna(), None)
+    grupos = sorted(
+        ((comuna, grupo) for comuna, grupo in puntos.groupby(comunas.fillna(''), sort=True)),
+        key=lambda item: -len(item[1]),
+    )
+    tareas = [(comuna or None, grupo, str(out_dir), formats, time_limit) for comuna, grupo in grupos]
+    if workers == 1:
+        resultados = [route_comuna(*tarea) for tarea in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resultados = list(pool.map(route_comuna, *zip(*tareas))) if tareas else []
+
+    reporte = pd.DataFrame(resultados)
+    if not reporte.empty:
+        reporte = reporte.sort_values('archivo', ignore_index=True)
+        reporte.drop(columns=['ruta_s', 'escritura_s']).to_csv(out_dir / 'resumen_comunas.csv', index=False)
+    return reporte
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m podas.batch',
+        description='Genera la ruta óptima de cada comuna (CSV, GeoJSON y mapa HTML).',
+    )
+    parser.add_argument('--pqr', default=str(PQR_FILE), help=f'CSV de PQR (por defecto, {PQR_FILE})')
+    parser.add_argument('--out', default='salidas/rutas', help='Carpeta de salida (por defecto, salidas/rutas)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos en paralelo (por defecto, uno por CPU; 1 = sin pool)')
+    parser.add_argument('--comunas', nargs='*', default=None, help='Comunas a procesar (por defecto, todas)')
+    parser.add_argument('--pendientes', action='store_true',
+                        help='Solo PQR con Requiere Acción = SI (como la programación de cuadrillas)')
+    parser.add_argument('--formatos', nargs='+', default=['csv', 'geojson', 'html'],
+                        choices=['csv', 'geojson', 'html'], help='Archivos por comuna')
+    parser.add_argument('--tiempo-limite', type=float, default=None,
+                        help='Segundos máximos de mejora local por comuna (por defecto, sin límite; '
+                             'con límite la salida depende de la carga del equipo)')
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        df = load_pqr(args.pqr)
+    except FileNotFoundError:
+        parser.error(f"no existe: {args.pqr}")
+    if args.pendientes:
+        df = pending_requests(df)
+    if args.comunas:
+        df = df[df['Comuna'].isin(args.comunas)]
+    carga = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    reporte = route_all_comunas(df, args.out, workers=args.workers, formats=tuple(args.formatos),
+                                time_limit=args.tiempo_limite)
+    total = time.perf_counter() - t0
+
+    for fila in reporte.itertuples():
+        print(f"{fila.archivo}: {fila.puntos:,} puntos | {fila.km_ruta:8.1f} km "
+              f"(orden actual {fila.km_orden_actual:.1f} km, ahorro {fila.ahorro_pct:.1f} %) | "
+              f"ruta {fila.ruta_s:.2f} s, escritura {fila.escritura_s:.2f} s")
+    trabajo = reporte['ruta_s'].sum() + reporte['escritura_s'].sum() if not reporte.empty else 0.0
+    print(f"{len(reporte)} comunas, {len(df):,} PQR | carga {carga:.2f} s, rutas {total:.2f} s "
+          f"({trabajo:.2f} s de trabajo por comuna sumado) -> {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Caché en disco (Parquet) de DataFrames derivados de archivos fuente.
+
+Cada entrada se guarda en una carpeta con un Parquet por DataFrame y un
+manifest.json con la huella de las fuentes (tamaño, fecha de modificación y
+hash del contenido) y la versión del código que las procesó. Si la huella no
+coincide, los DataFrames se reconstruyen y la caché se reescribe.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+MANIFEST = 'manifest.json'
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Hash BLAKE2b del contenido de un archivo, leído por bloques."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as fh:
+        for bloque in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def code_version(*objetos):
+    """Hash del código fuente de los módulos (o funciones) que construyen los datos."""
+    digest = hashlib.blake2b(digest_size=16)
+    for objeto in objetos:
+        digest.update(inspect.getsource(objeto).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def fingerprint(sources, version):
+    """
+    Huella de las fuentes y de la versión del código.
+
+    Args:
+        sources: Rutas de los archivos fuente (los que no existen también cuentan)
+        version: Versión del código (ver code_version)
+
+    Returns:
+        Diccionario serializable en JSON
+    """
+    archivos = {}
+    for ruta in sources:
+        ruta = Path(ruta)
+        if ruta.exists():
+            stat = ruta.stat()
+            archivos[str(ruta)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': file_hash(ruta)}
+        else:
+            archivos[str(ruta)] = None
+    return {'version': version, 'pandas': pd.__version__, 'files': archivos}
+
+
+def read_cache(cache_dir, huella):
+    """
+    Lee los DataFrames de la caché si su huella coincide.
+
+    Returns:
+        Tupla de DataFrames, o None si la caché no existe o está desactualizada
+    """
+    cache_dir = Path(cache_dir)
+    try:
+        manifest = json.loads((cache_dir / MANIFEST).read_text(encoding='utf-8'))
+        if manifest['fingerprint'] != huella:
+            return None
+        return tuple(pd.read_parquet(cache_dir / nombre) for nombre in manifest['frames'])
+    except (OSError, ValueError, KeyError, ImportError):
+        return None
+
+
+def write_cache(cache_dir, huella, frames):
+    """
+    Escribe los DataFrames y su manifest en la caché.
+
+    Se escribe primero en una carpeta temporal propia (varias sesiones pueden
+    escribir a la vez) y luego se reemplaza la entrada completa, para que una
+    escritura interrumpida no deje una caché a medias. Cada escritura solo
+    borra sus propias carpetas; si otra publicó su entrada primero, esta se
+    descarta.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.parent.mkdir(parents=True, exist_ok=True)
+    temporal = Path(tempfile.mkdtemp(dir=cache_dir.parent, prefix=cache_dir.name + '.'))
+    anterior = temporal.with_name(temporal.name + '.anterior')
+    try:
+        nombres = [f"frame_{i}.parquet" for i in range(len(frames))]
+        for nombre, frame in zip(nombres, frames):
+            frame.to_parquet(temporal / nombre, index=False)
+        (temporal / MANIFEST).write_text(
+            json.dumps({'fingerprint': huella, 'frames': nombres}, indent=2), encoding='utf-8'
+        )
+
+        # La entrada anterior se aparta con un nombre propio antes de ocupar su lugar
+        try:
+            os.replace(cache_dir, anterior)
+        except FileNotFoundError:
+            pass
+        try:
+            os.replace(temporal, cache_dir)
+        except OSError:
+            # Otra escritura publicó su entrada entre los dos reemplazos
+            if not (cache_dir / MANIFEST).exists():
+                raise
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+        shutil.rmtree(anterior, ignore_errors=True)
+
+
+def load_or_build(cache_dir, sources, version, builder):
+    """
+    Devuelve los DataFrames desde la caché o los reconstruye con builder.
+
+    Args:
+        cache_dir: Carpeta de la entrada de caché
+        sources: Archivos fuente que invalidan la caché al cambiar
+        version: Versión del código (ver code_version)
+        builder: Función sin argumentos que devuelve una tupla de DataFrames
+
+    Returns:
+        Tupla (frames, desde_cache)
+    """
+    huella = fingerprint(sources, version)
+    frames = read_cache(cache_dir, huella)
+    if frames is not None:
+        return frames, True
+
+    frames = tuple(builder())
+    try:
+        write_cache(cache_dir, huella, frames)
+    except (OSError, ValueError, TypeError, ImportError):
+        # Sin permisos de escritura, columnas no serializables o sin pyarrow: se sigue sin caché
+        pass
+    return frames, False
@@ -0,0 +1,148 @@
+"""
+Gráficos de barras de matplotlib con el tema de las apps, renderizados a PNG.
+
+Los tres gráficos de barras de Podas_2025 repetían el mismo bloque de estilo
+(fondo oscuro, ejes y rejilla blancos, colores SI/NO) y se volvían a crear y
+rasterizar con Agg en cada rerun. Aquí el estilo vive en un solo lugar
+(style_axes) y cada gráfico es una función pura de sus conteos que devuelve
+los bytes del PNG, así que la app puede guardarlos en caché con los conteos y
+el tema como clave.
+
+Las figuras se crean con matplotlib.figure.Figure, sin pyplot: no dependen del
+estado global de pyplot ni hay que cerrarlas, y se pueden renderizar desde
+varios hilos (una sesión de Streamlit por hilo).
+"""
+
+import io
+
+from matplotlib.figure import Figure
+
+# Resolución de los PNG (st.pyplot usaba 200 dpi; 150 dpi sigue siendo nítido
+# al ancho de la página y reduce a la mitad los píxeles a rasterizar)
+DPI = 150
+
+# Ancho máximo (px) con que Streamlit muestra una imagen; un PNG más ancho se
+# decodifica, reescala y recodifica en cada st.image, aunque venga de la caché
+MAX_WIDTH_PX = 1460
+
+THEMES = {
+    'oscuro': {
+        'background': '#0E1117',
+        'foreground': 'white',
+        'grid_alpha': 0.3,
+        'bar_alpha': 0.8,
+    },
+}
+
+# Color de las barras por valor (en mayúsculas); los demás valores van en gris
+COLORS_SI_NO = {'SI': '#70e000', 'NO': '#d80032'}
+COLOR_OTHER = '#808080'
+
+
+def bar_color(label, colors=None):
+    """Color de una barra según su etiqueta (SI/NO sin distinguir mayúsculas)."""
+    colors = COLORS_SI_NO if colors is None else colors
+    return colors.get(str(label).upper(), COLOR_OTHER)
+
+
+def style_axes(ax, xlabel, ylabel, theme='oscuro', title=None, fontsize=11):
+    """
+    Estilo común de los gráficos de barras: fondo del tema, ejes y textos en el
+    color de primer plano, bordes superior y derecho ocultos y rejilla horizontal.
+
+    Args:
+        ax: Ejes de matplotlib
+        xlabel: Título del eje X
+        ylabel: Título del eje Y
+        theme: Nombre del tema (ver THEMES)
+        title: Título del gráfico (opcional)
+        fontsize: Tamaño de los títulos de los ejes
+    """
+    tema = THEMES[theme]
+    ax.figure.patch.set_facecolor(tema['background'])
+    ax.set_facecolor(tema['background'])
+    ax.set_xlabel(xlabel, color=tema['foreground'], fontsize=fontsize)
+    ax.set_ylabel(ylabel, color=tema['foreground'], fontsize=fontsize)
+    if title:
+        ax.set_title(title, color=tema['foreground'], fontsize=fontsize + 3, fontweight='bold', pad=20)
+    ax.tick_params(colors=tema['foreground'], labelsize=10)
+    ax.spines['bottom'].set_color(tema['foreground'])
+    ax.spines['left'].set_color(tema['foreground'])
+    ax.spines['top'].set_color(tema['background'])
+    ax.spines['right'].set_color(tema['background'])
+    ax.grid(axis='y', alpha=tema['grid_alpha'], color=tema['foreground'], linestyle='--')
+
+
+def figure_png(fig, theme='oscuro', dpi=DPI):
+    """Bytes PNG de una figura, con el fondo del tema y a lo sumo MAX_WIDTH_PX de ancho."""
+    dpi = min(dpi, MAX_WIDTH_PX / fig.get_figwidth())
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, facecolor=THEMES[theme]['background'])
+    return buffer.getvalue()
+
+
+def bar_chart_png(labels, values, xlabel, ylabel='Conteo', colors=None, theme='oscuro',
+                  figsize=(6, 4), dpi=DPI):
+    """
+    Gráfico de barras simple (por ejemplo, conteo por Inventariado).
+
+    Args:
+        labels: Etiquetas de las barras
+        values: Altura de cada barra
+        xlabel: Título del eje X
+        ylabel: Título del eje Y
+        colors: Diccionario {etiqueta en mayúsculas: color} (por defecto COLORS_SI_NO)
+        theme: Nombre del tema (ver THEMES)
+        figsize: Tamaño de la figura en pulgadas
+        dpi: Resolución del PNG
+
+    Returns:
+        Bytes del PNG
+    """
+    tema = THEMES[theme]
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot()
+    ax.bar([str(label) for label in labels], list(values), color=[bar_color(label, colors) for label in labels],
+           alpha=tema['bar_alpha'], edgecolor=tema['foreground'], linewidth=1.5)
+    style_axes(ax, xlabel, ylabel, theme)
+    return figure_png(fig, theme, dpi)
+
+
+def stacked_bar_png(categories, stacks, xlabel, ylabel='Conteo', title=None, legend_title=None,
+                    colors=None, theme='oscuro', figsize=(12, 6), dpi=DPI):
+    """
+    Gráfico de barras apiladas (por ejemplo, Inventariado por Comuna).
+
+    Args:
+        categories: Etiquetas del eje X
+        stacks: Lista de pares (etiqueta, valores por categoría), de abajo hacia arriba
+        xlabel: Título del eje X
+        ylabel: Título del eje Y
+        title: Título del gráfico (opcional)
+        legend_title: Título de la leyenda (opcional)
+        colors: Diccionario {etiqueta en mayúsculas: color} (por defecto COLORS_SI_NO)
+        theme: Nombre del tema (ver THEMES)
+        figsize: Tamaño de la figura en pulgadas
+        dpi: Resolución del PNG
+
+    Returns:
+        Bytes del PNG
+    """
+    tema = THEMES[theme]
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot()
+    x_pos = range(len(categories))
+    base = [0] * len(categories)
+    for etiqueta, valores in stacks:
+        valores = list(valores)
+        ax.bar(x_pos, valores, bottom=base, color=bar_color(etiqueta, colors), label=str(etiqueta),
+               alpha=tema['bar_alpha'], edgecolor=tema['foreground'], linewidth=1.5)
+        base = [b + v for b, v in zip(base, valores)]
+    style_axes(ax, xlabel, ylabel, theme, title=title, fontsize=12)
+    ax.set_xticks(list(x_pos))
+    ax.set_xticklabels([str(c) for c in categories], rotation=45, ha='right', color=tema['foreground'], fontsize=10)
+    leyenda = ax.legend(title=legend_title, title_fontsize=11, fontsize=10, facecolor=tema['background'],
+                        edgecolor=tema['foreground'], labelcolor=tema['foreground'])
+    leyenda.get_title().set_color(tema['foreground'])
+    return figure_png(fig, theme, dpi)
@@ -0,0 +1,117 @@
+"""
+Limpieza vectorizada de coordenadas.
+
+Reemplaza la limpieza celda por celda (``Series.apply(clean_coordinate)``) por
+operaciones en bloque de pandas/NumPy, conservando los mismos casos:
+comas como separador decimal, espacios, valores no numéricos y el rechazo de
+valores con ``abs(x) > 180``.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    _STRING_DTYPE = 'string[pyarrow]'
+    _FLOAT_DTYPE = 'float64[pyarrow]'
+except ImportError:
+    _STRING_DTYPE = 'string'
+    _FLOAT_DTYPE = 'float64'
+
+# Códigos de motivo para coordenadas rechazadas
+MOTIVO_VACIO = 'vacio'
+MOTIVO_NO_NUMERICO = 'no_numerico'
+MOTIVO_FUERA_DE_RANGO = 'fuera_de_rango'
+MOTIVOS = [MOTIVO_VACIO, MOTIVO_NO_NUMERICO, MOTIVO_FUERA_DE_RANGO]
+
+LIMITE_COORDENADA = 180
+
+# Número decimal tal como lo acepta float() tras limpiar espacios y comas
+_PATRON_NUMERO = r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+
+
+def parse_coordinates(values, limit=LIMITE_COORDENADA):
+    """
+    Convierte una columna de coordenadas a float en una sola pasada.
+
+    Args:
+        values: Serie (o secuencia) con coordenadas numéricas o en texto
+        limit: Valor absoluto máximo aceptado
+
+    Returns:
+        Tupla (coordenadas, motivos):
+        - coordenadas: Serie float64 con NaN en los valores rechazados
+        - motivos: Serie categórica con el motivo de rechazo por fila
+          ('vacio', 'no_numerico', 'fuera_de_rango') o NaN si es válida
+    """
+    serie = values if isinstance(values, pd.Series) else pd.Series(values)
+
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        numeros = serie.to_numpy(dtype='float64', na_value=np.nan, copy=True)
+        vacios = np.isnan(numeros)
+    else:
+        texto = (serie
+                 .astype(_STRING_DTYPE)
+                 .str.strip()
+                 .str.replace(',', '.', regex=False))
+        validos = texto.str.fullmatch(_PATRON_NUMERO).fillna(False).to_numpy(dtype=bool)
+
+        numeros = np.full(len(serie), np.nan)
+        numeros[validos] = (texto[validos]
+                            .astype(_FLOAT_DTYPE)
+                            .to_numpy(dtype='float64', na_value=np.nan))
+        vacios = texto.eq('').fillna(True).to_numpy(dtype=bool)
+
+    with np.errstate(invalid='ignore'):
+        fuera_de_rango = np.abs(numeros) > limit
+    no_numerico = np.isnan(numeros) & ~vacios
+
+    codigos = np.full(len(serie), -1, dtype=np.int8)
+    codigos[vacios] = 0
+    codigos[no_numerico] = 1
+    codigos[fuera_de_rango] = 2
+
+    numeros[codigos >= 0] = np.nan
+    coordenadas = pd.Series(numeros, index=serie.index, name=serie.name)
+    motivos = pd.Series(
+        pd.Categorical.from_codes(codigos, categories=MOTIVOS),
+        index=serie.index,
+        name=serie.name
+    )
+    return coordenadas, motivos
+
+
+def clean_coordinate_columns(df, columns=('Latitud', 'Longitud'), limit=LIMITE_COORDENADA):
+    """
+    Limpia en el DataFrame las columnas de coordenadas presentes.
+
+    Args:
+        df: DataFrame a modificar (se modifica en sitio)
+        columns: Columnas de coordenadas a limpiar
+        limit: Valor absoluto máximo aceptado
+
+    Returns:
+        DataFrame con una columna de motivos de rechazo por cada coordenada limpiada
+    """
+    motivos = {}
+    for col in columns:
+        if col in df.columns:
+            df[col], motivos[col] = parse_coordinates(df[col], limit=limit)
+    return pd.DataFrame(motivos, index=df.index)
+
+
+
+def rejection_counts(motivos):
+    """
+    Filas rechazadas por motivo a partir del resultado de clean_coordinate_columns.
+
+    Cada fila se cuenta una sola vez, con el motivo de la primera columna
+    rechazada (p. ej. Latitud antes que Longitud).
+
+    Returns:
+        Serie con la cantidad de filas por motivo (índice MOTIVOS)
+    """
+    motivo = pd.Series(np.nan, index=motivos.index, dtype=object)
+    for col in motivos.columns:
+        motivo = motivo.fillna(motivos[col].astype(object))
+    return motivo.value_counts().reindex(MOTIVOS, fill_value=0)
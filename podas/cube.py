@@ -0,0 +1,191 @@
+"""
+Cubo de conteos para las métricas y gráficos de las apps.
+
+Las métricas por comuna, los conteos por Inventariado y Requiere Acción y las
+barras apiladas por comuna hacían un groupby / value_counts / crosstab sobre el
+DataFrame filtrado en cada rerun. Todas son conteos sobre unas pocas columnas
+de baja cardinalidad, así que se precalcula una vez, al cargar, un arreglo
+denso con el número de filas por combinación de Comuna × Inventariado ×
+Requiere_Acción × Ejecutada × Permiso_CAM (unos cientos de celdas). Cada vista
+es después una selección y una suma sobre ese arreglo: su costo no depende del
+número de filas.
+
+Los filtros sobre columnas que no son dimensiones del cubo (por ejemplo las
+especies) no se pueden resolver con él; covers() lo indica y en ese caso se
+construye un cubo del DataFrame filtrado.
+"""
+
+import numpy as np
+import pandas as pd
+
+from podas.filters import NORMALIZERS
+
+# Dimensiones del cubo y su normalización (ver podas.filters.NORMALIZERS)
+CUBE_DIMENSIONS = {
+    'Comuna': 'exact',
+    'Inventariado': 'upper',
+    'Requiere_Acción': 'upper',
+    'Ejecutada': 'upper',
+    'Permiso_CAM': 'upper',
+}
+
+# Las mismas normalizaciones de NORMALIZERS, para los pocos valores elegidos en
+# un filtro (sin construir una Serie en cada consulta)
+_SCALAR_NORMALIZERS = {
+    'exact': None,
+    'upper': lambda valor: str(valor).upper(),
+    'lower': lambda valor: '' if pd.isna(valor) else str(valor).strip().lower(),
+}
+
+
+class CountsCube:
+    """
+    Conteo de filas por combinación de valores de las columnas dimensión.
+
+    Cada eje tiene una posición por valor normalizado (ordenados) más una
+    última posición para los nulos, que cuentan en total() pero no aparecen
+    como etiqueta en counts() ni en crosstab() (como en groupby).
+
+    Args:
+        df: DataFrame a contar (no se copia ni se modifica)
+        dims: Diccionario {columna: normalización}; por defecto
+            CUBE_DIMENSIONS. Las columnas ausentes se ignoran
+    """
+
+    def __init__(self, df, dims=None):
+        dims = CUBE_DIMENSIONS if dims is None else dims
+        self.dims = []
+        self.normalizers = {}
+        self._values = {}
+        self._positions = {}
+        codigos_ejes = []
+        forma = []
+        for columna, normalizacion in dims.items():
+            if columna not in df.columns:
+                continue
+            normalizar = NORMALIZERS[normalizacion]
+            serie = normalizar(df[columna]) if normalizar else df[columna]
+            codigos, valores = pd.factorize(serie, sort=True, use_na_sentinel=True)
+            # Los nulos (-1) van a la última posición del eje
+            codigos = np.where(codigos < 0, len(valores), codigos)
+            self.dims.append(columna)
+            self.normalizers[columna] = _SCALAR_NORMALIZERS[normalizacion]
+            # Etiquetas como valores simples (no categóricos) para las gráficas
+            self._values[columna] = pd.Index(np.asarray(valores))
+            self._positions[columna] = {valor: posicion for posicion, valor in enumerate(self._values[columna])}
+            codigos_ejes.append(codigos)
+            forma.append(len(valores) + 1)
+        if codigos_ejes:
+            plano = np.ravel_multi_index(codigos_ejes, forma)
+            self.array = np.bincount(plano, minlength=int(np.prod(forma))).reshape(forma)
+        else:
+            self.array = np.array(len(df))
+
+    def __contains__(self, column):
+        return column in self._values
+
+    def values(self, column):
+        """Valores normalizados de una dimensión, ordenados (sin nulos)."""
+        return list(self._values[column])
+
+    def covers(self, filters):
+        """True si todos los filtros activos son sobre dimensiones del cubo."""
+        return all(
+            columna in self._values
+            for columna, seleccion in filters.items()
+            if not _is_empty(seleccion)
+        )
+
+    def _axis_mask(self, column, selected):
+        """Posiciones del eje elegidas por un filtro (los nulos nunca coinciden)."""
+        if isinstance(selected, str) or not np.iterable(selected):
+            selected = [selected]
+        normalizar = self.normalizers[column]
+        posiciones = self._positions[column]
+        mascara = np.zeros(len(posiciones) + 1, dtype=bool)
+        for valor in selected:
+            posicion = posiciones.get(normalizar(valor) if normalizar else valor)
+            if posicion is not None:
+                mascara[posicion] = True
+        return mascara
+
+    def _slice(self, filters):
+        """Arreglo del cubo restringido a los filtros (ejes de igual largo, celdas fuera en cero)."""
+        arreglo = self.array
+        for columna, seleccion in (filters or {}).items():
+            if _is_empty(seleccion):
+                continue
+            if columna not in self._values:
+                raise KeyError(f"'{columna}' no es una dimensión del cubo")
+            eje = self.dims.index(columna)
+            forma = [1] * arreglo.ndim
+            forma[eje] = -1
+            arreglo = arreglo * self._axis_mask(columna, seleccion).reshape(forma)
+        return arreglo
+
+    def total(self, filters=None):
+        """Número de filas que cumplen los filtros (incluye nulos en las dimensiones)."""
+        return int(self._slice(filters).sum())
+
+    def _reduce(self, by, filters):
+        """Arreglo de conteos con un eje por columna de by, en ese orden y sin nulos."""
+        arreglo = self._slice(filters)
+        ejes = [self.dims.index(columna) for columna in by]
+        otros = tuple(eje for eje in range(arreglo.ndim) if eje not in ejes)
+        conteo = arreglo.sum(axis=otros)
+        # sum deja los ejes de by en el orden del cubo; se reordenan como en by
+        conteo = np.moveaxis(conteo, np.argsort(np.argsort(ejes)), range(len(ejes)))
+        # Sin la posición de nulos de cada eje de by
+        return conteo[tuple(slice(0, -1) for _ in by)]
+
+    def counts(self, by, filters=None, observed=True):
+        """
+        Conteo de filas por valores de una o varias dimensiones.
+
+        Args:
+            by: Columna o lista de columnas dimensión
+            filters: Diccionario {columna: valores} como en FilterIndex.select;
+                una selección None o vacía no filtra
+            observed: Si es True se omiten las combinaciones sin filas
+
+        Returns:
+            Serie de conteos indexada por los valores (MultiIndex si by tiene
+            varias columnas), en el orden de los valores
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        conteo = self._reduce(by, filters).ravel()
+        if len(by) == 1:
+            indice = self._values[by[0]].rename(by[0])
+        else:
+            indice = pd.MultiIndex.from_product([self._values[columna] for columna in by], names=by)
+        if observed:
+            presentes = conteo > 0
+            return pd.Series(conteo[presentes], index=indice[presentes])
+        return pd.Series(conteo, index=indice)
+
+    def crosstab(self, index, columns, filters=None):
+        """
+        Tabla cruzada de dos dimensiones, como pd.crosstab del DataFrame filtrado
+        (sin filas ni columnas vacías).
+
+        Args:
+            index: Dimensión de las filas
+            columns: Dimensión de las columnas
+            filters: Diccionario {columna: valores}
+
+        Returns:
+            DataFrame de conteos
+        """
+        conteo = self._reduce([index, columns], filters)
+        filas = conteo.sum(axis=1) > 0
+        columnas = conteo.sum(axis=0) > 0
+        return pd.DataFrame(
+            conteo[np.ix_(filas, columnas)],
+            index=self._values[index][filas].rename(index),
+            columns=self._values[columns][columnas].rename(columns),
+        )
+
+
+def _is_empty(seleccion):
+    """Selección que no filtra: None o un multiselect sin valores."""
+    return seleccion is None or (not isinstance(seleccion, str) and len(seleccion) == 0)
@@ -0,0 +1,560 @@
+"""
+Datos enriquecidos de PQR pendientes para el tablero app_v2.py.
+
+build_enriched_pqr cruza los PQR pendientes con las podas ejecutadas, el
+inventario CAM y el inventario forestal, una etapa por archivo fuente.
+load_enriched_pqr guarda el resultado en una caché Parquet (ver podas.cache)
+que se invalida cuando cambia algún CSV fuente o el código de las etapas.
+IncrementalPqrData vigila los archivos y recalcula solo las etapas afectadas.
+Cada fuente se lee del Parquet que genera podas.ingest desde los libros XLSX
+cuando existe y es más reciente que el CSV (ver podas.ingest.read_table).
+"""
+
+import sys
+import threading
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from podas.cache import code_version, fingerprint, load_or_build, write_cache
+from podas.coordinates import parse_coordinates
+from podas.ingest import read_table, table_path
+from podas import coordinates, ingest, keys, schema, spatial
+from podas.keys import Crosswalk, canonical_luminaria, canonical_sticker
+from podas.schema import compact_frame
+from podas.spatial import GridIndex
+
+DATA_DIR = Path("data")
+PQR_FILE = "pqr_pendientes_georreferenciadas.csv"
+EJECUTADAS_FILE = "podas_ejecutadas.csv"
+CAM_FILE = "inventario_cam.csv"
+INVENTARIO_FILE = "Inventario_forestal.csv"
+SOURCE_FILES = [PQR_FILE, EJECUTADAS_FILE, CAM_FILE, INVENTARIO_FILE]
+# Nombre de cada archivo en el índice de claves (podas.keys.Crosswalk)
+SOURCE_NAMES = {PQR_FILE: 'pqr', EJECUTADAS_FILE: 'ejecutadas', CAM_FILE: 'cam', INVENTARIO_FILE: 'forestal'}
+CACHE_DIR = Path(".cache") / "app_v2"
+COORD_COLUMNS = ["Latitud", "Longitud"]
+
+# Distancia máxima (m) para cruzar por cercanía un PQR sin Sticker/ID_Luminaria
+# con un árbol: la mitad de los cruces por clave quedan a menos de 8 m y el
+# 75 % a menos de 13 m
+SPATIAL_MATCH_M = 25.0
+
+
+def read_pqr(data_dir=DATA_DIR):
+    """
+    Etapa 1: PQR pendientes con columnas normalizadas y las columnas de
+    enriquecimiento inicializadas (Ejecutada, Permiso_CAM, NOMBRE COMÚN).
+    """
+    df = read_table(Path(data_dir) / PQR_FILE, encoding="utf-8")
+    df.columns = df.columns.str.strip()
+
+    # Normalizar columnas clave
+    if "Latitud" not in df.columns and "Lat" in df.columns:
+        df = df.rename(columns={"Lat": "Latitud"})
+    if "Longitud" not in df.columns and "Long" in df.columns:
+        df = df.rename(columns={"Long": "Longitud"})
+    if "inventariado" in df.columns:
+        df = df.rename(columns={"inventariado": "Inventariado"})
+
+    # Asegurar columna ID_Luminaria
+    if "ID_Luminaria" not in df.columns:
+        df["ID_Luminaria"] = None
+
+    # Claves canónicas (mismo formato en todas las fuentes, ver podas.keys)
+    df["Sticker"] = canonical_sticker(df["Sticker"])
+    df["ID_Luminaria"] = canonical_luminaria(df["ID_Luminaria"])
+
+    # Inicializar columnas usadas en la app
+    df["Ejecutada"] = "NO"
+    df["Permiso_CAM"] = "NO"
+    df["NOMBRE COMÚN"] = None
+    return df
+
+
+def read_ejecutadas(data_dir=DATA_DIR, warn=warnings.warn):
+    """
+    Etapa 2: podas marcadas como "YA EJECUTADA" en podas_ejecutadas.csv.
+
+    Returns:
+        DataFrame con la columna Sticker canónica, o None si el archivo no
+        existe o no se pudo leer
+    """
+    ruta = Path(data_dir) / EJECUTADAS_FILE
+    if not table_path(ruta).exists():
+        return None
+    try:
+        ejecutadas = read_table(ruta, encoding="utf-8")
+        ejecutadas.columns = ejecutadas.columns.str.strip()
+
+        sticker_col = "Sticker" if "Sticker" in ejecutadas.columns else "Stiker"
+        obs_col = "Observación" if "Observación" in ejecutadas.columns else ejecutadas.columns[1]
+
+        ejecutadas_filtradas = ejecutadas[
+            ejecutadas[obs_col].astype(str).str.contains("YA EJECUTADA", case=False, na=False)
+        ]
+        return pd.DataFrame({"Sticker": canonical_sticker(ejecutadas_filtradas[sticker_col])})
+    except Exception as exc:
+        warn(f"Error al cargar podas ejecutadas: {exc}")
+        return None
+
+
+def read_cam(data_dir=DATA_DIR, warn=warnings.warn):
+    """
+    Etapa 3: inventario CAM limpio (se enlaza por sticker, no dispone de ID_Luminaria).
+
+    Returns:
+        Tupla (cam_clean, cam_layer); cam_clean es None si el archivo no existe
+        o no se pudo leer
+    """
+    ruta = Path(data_dir) / CAM_FILE
+    if not table_path(ruta).exists():
+        return None, pd.DataFrame()
+    try:
+        cam = read_table(ruta, encoding="utf-8-sig")
+        cam.columns = cam.columns.str.strip()
+
+        if 'Latitud' in cam.columns:
+            cam = cam.rename(columns={'Latitud': 'Lat'})
+        if 'Longitud' in cam.columns:
+            cam = cam.rename(columns={'Longitud': 'Long'})
+
+        nombre_col = None
+        for col in cam.columns:
+            if 'NOMBRE' in col.upper() and 'COM' in col.upper():
+                nombre_col = col
+                break
+
+        cols_needed = ['Sticker']
+        if nombre_col:
+            cols_needed.append(nombre_col)
+        if 'Lat' in cam.columns:
+            cols_needed.append('Lat')
+        if 'Long' in cam.columns:
+            cols_needed.append('Long')
+        if 'ID_Luminaria' in cam.columns:
+            cols_needed.append('ID_Luminaria')
+
+        cam_clean = cam[cols_needed].copy()
+        cam_clean = cam_clean.dropna(subset=['Sticker'])
+        cam_clean['Sticker'] = canonical_sticker(cam_clean['Sticker'])
+        cam_clean['Permiso_CAM'] = 'SI'
+
+        if nombre_col and nombre_col != 'NOMBRE COMÚN':
+            cam_clean = cam_clean.rename(columns={nombre_col: 'NOMBRE COMÚN'})
+
+        cam_layer = cam_clean.copy()
+        if 'Lat' in cam_layer.columns and 'Long' in cam_layer.columns:
+            cam_layer['Lat'] = pd.to_numeric(cam_layer['Lat'], errors='coerce')
+            cam_layer['Long'] = pd.to_numeric(cam_layer['Long'], errors='coerce')
+            cam_layer = cam_layer.dropna(subset=['Lat', 'Long'])
+        else:
+            cam_layer = pd.DataFrame()
+        return cam_clean, cam_layer
+    except Exception as exc:
+        warn(f"Error al cargar inventario CAM: {exc}")
+        return None, pd.DataFrame()
+
+
+def read_inventario(data_dir=DATA_DIR, warn=warnings.warn):
+    """
+    Etapa 4: inventario forestal con las columnas que se cruzan con los PQR.
+
+    Las filas repetidas por ID_Luminaria se conservan; el cruce toma la primera.
+    Latitud y Longitud se limpian para el cruce espacial, pero no se copian a los PQR.
+
+    Returns:
+        DataFrame, o None si el archivo no existe, no tiene ID_Luminaria o no se pudo leer
+    """
+    ruta = Path(data_dir) / INVENTARIO_FILE
+    if not table_path(ruta).exists():
+        return None
+    try:
+        inv = read_table(ruta, encoding="utf-8")
+        inv.columns = inv.columns.str.strip()
+
+        if "ID_Luminaria" not in inv.columns:
+            return None
+        inv_clean = inv.copy()
+        inv_clean["ID_Luminaria"] = canonical_luminaria(inv_clean["ID_Luminaria"])
+        if "Sticker" in inv_clean.columns:
+            inv_clean["Sticker"] = canonical_sticker(inv_clean["Sticker"])
+
+        cols_inv = [
+            "ID_Luminaria",
+            "Nombre_comun",
+            "NOMBRE CIENTIFICO",
+            "HT(m)",
+            "CAP(cm)",
+            "DAP(m)",
+            "DIAMETRO DE COPAS (m)",
+            "TRATAMIENTO, PODA ",
+            "Sticker"
+        ]
+        cols_inv = [c for c in cols_inv if c in inv_clean.columns]
+        for col in COORD_COLUMNS:
+            if col in inv_clean.columns:
+                inv_clean[col], _ = parse_coordinates(inv_clean[col])
+                cols_inv.append(col)
+        return inv_clean[cols_inv].reset_index(drop=True)
+    except Exception as exc:
+        warn(f"Error al cargar inventario forestal: {exc}")
+        return None
+
+
+def _spatial_fill(filas, lat, lon, inv_lat, inv_lon, max_dist_m):
+    """
+    Completa con el árbol más cercano las filas sin cruce por clave.
+
+    Returns:
+        Tupla (filas, tipo, distancias): filas con los cruces espaciales
+        agregados, tipo de cruce por fila ('clave', 'espacial' o 'sin cruce')
+        y distancia en metros de los cruces espaciales (NaN en los demás)
+    """
+    filas = filas.copy()
+    distancias = np.full(len(filas), np.nan)
+    sin_clave = np.flatnonzero(filas < 0)
+    if len(sin_clave) and max_dist_m:
+        indice = GridIndex(inv_lat, inv_lon, cell_m=max_dist_m)
+        cercano, distancia = indice.nearest(lat[sin_clave], lon[sin_clave], max_dist_m)
+        encontrado = cercano >= 0
+        filas[sin_clave[encontrado]] = cercano[encontrado]
+        distancias[sin_clave[encontrado]] = distancia[encontrado].round(1)
+    tipo = np.where(filas < 0, 'sin cruce', np.where(np.isnan(distancias), 'clave', 'espacial'))
+    return filas, tipo, distancias
+
+
+def merge_sources(base, cam_clean, cam_layer, inv_clean, crosswalk, warn=warnings.warn,
+                  max_dist_m=SPATIAL_MATCH_M):
+    """
+    Cruza los PQR con el inventario CAM y el inventario forestal y normaliza
+    las columnas finales. No modifica los DataFrames de entrada.
+
+    Los cruces son consultas al índice de claves (ver podas.keys.Crosswalk):
+    cada PQR toma la primera fila coincidente de cada inventario, así que las
+    claves repetidas en los inventarios no duplican filas de PQR. Los PQR sin
+    cruce por clave toman el árbol más cercano a menos de max_dist_m metros
+    (ver podas.spatial.GridIndex); Cruce_CAM y Cruce_forestal indican si el
+    cruce fue por 'clave', 'espacial' o 'sin cruce'. Permiso_CAM solo se marca
+    con cruces por clave.
+
+    Args:
+        base: PQR de read_pqr
+        cam_clean: Inventario CAM de read_cam (None si no está disponible)
+        cam_layer: Capa CAM de read_cam
+        inv_clean: Inventario forestal de read_inventario (None si no está disponible)
+        crosswalk: Crosswalk con las fuentes 'pqr', 'cam' y 'forestal' indexadas
+        warn: Función que recibe los mensajes de error
+        max_dist_m: Distancia máxima del cruce espacial en metros (0 = sin cruce espacial)
+
+    Returns:
+        Tupla (df, cam_layer); df conserva la columna Ejecutada de base
+        (ver flag_ejecutadas)
+    """
+    df = base.copy()
+    lat = pd.to_numeric(df['Latitud'], errors='coerce').to_numpy(dtype='float64')
+    lon = pd.to_numeric(df['Longitud'], errors='coerce').to_numpy(dtype='float64')
+    df['Cruce_CAM'] = 'sin cruce'
+    df['Cruce_forestal'] = 'sin cruce'
+
+    if cam_clean is not None and ('cam', 'Sticker') in crosswalk:
+        try:
+            fila_cam = crosswalk['cam', 'Sticker'].lookup(crosswalk['pqr', 'Sticker'])
+            df['Permiso_CAM'] = np.where(fila_cam >= 0, 'SI', 'NO')
+            if 'Lat' in cam_clean.columns and 'Long' in cam_clean.columns:
+                fila_cam, df['Cruce_CAM'], df['Distancia_CAM_m'] = _spatial_fill(
+                    fila_cam, lat, lon,
+                    pd.to_numeric(cam_clean['Lat'], errors='coerce').to_numpy(dtype='float64'),
+                    pd.to_numeric(cam_clean['Long'], errors='coerce').to_numpy(dtype='float64'),
+                    max_dist_m,
+                )
+            else:
+                df['Cruce_CAM'] = np.where(fila_cam >= 0, 'clave', 'sin cruce')
+            if 'NOMBRE COMÚN' in cam_clean.columns:
+                nombres = cam_clean['NOMBRE COMÚN'].reset_index(drop=True).reindex(fila_cam).to_numpy()
+                df['NOMBRE COMÚN'] = df['NOMBRE COMÚN'].fillna(pd.Series(nombres, index=df.index))
+        except Exception as exc:
+            warn(f"Error al cargar inventario CAM: {exc}")
+
+    if inv_clean is not None and ('forestal', 'ID_Luminaria') in crosswalk:
+        try:
+            fila_inv = crosswalk['forestal', 'ID_Luminaria'].lookup(crosswalk['pqr', 'ID_Luminaria'])
+            coordenadas = [c for c in COORD_COLUMNS if c in inv_clean.columns]
+            if len(coordenadas) == 2:
+                fila_inv, df['Cruce_forestal'], df['Distancia_forestal_m'] = _spatial_fill(
+                    fila_inv, lat, lon,
+                    inv_clean['Latitud'].to_numpy(dtype='float64'),
+                    inv_clean['Longitud'].to_numpy(dtype='float64'),
+                    max_dist_m,
+                )
+            else:
+                df['Cruce_forestal'] = np.where(fila_inv >= 0, 'clave', 'sin cruce')
+            # reindex con -1 deja en NaN los PQR sin árbol, como un merge left
+            extra = inv_clean.drop(columns=coordenadas).reindex(fila_inv).set_axis(df.index)
+            extra = extra.rename(columns={c: f"{c}_inv" for c in extra.columns if c in df.columns})
+            df = pd.concat([df, extra], axis=1)
+        except Exception as exc:
+            warn(f"Error al cargar inventario forestal: {exc}")
+
+    df['P.Q.R.S'] = df['P.Q.R.S'].astype(str)
+    df['Es_Nueva'] = df['P.Q.R.S'].str.contains(r'2025-0[1-9]|2025-1[0-2]', na=False, regex=True)
+
+    df['Latitud'] = pd.to_numeric(df['Latitud'], errors='coerce')
+    df['Longitud'] = pd.to_numeric(df['Longitud'], errors='coerce')
+    df = df.dropna(subset=['Latitud', 'Longitud']).copy()
+
+    df['Comuna_Num'] = df['Comuna'].str.extract(r'(\d+)').astype(float).fillna(0).astype(int)
+    df['Inventariado'] = df['Inventariado'].astype(str).str.strip().str.upper()
+    df['Ejecutada'] = df['Ejecutada'].astype(str).str.strip().str.upper()
+    df['Permiso_CAM'] = df['Permiso_CAM'].astype(str).str.strip().str.upper()
+
+    if 'NOMBRE COMÚN' not in df.columns:
+        df['NOMBRE COMÚN'] = None
+
+    if not cam_layer.empty:
+        cam_layer = cam_layer.copy()
+        if 'ID_Luminaria' in cam_layer.columns:
+            cam_layer['ID_Luminaria'] = canonical_luminaria(cam_layer['ID_Luminaria'])
+        # cam_layer es un subconjunto de cam_clean: se reutiliza el índice de claves de CAM
+        fila_pqr = crosswalk['pqr', 'Sticker'].lookup(crosswalk['cam', 'Sticker'])
+        fila_pqr = fila_pqr[cam_clean.index.get_indexer(cam_layer.index)]
+        cam_layer['Comuna'] = base['Comuna'].reset_index(drop=True).reindex(fila_pqr).to_numpy()
+        cam_layer = cam_layer.reset_index(drop=True)
+        cam_layer = cam_layer.rename(columns={'Lat': 'Latitud', 'Long': 'Longitud'})
+        cam_layer['NOMBRE COMÚN'] = cam_layer['NOMBRE COMÚN'].astype(str)
+
+    return df, cam_layer
+
+
+def flag_ejecutadas(df, crosswalk):
+    """
+    Marca Ejecutada = SI en las filas cuyo sticker figura en podas ejecutadas (modifica df).
+
+    Solo depende de la columna Sticker, así que se puede recalcular sobre el
+    resultado final sin repetir los cruces con los inventarios.
+    """
+    if ('ejecutadas', 'Sticker') in crosswalk:
+        ejecutada = crosswalk['ejecutadas', 'Sticker'].contains(df['Sticker'])
+    else:
+        ejecutada = np.zeros(len(df), dtype=bool)
+    df['Ejecutada'] = np.where(ejecutada, 'SI', 'NO')
+    return df
+
+
+def _read_stage(nombre, data_dir, warn):
+    """Ejecuta la etapa de lectura del archivo fuente indicado."""
+    if nombre == PQR_FILE:
+        return read_pqr(data_dir)
+    if nombre == EJECUTADAS_FILE:
+        return read_ejecutadas(data_dir, warn=warn)
+    if nombre == CAM_FILE:
+        return read_cam(data_dir, warn=warn)
+    return read_inventario(data_dir, warn=warn)
+
+
+def _stage_frame(nombre, etapa):
+    """Tabla que se indexa en el Crosswalk a partir del resultado de una etapa."""
+    return etapa[0] if nombre == CAM_FILE else etapa
+
+
+def read_sources(data_dir=DATA_DIR, warn=warnings.warn):
+    """
+    Lee las cuatro fuentes y construye su índice de claves.
+
+    Returns:
+        Tupla (etapas, crosswalk): etapas es un diccionario {archivo: resultado de su etapa}
+    """
+    etapas = {nombre: _read_stage(nombre, data_dir, warn) for nombre in SOURCE_FILES}
+    crosswalk = Crosswalk()
+    for nombre, etapa in etapas.items():
+        crosswalk.add(SOURCE_NAMES[nombre], _stage_frame(nombre, etapa))
+    return etapas, crosswalk
+
+
+def build_enriched_pqr(data_dir=DATA_DIR, warn=warnings.warn):
+    """
+    Carga los PQR pendientes y los enriquece con podas ejecutadas, inventario CAM
+    e inventario forestal (enlace por Sticker e ID_Luminaria). Los resultados
+    usan el esquema compacto de podas.schema (categóricas, float32).
+
+    Args:
+        data_dir: Carpeta con los CSV fuente
+        warn: Función que recibe los mensajes de error de las fuentes opcionales
+
+    Returns:
+        Tupla (df, cam_layer)
+    """
+    etapas, crosswalk = read_sources(data_dir, warn=warn)
+    cam_clean, cam_layer = etapas[CAM_FILE]
+    df, cam_layer = merge_sources(
+        etapas[PQR_FILE], cam_clean, cam_layer, etapas[INVENTARIO_FILE], crosswalk, warn=warn
+    )
+    return compact_frame(flag_ejecutadas(df, crosswalk)), compact_frame(cam_layer)
+
+
+# Código que forma parte de la versión de la caché: el código fuente completo
+# de cada módulo que usa la construcción (este incluido), así que cualquier
+# cambio en claves, lectura, coordenadas, cruce espacial o esquema la invalida
+_BUILD_MODULES = (keys, ingest, coordinates, spatial, schema, sys.modules[__name__])
+
+
+def load_enriched_pqr(data_dir=DATA_DIR, cache_dir=CACHE_DIR, warn=warnings.warn):
+    """
+    Datos enriquecidos desde la caché Parquet, o reconstruidos desde los CSV si cambiaron.
+
+    Args:
+        data_dir: Carpeta con los CSV fuente
+        cache_dir: Carpeta de la caché
+        warn: Función que recibe los mensajes de error de las fuentes opcionales
+
+    Returns:
+        Tupla ((df, cam_layer), desde_cache)
+    """
+    data_dir = Path(data_dir)
+    return load_or_build(
+        cache_dir,
+        [table_path(data_dir / nombre) for nombre in SOURCE_FILES],
+        code_version(*_BUILD_MODULES),
+        lambda: build_enriched_pqr(data_dir, warn=warn),
+    )
+
+
+def _file_signature(ruta):
+    """(tamaño, mtime_ns) del archivo, o None si no existe."""
+    try:
+        stat = Path(ruta).stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class IncrementalPqrData:
+    """
+    Datos enriquecidos que se recargan por etapas cuando cambia un CSV fuente.
+
+    refresh() compara tamaño y fecha de modificación de cada archivo de data/
+    y recalcula solo lo afectado:
+
+    - podas_ejecutadas.csv: solo se vuelve a marcar Ejecutada sobre el
+      resultado ya cruzado (sin repetir los cruces con los inventarios).
+    - pqr, inventario CAM o inventario forestal: se vuelve a leer el archivo
+      que cambió y se repiten los cruces con las etapas ya leídas.
+
+    La primera carga sale de la caché Parquet (ver load_enriched_pqr) y cada
+    recarga la reescribe. Los DataFrames publicados no se modifican: cada
+    recarga publica DataFrames nuevos en df y cam_layer.
+
+    Args:
+        data_dir: Carpeta con los CSV fuente
+        cache_dir: Carpeta de la caché Parquet
+        warn: Función que recibe los mensajes de error de las fuentes opcionales
+    """
+
+    def __init__(self, data_dir=DATA_DIR, cache_dir=CACHE_DIR, warn=warnings.warn):
+        self.data_dir = Path(data_dir)
+        self.cache_dir = cache_dir
+        self.warn = warn
+        self.df = None
+        self.cam_layer = None
+        # Aumenta cada vez que se publican DataFrames nuevos (sirve de clave de caché)
+        self.version = 0
+        # Tiempos (segundos) por etapa de la última recarga con cambios
+        self.last_timings = {}
+        # Índice de claves de las etapas leídas (se actualiza por fuente)
+        self.crosswalk = Crosswalk()
+        self._signatures = {}
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def _read_stage(self, nombre):
+        """Lee la etapa de un archivo y actualiza su índice en el Crosswalk."""
+        etapa = _read_stage(nombre, self.data_dir, self.warn)
+        self._stages[nombre] = etapa
+        self.crosswalk.add(SOURCE_NAMES[nombre], _stage_frame(nombre, etapa))
+        return etapa
+
+    def changed_files(self):
+        """Archivos fuente cuyo tamaño o fecha de modificación cambió desde la última recarga."""
+        return [
+            nombre for nombre in SOURCE_FILES
+            if _file_signature(table_path(self.data_dir / nombre)) != self._signatures.get(nombre, 'sin leer')
+        ]
+
+    def refresh(self):
+        """
+        Recarga lo que cambió desde la última llamada.
+
+        Returns:
+            Diccionario {etapa: segundos} de esta recarga (vacío si no hubo cambios)
+        """
+        with self._lock:
+            cambiados = self.changed_files()
+            if not cambiados:
+                return {}
+
+            tiempos = {}
+            firmas = {nombre: _file_signature(table_path(self.data_dir / nombre)) for nombre in SOURCE_FILES}
+
+            if self.df is None:
+                t0 = time.perf_counter()
+                (df, cam_layer), desde_cache = load_enriched_pqr(self.data_dir, self.cache_dir, warn=self.warn)
+                tiempos['cache_parquet' if desde_cache else 'carga_completa'] = time.perf_counter() - t0
+            else:
+                df, cam_layer = self.df, self.cam_layer
+                etapas_cruce = [nombre for nombre in cambiados if nombre != EJECUTADAS_FILE]
+                if etapas_cruce:
+                    # Las etapas que no se han leído (primera carga desde Parquet) se leen ahora
+                    for nombre in (PQR_FILE, CAM_FILE, INVENTARIO_FILE):
+                        if nombre in etapas_cruce or nombre not in self._stages:
+                            t0 = time.perf_counter()
+                            self._read_stage(nombre)
+                            tiempos[nombre] = time.perf_counter() - t0
+
+                    t0 = time.perf_counter()
+                    cam_clean, cam_layer = self._stages[CAM_FILE]
+                    df, cam_layer = merge_sources(
+                        self._stages[PQR_FILE], cam_clean, cam_layer, self._stages[INVENTARIO_FILE],
+                        self.crosswalk, warn=self.warn
+                    )
+                    tiempos['cruces'] = time.perf_counter() - t0
+                else:
+                    df = df.copy()
+
+                if etapas_cruce or EJECUTADAS_FILE in cambiados:
+                    t0 = time.perf_counter()
+                    if EJECUTADAS_FILE in cambiados or EJECUTADAS_FILE not in self._stages:
+                        self._read_stage(EJECUTADAS_FILE)
+                    flag_ejecutadas(df, self.crosswalk)
+                    tiempos[EJECUTADAS_FILE] = time.perf_counter() - t0
+
+                df, cam_layer = compact_frame(df), compact_frame(cam_layer)
+
+                t0 = time.perf_counter()
+                try:
+                    write_cache(self.cache_dir, fingerprint(
+                        [table_path(self.data_dir / nombre) for nombre in SOURCE_FILES], code_version(*_BUILD_MODULES)
+                    ), (df, cam_layer))
+                except (OSError, ValueError, TypeError, ImportError):
+                    pass
+                tiempos['escritura_cache'] = time.perf_counter() - t0
+
+            self.df, self.cam_layer = df, cam_layer
+            self.version += 1
+            self._signatures = firmas
+            self.last_timings = tiempos
+            return tiempos
+
+    def key_report(self):
+        """
+        Reporte de claves sin cruce entre las cuatro fuentes (ver Crosswalk.unmatched_report).
+
+        Lee las etapas que falten si la primera carga vino de la caché Parquet.
+        """
+        with self._lock:
+            for nombre in SOURCE_FILES:
+                if nombre not in self._stages:
+                    self._read_stage(nombre)
+            return self.crosswalk.unmatched_report()
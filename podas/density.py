@@ -0,0 +1,175 @@
+"""
+Agregación de puntos en celdas hexagonales o cuadradas para el mapa a escala ciudad.
+
+Con zoom bajo, miles de marcadores individuales son lentos e ilegibles: los
+puntos de cada capa (árboles, PQR pendientes, podas ejecutadas, ...) se cuentan
+por celda de una malla regular en metros y el mapa dibuja una sola capa de
+polígonos. Todo el cálculo es vectorizado con NumPy, así que la malla se
+recalcula en cada cambio de filtros (100k puntos en pocos milisegundos).
+"""
+
+import numpy as np
+import pandas as pd
+
+from podas.spatial import RADIO_TIERRA_M, planar_m
+
+SHAPES = ('hex', 'square')
+_RAIZ3 = np.sqrt(3.0)
+
+# Celdas hasta las que conviene contar sobre la malla completa en vez de ordenar
+_MAX_CELDAS_DENSAS = 1 << 20
+
+
+def cell_ids(x, y, size_m, shape='hex'):
+    """
+    Celda (i, j) de cada punto proyectado en metros.
+
+    Los hexágonos tienen el vértice hacia arriba y size_m es su radio (centro
+    a vértice); i, j son sus coordenadas axiales (q, r). Los cuadrados tienen
+    lado size_m.
+
+    Returns:
+        Tupla (i, j) de arreglos int64
+    """
+    if shape == 'square':
+        return np.floor(x / size_m).astype(np.int64), np.floor(y / size_m).astype(np.int64)
+    if shape != 'hex':
+        raise ValueError(f"Forma de celda desconocida: {shape!r} (usar {SHAPES})")
+
+    q = (_RAIZ3 / 3 * x - y / 3) / size_m
+    r = (2 / 3 * y) / size_m
+    # Redondeo en coordenadas cúbicas: se corrige la componente con mayor error
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    corrige_q = (dq > dr) & (dq > ds)
+    corrige_r = ~corrige_q & (dr > ds)
+    rq = np.where(corrige_q, -rr - rs, rq)
+    rr = np.where(corrige_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def cell_centers(i, j, size_m, shape='hex'):
+    """Centro (x, y) en metros de cada celda (ver cell_ids)."""
+    i = np.asarray(i, dtype='float64')
+    j = np.asarray(j, dtype='float64')
+    if shape == 'square':
+        return (i + 0.5) * size_m, (j + 0.5) * size_m
+    return size_m * _RAIZ3 * (i + j / 2), size_m * 1.5 * j
+
+
+def cell_vertices(size_m, shape='hex'):
+    """Vértices (dx, dy) en metros de una celda respecto a su centro, sin cerrar el anillo."""
+    if shape == 'square':
+        mitad = size_m / 2
+        return np.array([[-mitad, -mitad], [mitad, -mitad], [mitad, mitad], [-mitad, mitad]])
+    angulos = np.radians(30 + 60 * np.arange(6))
+    return size_m * np.column_stack([np.cos(angulos), np.sin(angulos)])
+
+
+def density_grid(layers, size_m=250.0, shape='hex'):
+    """
+    Cuenta los puntos de cada capa por celda.
+
+    Args:
+        layers: Diccionario {nombre: (latitudes, longitudes)}; los puntos sin
+            coordenadas válidas se ignoran
+        size_m: Tamaño de la celda en metros (radio del hexágono o lado del cuadrado)
+        shape: 'hex' o 'square'
+
+    Returns:
+        DataFrame con una fila por celda no vacía: 'Celda_i', 'Celda_j',
+        'Latitud' y 'Longitud' del centro, una columna de conteo por capa y 'Total'
+    """
+    nombres = list(layers)
+    lat = [np.asarray(layers[n][0], dtype='float64') for n in nombres]
+    lon = [np.asarray(layers[n][1], dtype='float64') for n in nombres]
+    capa = np.repeat(np.arange(len(nombres)), [len(v) for v in lat])
+    lat = np.concatenate(lat) if nombres else np.array([])
+    lon = np.concatenate(lon) if nombres else np.array([])
+
+    validos = np.isfinite(lat) & np.isfinite(lon)
+    columnas = ['Celda_i', 'Celda_j', 'Latitud', 'Longitud'] + nombres + ['Total']
+    if not validos.any():
+        return pd.DataFrame(columns=columnas)
+    lat, lon, capa = lat[validos], lon[validos], capa[validos]
+
+    lat0 = float(np.mean(lat))
+    xy = planar_m(lat, lon, lat0)
+    i, j = cell_ids(xy[:, 0], xy[:, 1], size_m, shape)
+
+    # Código lineal de celda y conteo por (celda, capa) con un solo bincount
+    i0, j0 = i.min(), j.min()
+    ancho = int(j.max() - j0 + 1)
+    codigo = (i - i0) * ancho + (j - j0)
+    celdas = int(i.max() - i0 + 1) * ancho
+    if celdas <= max(_MAX_CELDAS_DENSAS, 4 * len(codigo)):
+        # Malla densa (el caso de una ciudad): sin ordenar, se descartan las celdas vacías
+        conteos = np.bincount(codigo * len(nombres) + capa, minlength=celdas * len(nombres))
+        conteos = conteos.reshape(celdas, len(nombres))
+        codigos = np.flatnonzero(conteos.any(axis=1))
+        conteos = conteos[codigos]
+    else:
+        # Puntos muy dispersos: solo las celdas ocupadas
+        codigos, celda = np.unique(codigo, return_inverse=True)
+        conteos = np.bincount(celda.ravel() * len(nombres) + capa, minlength=len(codigos) * len(nombres))
+        conteos = conteos.reshape(len(codigos), len(nombres))
+
+    ci, cj = codigos // ancho + i0, codigos % ancho + j0
+    cx, cy = cell_centers(ci, cj, size_m, shape)
+    grid = pd.DataFrame({
+        'Celda_i': ci,
+        'Celda_j': cj,
+        'Latitud': np.degrees(cy / RADIO_TIERRA_M),
+        'Longitud': np.degrees(cx / (RADIO_TIERRA_M * np.cos(np.radians(lat0)))),
+    })
+    for k, nombre in enumerate(nombres):
+        grid[nombre] = conteos[:, k]
+    grid['Total'] = conteos.sum(axis=1)
+    return grid[columnas]
+
+
+def grid_to_feature_collection(grid, size_m=250.0, shape='hex', fields=None, value_col='Total',
+                               precision=6):
+    """
+    Convierte la malla de density_grid en una FeatureCollection de polígonos.
+
+    Cada feature lleva los conteos de las columnas fields y '_ratio', el valor
+    de value_col relativo al máximo de la malla (para la opacidad del relleno).
+
+    Args:
+        grid: DataFrame de density_grid
+        size_m: Tamaño de celda usado en density_grid
+        shape: Forma de celda usada en density_grid
+        fields: Columnas de conteo a incluir como propiedades (por defecto todas)
+        value_col: Columna que define la intensidad del color
+        precision: Decimales conservados en las coordenadas
+
+    Returns:
+        Diccionario con la FeatureCollection
+    """
+    if fields is None:
+        fields = [c for c in grid.columns if c not in ('Celda_i', 'Celda_j', 'Latitud', 'Longitud')]
+    lat = grid['Latitud'].to_numpy(dtype='float64')
+    lon = grid['Longitud'].to_numpy(dtype='float64')
+    vertices = cell_vertices(size_m, shape)
+    # Vértices en grados alrededor de cada centro (n x k x 2, en orden lon, lat)
+    dlat = np.degrees(vertices[None, :, 1] / RADIO_TIERRA_M)
+    dlon = np.degrees(vertices[None, :, 0] / (RADIO_TIERRA_M * np.cos(np.radians(lat[:, None]))))
+    anillos = np.stack([lon[:, None] + dlon, lat[:, None] + dlat], axis=2)
+    anillos = np.concatenate([anillos, anillos[:, :1]], axis=1).round(precision).tolist()
+
+    valores = grid[value_col].to_numpy(dtype='float64')
+    maximo = valores.max() if len(valores) else 0.0
+    ratios = (valores / maximo if maximo > 0 else np.zeros_like(valores)).round(3).tolist()
+    propiedades = [grid[c].astype(int).tolist() for c in fields]
+
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Polygon', 'coordinates': [anillo]},
+            'properties': dict(zip(fields, props), _ratio=ratio),
+        }
+        for anillo, ratio, props in zip(anillos, ratios, zip(*propiedades) if fields else [()] * len(anillos))
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
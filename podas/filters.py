@@ -0,0 +1,135 @@
+"""
+Filtros de la barra lateral resueltos sobre códigos categóricos precalculados.
+
+En cada rerun de Streamlit los filtros hacían ``df.copy()`` y encadenaban
+``isin`` y ``.astype(str).str.upper()`` / ``.str.strip().str.lower()`` sobre
+columnas de texto. FilterIndex normaliza y factoriza cada columna de filtro
+una sola vez al cargar los datos; después, cada filtro es una consulta a una
+tabla booleana por código (OR de los valores elegidos) y la combinación de
+filtros es un AND de máscaras NumPy, sin operaciones de texto ni copias.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _as_upper(serie):
+    """Texto en mayúsculas, como ``.astype(str).str.upper()``."""
+    return serie.astype(str).str.upper()
+
+
+def _as_lower(serie):
+    """Texto sin espacios y en minúsculas (vacío si falta), como el filtro de especies."""
+    # astype(object) primero: fillna('') no admite categóricas sin la categoría ''
+    return serie.astype(object).fillna('').astype(str).str.strip().str.lower()
+
+
+# Normalizaciones disponibles para las columnas de filtro
+NORMALIZERS = {'exact': None, 'upper': _as_upper, 'lower': _as_lower}
+
+
+class FilterIndex:
+    """
+    Códigos categóricos de las columnas de filtro de un DataFrame.
+
+    Args:
+        df: DataFrame a filtrar (no se copia ni se modifica)
+        columns: Diccionario {columna: normalización} con 'exact', 'upper' o
+            'lower' (ver NORMALIZERS); las columnas ausentes se ignoran
+    """
+
+    def __init__(self, df, columns):
+        self.size = len(df)
+        self.normalizers = {}
+        self._codes = {}
+        self._values = {}
+        self._labels = {}
+        for columna, normalizacion in columns.items():
+            if columna not in df.columns:
+                continue
+            normalizar = NORMALIZERS[normalizacion]
+            serie = normalizar(df[columna]) if normalizar else df[columna]
+            # Los nulos quedan con código -1
+            codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+            self.normalizers[columna] = normalizar
+            self._codes[columna] = codigos
+            self._values[columna] = pd.Index(valores)
+            # Etiqueta de cada valor normalizado: el texto original de su primera fila
+            _, primera = np.unique(codigos, return_index=True)
+            primera = primera[codigos[primera] >= 0]
+            self._labels[columna] = df[columna].iloc[primera].to_numpy()
+
+    def __contains__(self, column):
+        return column in self._codes
+
+    def values(self, column):
+        """Valores normalizados distintos de una columna, ordenados (sin nulos)."""
+        return sorted(self._values[column])
+
+    def labels(self, column):
+        """
+        Opciones para un multiselect: un texto original por valor normalizado,
+        sin espacios al borde, ordenado y sin vacíos.
+        """
+        etiquetas = {str(v).strip() for v in self._labels[column] if not pd.isna(v)}
+        return sorted(e for e in etiquetas if e and e.lower() != 'nan')
+
+    def counts(self, column):
+        """Filas por valor normalizado de una columna (Serie indexada por valor)."""
+        codigos = self._codes[column]
+        conteos = np.bincount(codigos[codigos >= 0], minlength=len(self._values[column]))
+        return pd.Series(conteos, index=self._values[column])
+
+    def mask(self, column, selected):
+        """
+        Máscara de las filas cuyo valor está entre los seleccionados.
+
+        Args:
+            column: Columna indexada
+            selected: Valor o lista de valores (se normalizan igual que la columna)
+
+        Returns:
+            Arreglo booleano de largo size
+        """
+        if isinstance(selected, str) or not np.iterable(selected):
+            selected = [selected]
+        normalizar = self.normalizers[column]
+        seleccion = pd.Series(list(selected), dtype=object)
+        if normalizar:
+            seleccion = normalizar(seleccion)
+        # Tabla por código con una posición extra (la última) para los nulos (-1)
+        tabla = np.zeros(len(self._values[column]) + 1, dtype=bool)
+        posiciones = self._values[column].get_indexer(seleccion)
+        tabla[posiciones[posiciones >= 0]] = True
+        return tabla[self._codes[column]]
+
+    def select(self, filters):
+        """
+        Combina (AND) los filtros de varias columnas.
+
+        Args:
+            filters: Diccionario {columna: valores}; una selección None o vacía
+                no filtra, igual que un multiselect sin valores
+
+        Returns:
+            Máscara booleana, o None si ningún filtro aplica (todas las filas)
+        """
+        resultado = None
+        for columna, seleccion in filters.items():
+            if seleccion is None or (not isinstance(seleccion, str) and len(seleccion) == 0):
+                continue
+            mascara = self.mask(columna, seleccion)
+            resultado = mascara if resultado is None else resultado & mascara
+        return resultado
+
+    def apply(self, df, filters):
+        """
+        Filas de df (el mismo DataFrame indexado) que cumplen los filtros.
+
+        Devuelve df sin copiar cuando ningún filtro aplica; si no, una sola
+        selección por posiciones.
+        """
+        if len(df) != self.size:
+            raise ValueError(f"El DataFrame tiene {len(df)} filas y el índice de filtros {self.size}")
+        mascara = self.select(filters)
+        return df if mascara is None else df.iloc[np.flatnonzero(mascara)]
@@ -0,0 +1,344 @@
+"""
+Ingesta de los libros XLSX del inventario a Parquet tipado.
+
+Los CSV de data/ se exportaban a mano desde los libros de Excel del
+repositorio. Esta herramienta lee cada hoja en modo de solo lectura
+(openpyxl read_only: las filas se recorren en streaming, sin cargar el libro
+completo), procesa las hojas en paralelo (un proceso por hoja; openpyxl es
+Python puro y no libera el GIL), aplica la misma normalización de columnas
+que las etapas de lectura de podas.datasets (nombres sin espacios, Sticker e
+ID_Luminaria canónicos, coordenadas limpias) y escribe Parquet con el
+esquema compacto de podas.schema.
+
+Los lectores de las apps (ver read_table) usan el Parquet en lugar del CSV
+del mismo nombre cuando existe y es más reciente.
+
+    python -m podas.ingest                       # todos los libros -> data/
+    python -m podas.ingest --out Podas_2025/data
+    python -m podas.ingest "INVENTARIO AJUSTADO.xlsx" --workers 2
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time as dt_time
+from numbers import Number
+from pathlib import Path
+
+import pandas as pd
+
+from podas.coordinates import parse_coordinates
+from podas.keys import canonical_luminaria, canonical_sticker
+from podas.schema import compact_frame
+
+# Filas por bloque al pasar las filas de openpyxl a DataFrame
+CHUNK_ROWS = 50_000
+
+# Nombres de columna equivalentes en los libros (tras quitar espacios)
+COLUMN_RENAMES = {
+    'Lat': 'Latitud',
+    'LATITUD': 'Latitud',
+    'Long': 'Longitud',
+    'LOGITUD': 'Longitud',
+    'LONGITUD': 'Longitud',
+    'inventariado': 'Inventariado',
+    'INVENTARIADO': 'Inventariado',
+    'Stiker': 'Sticker',
+    'STICKER': 'Sticker',
+    'Id_Luminaria': 'ID_Luminaria',
+}
+
+
+def pqr_table(df):
+    """PQR pendientes (Inventario_podas_v2.xlsx): la columna Inventario es Inventariado."""
+    return df.rename(columns={'Inventario': 'Inventariado'})
+
+
+def forestal_table(df):
+    """Inventario forestal (INVENTARIO AJUSTADO.xlsx) con el nombre común como en el CSV."""
+    return df.rename(columns={'NOMBRE COMÚN': 'Nombre_comun'})
+
+
+def cam_table(df):
+    """Inventario CAM: las columnas del inventario ajustado que exporta inventario_cam.csv."""
+    df = forestal_table(df)
+    return df[[c for c in ['ID', 'Sticker', 'Latitud', 'Longitud', 'Nombre_comun'] if c in df.columns]]
+
+
+# Tablas que se escriben desde la primera hoja de cada libro: (nombre del
+# Parquet, transformación). Las demás hojas se escriben como <libro>_<hoja>.
+WORKBOOKS = {
+    'Inventario_podas_v2.xlsx': [('pqr_pendientes_georreferenciadas', pqr_table)],
+    'podas_ejecutadas.xlsx': [('podas_ejecutadas', None)],
+    'INVENTARIO AJUSTADO.xlsx': [('Inventario_forestal', forestal_table), ('inventario_cam', cam_table)],
+    'Inventario_podas.xlsx': [('Inventario_podas', None)],
+    'Podas_2025_ejecutada.xlsx': [('Podas_2025_ejecutada', None)],
+}
+
+
+def _open_workbook(path):
+    """Libro en modo streaming; keep_links=False evita leer los vínculos externos
+    (Inventario_podas.xlsx trae uno de 12 MB que tardaba 6 s en cargarse)."""
+    from openpyxl import load_workbook
+    return load_workbook(path, read_only=True, data_only=True, keep_links=False)
+
+
+def sheet_names(path):
+    """Nombres de las hojas de un libro."""
+    libro = _open_workbook(path)
+    try:
+        return libro.sheetnames
+    finally:
+        libro.close()
+
+
+def read_sheet(path, sheet, chunk_rows=CHUNK_ROWS):
+    """
+    Lee una hoja fila por fila, en bloques de chunk_rows filas.
+
+    La primera fila es el encabezado. Las filas y columnas vacías (las que
+    Excel conserva por formato) se descartan.
+
+    Args:
+        path: Ruta del libro
+        sheet: Nombre de la hoja
+        chunk_rows: Filas por bloque
+
+    Returns:
+        DataFrame con los valores tal como están en la hoja
+    """
+    libro = _open_workbook(path)
+    try:
+        filas = libro[sheet].iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return pd.DataFrame()
+        columnas = [
+            f"col_{i + 1}" if nombre is None else str(nombre)
+            for i, nombre in enumerate(encabezado)
+        ]
+        bloques, bloque = [], []
+        for fila in filas:
+            if any(valor is not None for valor in fila):
+                bloque.append(fila)
+            if len(bloque) >= chunk_rows:
+                bloques.append(pd.DataFrame.from_records(bloque, columns=columnas))
+                bloque = []
+        if bloque or not bloques:
+            bloques.append(pd.DataFrame.from_records(bloque, columns=columnas))
+    finally:
+        libro.close()
+    df = pd.concat(bloques, ignore_index=True) if len(bloques) > 1 else bloques[0]
+    # Columnas sin encabezado ni valores
+    vacias = [c for c in df.columns if c.startswith('col_') and df[c].isna().all()]
+    return df.drop(columns=vacias)
+
+
+def _typed_column(serie):
+    """
+    Tipo homogéneo para una columna de objetos (Parquet no admite columnas
+    mixtas): números, fechas o texto.
+    """
+    if pd.api.types.is_string_dtype(serie.dtype) and serie.dtype != object:
+        return _stripped_text(serie)
+    if serie.dtype != object:
+        return serie
+    valores = serie.dropna()
+    if valores.empty:
+        return serie.astype('str').where(serie.notna())
+    if all(isinstance(v, Number) and not isinstance(v, bool) for v in valores):
+        return pd.to_numeric(serie)
+    if all(isinstance(v, (datetime, date)) for v in valores):
+        return pd.to_datetime(serie)
+    texto = serie.map(lambda v: v.isoformat() if isinstance(v, (datetime, date, dt_time)) else v)
+    return _stripped_text(texto.astype('str').where(serie.notna()))
+
+
+def _stripped_text(serie):
+    """Texto sin espacios al borde (los libros traen 'Mango ' o 'Tecoma stans\xa0');
+    las celdas que quedan vacías son nulas, como al leer el CSV."""
+    texto = serie.str.strip()
+    return texto.where(texto != '')
+
+
+def normalize_columns(df):
+    """
+    Normalización común de las etapas de lectura de podas.datasets: nombres de
+    columna sin espacios y equivalentes unificados, claves canónicas,
+    coordenadas limpias y tipos homogéneos.
+    """
+    df = df.copy()
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns={c: COLUMN_RENAMES[c] for c in df.columns if c in COLUMN_RENAMES})
+    # Encabezados repetidos tras quitar espacios: se conserva el primero
+    df = df.loc[:, ~df.columns.duplicated()]
+    for columna in df.columns:
+        df[columna] = _typed_column(df[columna])
+    if 'Sticker' in df.columns:
+        df['Sticker'] = canonical_sticker(df['Sticker'])
+    if 'ID_Luminaria' in df.columns:
+        df['ID_Luminaria'] = canonical_luminaria(df['ID_Luminaria'])
+    for columna in ('Latitud', 'Longitud'):
+        if columna in df.columns:
+            df[columna], _ = parse_coordinates(df[columna])
+    return df
+
+
+def _write_parquet(df, ruta):
+    """Escribe un Parquet de forma atómica (los lectores nunca ven un archivo a medias)."""
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    df.to_parquet(temporal, index=False)
+    os.replace(temporal, ruta)
+
+
+def ingest_sheet(path, sheet, first_sheet, out_dir):
+    """
+    Lee, normaliza y escribe una hoja (se ejecuta en un proceso del pool).
+
+    Args:
+        path: Ruta del libro
+        sheet: Nombre de la hoja
+        first_sheet: True si es la primera hoja (usa las tablas de WORKBOOKS)
+        out_dir: Carpeta de salida
+
+    Returns:
+        Lista de diccionarios con 'libro', 'hoja', 'tabla', 'filas',
+        'columnas', 'lectura_s', 'normalizacion_s' y 'escritura_s'
+    """
+    path, out_dir = Path(path), Path(out_dir)
+    t0 = time.perf_counter()
+    crudo = read_sheet(path, sheet)
+    lectura = time.perf_counter() - t0
+
+    if first_sheet and path.name in WORKBOOKS:
+        tablas = WORKBOOKS[path.name]
+    else:
+        tablas = [(f"{path.stem}_{sheet}", None)]
+
+    t0 = time.perf_counter()
+    normalizado = normalize_columns(crudo)
+    normalizacion = time.perf_counter() - t0
+    resultados = []
+    for nombre, transformar in tablas:
+        t0 = time.perf_counter()
+        tabla = compact_frame(transformar(normalizado) if transformar else normalizado)
+        normalizacion_tabla = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _write_parquet(tabla, out_dir / f"{nombre}.parquet")
+        resultados.append({
+            'libro': path.name,
+            'hoja': sheet,
+            'tabla': nombre,
+            'filas': len(tabla),
+            'columnas': tabla.shape[1],
+            'lectura_s': lectura,
+            'normalizacion_s': normalizacion + normalizacion_tabla,
+            'escritura_s': time.perf_counter() - t0,
+        })
+    return resultados
+
+
+def ingest_workbooks(paths, out_dir, workers=None):
+    """
+    Ingesta de varios libros, una tarea por hoja en un pool de procesos.
+
+    Args:
+        paths: Rutas de los libros
+        out_dir: Carpeta de salida de los Parquet
+        workers: Procesos del pool (None = uno por CPU; 1 = en este proceso)
+
+    Returns:
+        DataFrame con una fila por tabla escrita (ver ingest_sheet)
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tareas = [
+        (str(path), hoja, i == 0, str(out_dir))
+        for path in map(Path, paths)
+        for i, hoja in enumerate(sheet_names(path))
+    ]
+    if workers == 1:
+        resultados = [ingest_sheet(*tarea) for tarea in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resultados = list(pool.map(ingest_sheet, *zip(*tareas))) if tareas else []
+    return pd.DataFrame([fila for grupo in resultados for fila in grupo])
+
+
+def table_path(csv_path):
+    """
+    Archivo que deben leer las apps para un CSV de data/: el Parquet del mismo
+    nombre si existe y no es más antiguo que el CSV; si no, el CSV.
+    """
+    csv_path = Path(csv_path)
+    parquet = csv_path.with_suffix('.parquet')
+    try:
+        if not csv_path.exists() or parquet.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns:
+            return parquet if parquet.exists() else csv_path
+    except FileNotFoundError:
+        pass
+    return csv_path
+
+
+def read_table(csv_path, **csv_kwargs):
+    """
+    Lee una tabla de data/ desde su Parquet (ver table_path) o desde el CSV.
+
+    Las categóricas del Parquet se devuelven como texto, igual que en el CSV,
+    porque las etapas de lectura asignan valores nuevos a esas columnas.
+
+    Args:
+        csv_path: Ruta del CSV
+        **csv_kwargs: Argumentos de pd.read_csv si se lee el CSV
+
+    Returns:
+        DataFrame
+    """
+    ruta = table_path(csv_path)
+    if ruta.suffix != '.parquet':
+        return pd.read_csv(ruta, **csv_kwargs)
+    df = pd.read_parquet(ruta)
+    categoricas = df.select_dtypes('category').columns
+    return df.astype({c: object for c in categoricas}) if len(categoricas) else df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m podas.ingest',
+        description='Convierte los libros XLSX del inventario a Parquet tipado.',
+    )
+    parser.add_argument('workbooks', nargs='*',
+                        help='Libros a convertir (por defecto, los de WORKBOOKS que existan en --src)')
+    parser.add_argument('--src', default='.', help='Carpeta de los libros (por defecto, la actual)')
+    parser.add_argument('--out', default='data', help='Carpeta de salida (por defecto, data)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos en paralelo (por defecto, uno por CPU; 1 = sin pool)')
+    args = parser.parse_args(argv)
+
+    src = Path(args.src)
+    libros = [src / libro for libro in args.workbooks] or [src / libro for libro in WORKBOOKS if (src / libro).exists()]
+    faltantes = [str(libro) for libro in libros if not libro.exists()]
+    if faltantes:
+        parser.error(f"no existen: {', '.join(faltantes)}")
+    if not libros:
+        parser.error(f"no hay libros en {src}")
+
+    t0 = time.perf_counter()
+    reporte = ingest_workbooks(libros, args.out, workers=args.workers)
+    total = time.perf_counter() - t0
+
+    for fila in reporte.itertuples():
+        hoja_s = fila.lectura_s + fila.normalizacion_s + fila.escritura_s
+        print(f"{fila.libro} [{fila.hoja}] -> {fila.tabla}.parquet: {fila.filas:,} filas x {fila.columnas} columnas | "
+              f"lectura {fila.lectura_s:.2f} s, normalización {fila.normalizacion_s:.2f} s, "
+              f"escritura {fila.escritura_s:.2f} s | {fila.filas / hoja_s:,.0f} filas/s")
+    # Las filas leídas se cuentan una vez por hoja (un libro puede dar varias tablas)
+    filas = reporte.drop_duplicates(['libro', 'hoja'])['filas'].sum() if not reporte.empty else 0
+    print(f"{len(libros)} libros, {filas:,} filas en {total:.2f} s: {filas / total:,.0f} filas/s -> {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
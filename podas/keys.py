@@ -0,0 +1,207 @@
+"""
+Claves canónicas de Sticker e ID_Luminaria e índice de cruce entre fuentes.
+
+Los archivos escriben las mismas claves de formas distintas: stickers sin
+ceros a la izquierda ('43093' frente a '043093'), espacios duros al final,
+ID leídos como float ('1643425.0'), marcadores de vacío ('SC') y valores
+compuestos ('043093/043094', '1659407; 1659408'). normalize_key lleva todas
+las variantes a una sola forma y KeyIndex guarda, para cada clave canónica,
+las posiciones de fila donde aparece, de modo que los cruces son consultas
+a una tabla hash en lugar de columnas temporales y merges.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Ancho al que se rellenan con ceros las claves numéricas (None = sin relleno)
+KEY_WIDTHS = {'Sticker': 6, 'ID_Luminaria': None}
+
+# Valores que significan "sin clave"
+NULL_KEYS = ['', 'NAN', 'NONE', 'NULL', 'SC', 'S/C', 'N/A', 'N/D', 'ND', '<NA>']
+
+# Separadores de claves compuestas: '/', ';', ',' o dos o más espacios
+_SEPARADORES = r'\s*[/;,]\s*|\s{2,}'
+
+
+def _key_parts(values, width=None):
+    """
+    Claves canónicas individuales de cada valor.
+
+    Returns:
+        Tupla (filas, claves): posición de fila de origen y clave canónica de
+        cada parte, en el orden en que aparecen
+    """
+    texto = pd.Series(values, copy=False).reset_index(drop=True).astype('string')
+    texto = texto.str.replace('\u00a0', ' ', regex=False).str.strip().str.upper()
+    # Solo las claves compuestas se parten (el split no es vectorizado)
+    compuesta = texto.str.contains(_SEPARADORES, regex=True).fillna(False).to_numpy(dtype=bool)
+    partes = texto
+    if compuesta.any():
+        partidas = texto[compuesta].str.split(_SEPARADORES, regex=True).explode().astype('string')
+        partes = pd.concat([texto[~compuesta], partidas]).sort_index(kind='stable')
+    partes = partes.str.strip().str.replace(r'^(\d+)\.0+$', r'\1', regex=True)
+    partes = partes.mask(partes.isin(NULL_KEYS)).dropna()
+    if width:
+        # zfill no es vectorizado: se aplica solo a las claves numéricas cortas
+        cortas = (partes.str.fullmatch(r'\d+') & (partes.str.len() < width)).to_numpy(dtype=bool)
+        if cortas.any():
+            partes = partes.copy()
+            partes[cortas] = partes[cortas].str.zfill(width)
+    return partes.index.to_numpy(dtype=np.intp), partes.to_numpy(dtype=object)
+
+
+def normalize_key(values, width=None):
+    """
+    Clave canónica de cada valor (las partes de una clave compuesta se unen con '/').
+
+    Args:
+        values: Serie o arreglo de claves en cualquier formato
+        width: Ancho de relleno con ceros para claves numéricas
+
+    Returns:
+        Serie de texto con el mismo índice que values (nulo si no hay clave)
+    """
+    serie = pd.Series(values, copy=False)
+    filas, claves = _key_parts(serie, width)
+    resultado = np.full(len(serie), None, dtype=object)
+    # Casi todas las claves tienen una sola parte; solo las compuestas se agrupan
+    simple = np.bincount(filas, minlength=len(serie))[filas] == 1
+    resultado[filas[simple]] = claves[simple]
+    if not simple.all():
+        unidas = pd.Series(claves[~simple]).groupby(filas[~simple]).agg('/'.join)
+        resultado[unidas.index.to_numpy()] = unidas.to_numpy()
+    return pd.Series(resultado, index=serie.index)
+
+
+def canonical_sticker(values):
+    """Sticker canónico: sin espacios, en mayúsculas y con los numéricos a 6 cifras."""
+    return normalize_key(values, width=KEY_WIDTHS['Sticker'])
+
+
+def canonical_luminaria(values):
+    """ID_Luminaria canónico: sin espacios ni sufijo '.0'."""
+    return normalize_key(values, width=KEY_WIDTHS['ID_Luminaria'])
+
+
+class KeyIndex:
+    """
+    Índice hash de claves canónicas a posiciones de fila de una tabla.
+
+    Args:
+        values: Columna de claves de la tabla (las claves compuestas se indexan por parte)
+        width: Ancho de relleno con ceros para claves numéricas
+    """
+
+    def __init__(self, values, width=None):
+        self.width = width
+        self.size = len(values)
+        self.part_rows, self.part_keys = _key_parts(values, width)
+        self.keys = pd.Index(pd.unique(self.part_keys))
+        # Las partes vienen en orden de fila: la primera aparición de cada clave es su primera fila
+        _, primera = np.unique(self.keys.get_indexer(self.part_keys), return_index=True)
+        self._first_row = self.part_rows[primera]
+        self._rows = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def rows(self, key):
+        """Posiciones de fila de una clave canónica (arreglo vacío si no existe)."""
+        if self._rows is None:
+            self._rows = pd.Series(self.part_rows).groupby(self.part_keys, sort=False).unique().to_dict()
+        return np.asarray(self._rows.get(key, np.array([], dtype=np.intp)))
+
+    def lookup(self, other):
+        """
+        Primera fila de esta tabla que coincide con cada fila de otra.
+
+        Args:
+            other: KeyIndex de la otra tabla, o su columna de claves sin normalizar
+
+        Returns:
+            Arreglo con una posición por fila de la otra tabla (-1 si ninguna de
+            sus partes existe en este índice)
+        """
+        if not isinstance(other, KeyIndex):
+            other = KeyIndex(other, self.width)
+        resultado = np.full(other.size, -1, dtype=np.intp)
+        codigos = self.keys.get_indexer(other.part_keys)
+        encontradas = codigos >= 0
+        # Las partes vienen en orden de fila: gana la primera parte con cruce
+        filas, primera = np.unique(other.part_rows[encontradas], return_index=True)
+        resultado[filas] = self._first_row[codigos[encontradas][primera]]
+        return resultado
+
+    def contains(self, other):
+        """Máscara de las filas de otra tabla con al menos una parte en este índice."""
+        return self.lookup(other) >= 0
+
+
+# Fuentes del cruce, en el orden en que aparecen en el reporte
+SOURCES = ('pqr', 'ejecutadas', 'cam', 'forestal')
+
+
+class Crosswalk:
+    """
+    Índices KeyIndex de Sticker e ID_Luminaria de cada fuente.
+
+    Se construye una vez por fuente con add(); cuando una fuente cambia basta
+    con volver a agregarla, sin tocar los índices de las demás.
+    """
+
+    def __init__(self):
+        self.indexes = {}
+
+    def add(self, source, df, columns=tuple(KEY_WIDTHS)):
+        """Indexa las columnas de clave presentes en df (reemplaza las de esa fuente)."""
+        for key in [k for k in self.indexes if k[0] == source]:
+            del self.indexes[key]
+        if df is None:
+            return
+        for column in columns:
+            if column in df.columns:
+                self.indexes[(source, column)] = KeyIndex(df[column], KEY_WIDTHS.get(column))
+
+    def __getitem__(self, key):
+        return self.indexes[key]
+
+    def __contains__(self, key):
+        return key in self.indexes
+
+    def rows(self, source, column, key):
+        """Posiciones de fila de la fuente donde aparece la clave (se normaliza antes)."""
+        canonica = normalize_key([key], KEY_WIDTHS.get(column)).iloc[0]
+        if (source, column) not in self.indexes or pd.isna(canonica):
+            return np.array([], dtype=np.intp)
+        return self.indexes[(source, column)].rows(canonica)
+
+    def unmatched_keys(self, source, column, target):
+        """Claves canónicas de source que no aparecen en target."""
+        origen, destino = self.indexes[(source, column)], self.indexes[(target, column)]
+        return origen.keys[destino.keys.get_indexer(origen.keys) < 0]
+
+    def unmatched_report(self):
+        """
+        Claves sin cruce de cada fuente frente a cada otra fuente con la misma columna.
+
+        Returns:
+            DataFrame con 'Fuente', 'Clave', 'Contra', 'Claves', 'Sin_cruce' y 'Pct_sin_cruce'
+        """
+        filas = []
+        for (source, column), indice in self.indexes.items():
+            for target in SOURCES:
+                if target == source or (target, column) not in self.indexes:
+                    continue
+                sin_cruce = len(self.unmatched_keys(source, column, target))
+                filas.append({
+                    'Fuente': source,
+                    'Clave': column,
+                    'Contra': target,
+                    'Claves': len(indice),
+                    'Sin_cruce': sin_cruce,
+                    'Pct_sin_cruce': round(100 * sin_cruce / len(indice), 1) if len(indice) else 0.0,
+                })
+        return pd.DataFrame(filas, columns=['Fuente', 'Clave', 'Contra', 'Claves', 'Sin_cruce', 'Pct_sin_cruce'])
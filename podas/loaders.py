@@ -0,0 +1,48 @@
+"""
+Carga de las tablas de puntos de Podas_2025 (PQR pendientes e inventario forestal).
+
+Podas_2025/app.py (load_pqr_data, load_inventario_data), la generación por
+lotes de rutas (podas.batch) y los benchmarks cargan con estas funciones, así
+que procesan y miden exactamente los mismos datos.
+"""
+
+from pathlib import Path
+
+from podas.coordinates import clean_coordinate_columns, rejection_counts
+from podas.ingest import read_table
+from podas.keys import canonical_sticker
+from podas.schema import compact_frame
+
+DATA_DIR = Path("data")
+PQR_FILE = DATA_DIR / "pqr_pendientes_georreferenciadas.csv"
+INVENTARIO_FILE = DATA_DIR / "Inventario_forestal.csv"
+
+
+def load_points(path, rechazos=False):
+    """
+    Tabla de puntos con Sticker canónico (ver podas.keys), coordenadas limpias
+    y el esquema compacto de podas.schema.
+
+    Args:
+        path: Ruta del CSV (se usa su Parquet de podas.ingest si es más reciente)
+        rechazos: Si es True, devuelve también las filas con coordenadas
+            rechazadas por motivo (ver podas.coordinates.rejection_counts)
+
+    Returns:
+        DataFrame, o tupla (df, conteos) si rechazos es True
+    """
+    df = read_table(path, dtype={'Sticker': str})
+    df['Sticker'] = canonical_sticker(df['Sticker'])
+    motivos = clean_coordinate_columns(df)
+    df = compact_frame(df)
+    return (df, rejection_counts(motivos)) if rechazos else df
+
+
+def load_pqr(path=PQR_FILE, rechazos=False):
+    """PQR pendientes georreferenciadas (ver load_points)."""
+    return load_points(path, rechazos=rechazos)
+
+
+def load_inventario(path=INVENTARIO_FILE, rechazos=False):
+    """Inventario forestal (ver load_points)."""
+    return load_points(path, rechazos=rechazos)
@@ -0,0 +1,130 @@
+"""
+Caché LRU del HTML de los mapas folium, compartida entre sesiones.
+
+Construir el mapa (capas GeoJSON, hexágonos, ruta) y serializarlo a HTML es lo
+más costoso de cada rerun, y se repetía aunque solo cambiara la tabla o un
+gráfico. El HTML resultante depende solo del estado de los filtros y de la
+versión de los datos, así que se guarda con esa clave: las combinaciones de
+filtros que se repiten se sirven sin construir el mapa.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def _normalize(valor):
+    """Forma canónica de un valor de filtro (listas ordenadas, sin distinguir list/tuple/set)."""
+    if isinstance(valor, dict):
+        return {str(k): _normalize(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sorted((_normalize(v) for v in valor), key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    if hasattr(valor, 'item'):
+        # Escalares NumPy
+        return valor.item()
+    return valor
+
+
+def filter_key(**state):
+    """
+    Hash del estado de los filtros.
+
+    Las selecciones múltiples se comparan como conjuntos: el orden en que el
+    usuario eligió las comunas o especies no cambia la clave.
+
+    Args:
+        **state: Valores de los filtros, interruptores de capas y versión de los datos
+
+    Returns:
+        Texto hexadecimal
+    """
+    texto = json.dumps(_normalize(state), sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class MapHtmlCache:
+    """
+    LRU acotado por número de entradas y por bytes, seguro entre hilos.
+
+    Cada entrada guarda el HTML del mapa y un diccionario de datos asociados
+    (conteos que la app muestra junto al mapa).
+
+    Args:
+        max_entries: Número máximo de mapas guardados
+        max_bytes: Tamaño máximo total del HTML guardado
+    """
+
+    def __init__(self, max_entries=32, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Entrada (html, info) de la clave, o None; cuenta el acierto o fallo."""
+        with self._lock:
+            entrada = self._entries.get(key)
+            if entrada is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entrada
+
+    def put(self, key, html, info=None):
+        """Guarda una entrada y descarta las menos usadas si se superan los límites."""
+        tamano = len(html.encode('utf-8'))
+        with self._lock:
+            anterior = self._entries.pop(key, None)
+            if anterior is not None:
+                self._bytes -= anterior[2]
+            if tamano > self.max_bytes:
+                return
+            self._entries[key] = (html, info or {}, tamano)
+            self._bytes += tamano
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, descartado) = self._entries.popitem(last=False)
+                self._bytes -= descartado
+
+    def get_or_build(self, key, builder):
+        """
+        HTML e información del mapa desde la caché, o construidos con builder.
+
+        Args:
+            key: Clave de filter_key
+            builder: Función sin argumentos que devuelve (html, info)
+
+        Returns:
+            Tupla (html, info, desde_cache)
+        """
+        entrada = self.get(key)
+        if entrada is not None:
+            return entrada[0], entrada[1], True
+        html, info = builder()
+        self.put(key, html, info)
+        return html, info, False
+
+    def clear(self):
+        """Vacía la caché (los contadores se conservan)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Diccionario con 'entries', 'bytes', 'hits', 'misses' y 'hit_rate'."""
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / consultas if consultas else 0.0,
+            }
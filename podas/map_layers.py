@@ -0,0 +1,451 @@
+"""
+Capas de puntos para folium construidas como una sola FeatureCollection GeoJSON.
+
+Sustituye el patrón ``for _, row in df.iterrows(): folium.CircleMarker(...)``:
+en lugar de un objeto folium (y un bloque de JavaScript) por fila, el DataFrame
+filtrado se convierte en bloque a una FeatureCollection y se dibuja con una
+única capa ``L.geoJson``. El estilo de cada punto se resuelve en el navegador a
+partir de sus propiedades (por ejemplo ``Inventariado`` o ``Requiere_Acción``)
+y los popups/tooltips se arman con plantillas ``{campo}``.
+
+Los puntos con la misma coordenada (frecuentes en los inventarios) pueden
+agruparse en un solo marcador con el conteo y un popup combinado, o abrirse en
+espiral alrededor del punto común (ver frame_to_feature_collection).
+
+Con zoom bajo, DensityLayer dibuja los conteos por celda de podas.density y
+ZoomSwitch alterna entre esa capa y los marcadores individuales según el zoom;
+los marcadores se construyen en el navegador solo para los puntos de la vista
+actual. Todos los puntos siguen viajando en el HTML (no hay servidor que los
+entregue por zona): lo que se reduce es el trabajo del navegador, no el tamaño.
+"""
+
+import numpy as np
+import pandas as pd
+from branca.element import MacroElement
+from folium import Map
+from folium.map import Layer
+from jinja2 import Template
+
+from podas.density import density_grid, grid_to_feature_collection
+from podas.spatial import RADIO_TIERRA_M, colocated_groups
+
+# Ángulo dorado: reparte los puntos abiertos en espiral sin que se alineen
+_ANGULO_DORADO = np.pi * (3 - np.sqrt(5))
+
+
+def _json_column(serie):
+    """Convierte una columna a texto serializable en JSON (NaN -> None)."""
+    valores = serie.astype(object).map(str, na_action='ignore').to_numpy(dtype=object)
+    valores[serie.isna().to_numpy()] = None
+    return valores.tolist()
+
+
+def _spread_offsets(lat, grupos, spread_m):
+    """
+    Desplazamiento en grados de cada punto de un grupo repetido.
+
+    Los miembros de cada grupo se ubican en una espiral (Vogel) alrededor del
+    punto común; el orden de las filas define la posición, así que el
+    resultado es el mismo en cada render.
+    """
+    tamanos = np.bincount(grupos)[grupos]
+    rango = pd.Series(grupos).groupby(grupos).cumcount().to_numpy()
+    distancia = np.where(tamanos > 1, spread_m * np.sqrt(rango + 1), 0.0)
+    angulo = rango * _ANGULO_DORADO
+    dlat = np.degrees(distancia * np.sin(angulo) / RADIO_TIERRA_M)
+    dlon = np.degrees(distancia * np.cos(angulo) / (RADIO_TIERRA_M * np.cos(np.radians(lat))))
+    return dlat, dlon
+
+
+def _group_features(features, grupos):
+    """Un feature por grupo: el primer miembro más '_n' y '_members' si hay repetidos."""
+    tamanos = np.bincount(grupos)
+    agrupados = [None] * len(tamanos)
+    for feature, grupo in zip(features, grupos.tolist()):
+        actual = agrupados[grupo]
+        if actual is None:
+            agrupados[grupo] = feature
+            if tamanos[grupo] > 1:
+                feature['properties'] = dict(feature['properties'], _n=int(tamanos[grupo]),
+                                             _members=[feature['properties']])
+        else:
+            actual['properties']['_members'].append(feature['properties'])
+    return agrupados
+
+
+def frame_to_feature_collection(df, fields, lat_col='Latitud', lon_col='Longitud', precision=6,
+                                colocated=None, tol_m=1.0, spread_m=4.0):
+    """
+    Convierte un DataFrame de puntos en una FeatureCollection GeoJSON.
+
+    Args:
+        df: DataFrame con coordenadas
+        fields: Columnas a incluir como propiedades (las ausentes se ignoran)
+        lat_col: Columna de latitud
+        lon_col: Columna de longitud
+        precision: Decimales conservados en las coordenadas
+        colocated: Tratamiento de los puntos a menos de tol_m entre sí: None
+            (se dibujan todos), 'group' (un marcador por ubicación con '_n' y
+            '_members') o 'spread' (se abren en espiral alrededor del punto)
+        tol_m: Distancia en metros bajo la cual dos puntos son la misma ubicación
+            (ver podas.spatial.colocated_groups)
+        spread_m: Separación en metros de la espiral de colocated='spread'
+
+    Returns:
+        Diccionario con la FeatureCollection (filas sin coordenadas válidas se descartan)
+    """
+    lat = pd.to_numeric(df[lat_col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    lon = pd.to_numeric(df[lon_col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    validos = np.isfinite(lat) & np.isfinite(lon)
+    puntos = df[validos]
+    lat, lon = lat[validos], lon[validos]
+
+    grupos = colocated_groups(lat, lon, tol_m) if colocated and len(lat) else None
+    if colocated == 'spread' and grupos is not None:
+        dlat, dlon = _spread_offsets(lat, grupos, spread_m)
+        lat, lon = lat + dlat, lon + dlon
+
+    coordenadas = np.column_stack([lon, lat]).round(precision).tolist()
+    columnas = [c for c in dict.fromkeys(fields) if c in puntos.columns]
+    valores = [_json_column(puntos[c]) for c in columnas]
+
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': coords},
+            'properties': dict(zip(columnas, props)),
+        }
+        for coords, props in zip(coordenadas, zip(*valores) if columnas else [()] * len(coordenadas))
+    ]
+    if colocated == 'group' and grupos is not None:
+        features = _group_features(features, grupos)
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+class PointLayer(Layer):
+    """
+    Capa de CircleMarkers a partir de una FeatureCollection de puntos.
+
+    Args:
+        data: FeatureCollection (ver frame_to_feature_collection)
+        base_style: Opciones de L.circleMarker comunes a todos los puntos
+        styles: Diccionario {propiedad: {valor: opciones}}. El valor de la
+            propiedad se compara sin espacios y en mayúsculas; las opciones de
+            cada propiedad se aplican en orden sobre base_style. La clave
+            especial '*' se usa cuando el valor no aparece en el diccionario.
+        popup: Plantilla HTML con marcadores {campo}
+        tooltip: Plantilla de texto con marcadores {campo}
+        popup_max_width: Ancho máximo del popup en píxeles
+        missing: Texto para propiedades vacías en popups y tooltips
+        name: Nombre de la capa en el LayerControl
+        overlay: Si la capa es superpuesta (True) o base (False)
+        control: Si la capa aparece en el LayerControl
+        show: Si la capa se muestra al abrir el mapa
+        group_label: Encabezado del popup de un marcador agrupado (tras el conteo)
+        viewport_zoom: Si se da, los CircleMarkers se construyen en el navegador
+            solo desde ese zoom y solo para los puntos de la vista actual (ZoomSwitch
+            lo fija con su zoom de detalle). Los datos siguen en el HTML
+
+    Attributes:
+        n_points: Puntos representados por la capa
+        markers_saved: Marcadores que no se dibujan gracias al agrupamiento
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }}_base = {{ this.base_style|tojson }};
+            var {{ this.get_name() }}_styles = {{ this.styles|tojson }};
+            function {{ this.get_name() }}_fill(plantilla, props) {
+                return plantilla.replace(/\\{([^{}]+)\\}/g, function (_, campo) {
+                    var valor = props[campo];
+                    return (valor === null || valor === undefined) ? {{ this.missing|tojson }} : valor;
+                });
+            }
+            {%- if this.viewport_zoom is none %}
+            var {{ this.get_name() }} = L.geoJson({{ this.data|tojson }}, {
+            {%- else %}
+            var {{ this.get_name() }}_data = {{ this.data|tojson }};
+            var {{ this.get_name() }}_ultimo = null;
+            var {{ this.get_name() }} = L.geoJson(null, {
+            {%- endif %}
+                pointToLayer: function (feature, latlng) {
+                    var opts = Object.assign({}, {{ this.get_name() }}_base);
+                    for (var prop in {{ this.get_name() }}_styles) {
+                        var porValor = {{ this.get_name() }}_styles[prop];
+                        var valor = String(feature.properties[prop]).trim().toUpperCase();
+                        Object.assign(opts, porValor[valor] || porValor['*'] || {});
+                    }
+                    var n = feature.properties._n || 1;
+                    if (n > 1) {
+                        // Los marcadores agrupados crecen con el número de puntos
+                        opts.radius = (opts.radius || 10) + Math.min(6, 2 * Math.log2(n));
+                        opts.weight = (opts.weight || 1) + 1;
+                    }
+                    return L.circleMarker(latlng, opts);
+                },
+                onEachFeature: function (feature, layer) {
+                    var miembros = feature.properties._members;
+                    {%- if this.popup %}
+                    var popup = miembros
+                        ? '<b>' + miembros.length + ' ' + {{ this.group_label|tojson }} + '</b><hr>' +
+                          miembros.map(function (props) {
+                              return {{ this.get_name() }}_fill({{ this.popup|tojson }}, props);
+                          }).join('<hr>')
+                        : {{ this.get_name() }}_fill({{ this.popup|tojson }}, feature.properties);
+                    layer.bindPopup(popup, {maxWidth: {{ this.popup_max_width|tojson }}, maxHeight: 320});
+                    {%- endif %}
+                    {%- if this.tooltip %}
+                    layer.bindTooltip(
+                        (miembros ? '(' + miembros.length + ') ' : '') +
+                        {{ this.get_name() }}_fill({{ this.tooltip|tojson }}, feature.properties),
+                        {sticky: true}
+                    );
+                    {%- endif %}
+                    {%- if this.viewport_zoom is not none %}
+                    {{ this.get_name() }}_ultimo = layer;
+                    {%- endif %}
+                }
+            });
+            {%- if this.viewport_zoom is not none %}
+            // Solo se construyen los marcadores de la vista actual (con margen) y desde
+            // viewport_zoom; al mover el mapa se agregan los que entran y se quitan los que salen
+            (function () {
+                var mapa = {{ this.map_name }};
+                var capa = {{ this.get_name() }};
+                var puntos = {{ this.get_name() }}_data.features;
+                var construidos = {};
+                function actualizar() {
+                    if (!mapa.hasLayer(capa)) { return; }
+                    if (mapa.getZoom() < {{ this.viewport_zoom }}) {
+                        capa.clearLayers();
+                        construidos = {};
+                        return;
+                    }
+                    var limites = mapa.getBounds().pad(0.25);
+                    var vistos = {};
+                    for (var i = 0; i < puntos.length; i++) {
+                        var c = puntos[i].geometry.coordinates;
+                        if (!limites.contains([c[1], c[0]])) { continue; }
+                        vistos[i] = true;
+                        if (!construidos[i]) {
+                            capa.addData(puntos[i]);
+                            construidos[i] = {{ this.get_name() }}_ultimo;
+                        }
+                    }
+                    for (var k in construidos) {
+                        if (!vistos[k]) { capa.removeLayer(construidos[k]); delete construidos[k]; }
+                    }
+                }
+                mapa.on('moveend', actualizar);
+                capa.on('add', actualizar);
+                mapa.whenReady(actualizar);
+            })();
+            {%- endif %}
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, data, base_style=None, styles=None, popup=None, tooltip=None,
+                 popup_max_width=300, missing='N/A', name=None, overlay=True,
+                 control=True, show=True, group_label='puntos en esta ubicación', viewport_zoom=None):
+        super().__init__(name=name, overlay=overlay, control=control, show=show)
+        self._name = 'PointLayer'
+        self.viewport_zoom = None if viewport_zoom is None else int(viewport_zoom)
+        self.map_name = None
+        self.data = data
+        self.base_style = base_style or {}
+        self.styles = {
+            prop: {str(valor).strip().upper() if valor != '*' else '*': opts
+                   for valor, opts in por_valor.items()}
+            for prop, por_valor in (styles or {}).items()
+        }
+        self.popup = popup
+        self.tooltip = tooltip
+        self.popup_max_width = popup_max_width
+        self.missing = missing
+        self.group_label = group_label
+        self.n_points = sum(f['properties'].get('_n', 1) for f in data['features'])
+        self.markers_saved = self.n_points - len(data['features'])
+
+    def render(self, **kwargs):
+        # El filtro por vista necesita el mapa, que puede estar varios niveles arriba
+        if self.viewport_zoom is not None:
+            padre = self._parent
+            while not isinstance(padre, Map):
+                padre = padre._parent
+            self.map_name = padre.get_name()
+        super().render(**kwargs)
+
+    def _get_self_bounds(self):
+        """Límites [[lat_min, lon_min], [lat_max, lon_max]] de los puntos."""
+        coords = np.array([f['geometry']['coordinates'] for f in self.data['features']])
+        if coords.size == 0:
+            return [[None, None], [None, None]]
+        return [[float(coords[:, 1].min()), float(coords[:, 0].min())],
+                [float(coords[:, 1].max()), float(coords[:, 0].max())]]
+
+
+def add_point_layer(parent, df, fields, lat_col='Latitud', lon_col='Longitud', colocated=None,
+                    tol_m=1.0, **kwargs):
+    """
+    Agrega al mapa (o FeatureGroup) una capa de puntos construida desde un DataFrame.
+
+    Args:
+        parent: folium.Map o FeatureGroup destino
+        df: DataFrame filtrado con coordenadas
+        fields: Columnas que usan los estilos, popups y tooltips
+        lat_col: Columna de latitud
+        lon_col: Columna de longitud
+        colocated: None, 'group' o 'spread' (ver frame_to_feature_collection)
+        tol_m: Distancia en metros bajo la cual dos puntos son la misma ubicación
+        **kwargs: Argumentos de PointLayer (estilos, plantillas, nombre, ...)
+
+    Returns:
+        La capa PointLayer agregada (markers_saved indica cuántos marcadores se ahorraron)
+    """
+    data = frame_to_feature_collection(df, fields, lat_col=lat_col, lon_col=lon_col,
+                                       colocated=colocated, tol_m=tol_m)
+    layer = PointLayer(data, **kwargs)
+    layer.add_to(parent)
+    return layer
+
+
+class DensityLayer(Layer):
+    """
+    Capa de polígonos (celdas de podas.density) con opacidad según el conteo.
+
+    Args:
+        data: FeatureCollection de grid_to_feature_collection
+        color: Color de borde y relleno
+        min_opacity: Opacidad del relleno de la celda con menor conteo
+        max_opacity: Opacidad del relleno de la celda con mayor conteo
+        popup: Plantilla HTML con marcadores {campo}
+        tooltip: Plantilla de texto con marcadores {campo}
+        name: Nombre de la capa en el LayerControl
+        overlay: Si la capa es superpuesta (True) o base (False)
+        control: Si la capa aparece en el LayerControl
+        show: Si la capa se muestra al abrir el mapa
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            function {{ this.get_name() }}_fill(plantilla, props) {
+                return plantilla.replace(/\\{([^{}]+)\\}/g, function (_, campo) {
+                    var valor = props[campo];
+                    return (valor === null || valor === undefined) ? '0' : valor;
+                });
+            }
+            var {{ this.get_name() }} = L.geoJson({{ this.data|tojson }}, {
+                style: function (feature) {
+                    var ratio = Math.sqrt(feature.properties._ratio);
+                    return {
+                        color: {{ this.color|tojson }},
+                        weight: 0.5,
+                        fillColor: {{ this.color|tojson }},
+                        fillOpacity: {{ this.min_opacity }} + ({{ this.max_opacity }} - {{ this.min_opacity }}) * ratio
+                    };
+                },
+                onEachFeature: function (feature, layer) {
+                    {%- if this.popup %}
+                    layer.bindPopup({{ this.get_name() }}_fill({{ this.popup|tojson }}, feature.properties));
+                    {%- endif %}
+                    {%- if this.tooltip %}
+                    layer.bindTooltip(
+                        {{ this.get_name() }}_fill({{ this.tooltip|tojson }}, feature.properties),
+                        {sticky: true}
+                    );
+                    {%- endif %}
+                }
+            });
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, data, color='#e36414', min_opacity=0.15, max_opacity=0.8, popup=None,
+                 tooltip=None, name=None, overlay=True, control=True, show=True):
+        super().__init__(name=name, overlay=overlay, control=control, show=show)
+        self._name = 'DensityLayer'
+        self.data = data
+        self.color = color
+        self.min_opacity = float(min_opacity)
+        self.max_opacity = float(max_opacity)
+        self.popup = popup
+        self.tooltip = tooltip
+
+
+class ZoomSwitch(MacroElement):
+    """
+    Muestra unas capas con zoom bajo y otras desde un zoom dado.
+
+    Las capas se quitan y agregan a su contenedor (mapa o FeatureGroup), de
+    modo que siguen respetando el LayerControl. Debe agregarse al mapa después
+    de las capas y de sus FeatureGroup. Las PointLayer de high pasan a
+    construir sus marcadores solo para la vista actual (ver viewport_zoom).
+
+    Args:
+        low: Capas visibles con zoom menor que zoom (p. ej. DensityLayer)
+        high: Capas visibles desde zoom (p. ej. PointLayer)
+        zoom: Nivel de zoom en que se cambia de capas
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            (function () {
+                var mapa = {{ this._parent.get_name() }};
+                var bajo = [{% for capa in this.low %}[{{ capa.get_name() }}, {{ capa._parent.get_name() }}],{% endfor %}];
+                var alto = [{% for capa in this.high %}[{{ capa.get_name() }}, {{ capa._parent.get_name() }}],{% endfor %}];
+                function mostrar(par, visible) {
+                    if (visible) { par[1].addLayer(par[0]); } else { par[1].removeLayer(par[0]); }
+                }
+                function actualizar() {
+                    var detalle = mapa.getZoom() >= {{ this.zoom }};
+                    bajo.forEach(function (par) { mostrar(par, !detalle); });
+                    alto.forEach(function (par) { mostrar(par, detalle); });
+                }
+                mapa.on('zoomend', actualizar);
+                actualizar();
+            })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, low, high, zoom=15):
+        super().__init__()
+        self._name = 'ZoomSwitch'
+        self.low = list(low)
+        self.high = list(high)
+        self.zoom = int(zoom)
+        for capa in self.high:
+            if isinstance(capa, PointLayer) and capa.viewport_zoom is None:
+                capa.viewport_zoom = self.zoom
+
+
+def add_density_layer(parent, layers, size_m=250.0, shape='hex', value_col='Total', **kwargs):
+    """
+    Agrega al mapa (o FeatureGroup) los conteos por celda de varias capas de puntos.
+
+    Args:
+        parent: folium.Map o FeatureGroup destino
+        layers: Diccionario {nombre: DataFrame con Latitud y Longitud}; cada
+            nombre es una columna de conteo disponible en popup y tooltip
+        size_m: Tamaño de la celda en metros (radio del hexágono o lado del cuadrado)
+        shape: 'hex' o 'square'
+        value_col: Conteo que define la intensidad del color ('Total' o un nombre de capa)
+        **kwargs: Argumentos de DensityLayer (color, plantillas, nombre, ...)
+
+    Returns:
+        La capa DensityLayer agregada
+    """
+    puntos = {
+        nombre: (pd.to_numeric(df['Latitud'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan),
+                 pd.to_numeric(df['Longitud'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan))
+        for nombre, df in layers.items()
+    }
+    grid = density_grid(puntos, size_m=size_m, shape=shape)
+    data = grid_to_feature_collection(grid, size_m=size_m, shape=shape, value_col=value_col)
+    layer = DensityLayer(data, **kwargs)
+    layer.add_to(parent)
+    return layer
@@ -0,0 +1,281 @@
+"""
+Optimización de rutas de cuadrilla sobre puntos PQR.
+
+Construye una matriz de distancias haversine vectorizada, arma un recorrido
+inicial por vecino más cercano y lo mejora con búsquedas 2-opt y Or-opt.
+El recorrido es abierto: empieza en un punto fijo y no regresa al origen.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+RADIO_TIERRA_KM = 6371.0088
+
+# Mejora mínima (km) para aceptar un movimiento y evitar ciclos por redondeo
+_EPS = 1e-9
+
+
+def haversine_matrix(lat, lon):
+    """
+    Matriz de distancias haversine entre todos los puntos.
+
+    Args:
+        lat: Arreglo de latitudes en grados
+        lon: Arreglo de longitudes en grados
+
+    Returns:
+        Matriz n x n de distancias en kilómetros
+    """
+    lat = np.radians(np.asarray(lat, dtype='float64'))
+    lon = np.radians(np.asarray(lon, dtype='float64'))
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def route_length(dist, route):
+    """Longitud (km) de un recorrido abierto dado como arreglo de índices."""
+    route = np.asarray(route)
+    if len(route) < 2:
+        return 0.0
+    return float(dist[route[:-1], route[1:]].sum())
+
+
+def nearest_neighbor_route(dist, start=0):
+    """
+    Recorrido inicial por vecino más cercano.
+
+    Args:
+        dist: Matriz de distancias
+        start: Índice del punto de partida
+
+    Returns:
+        Arreglo con el orden de visita
+    """
+    n = len(dist)
+    route = np.empty(n, dtype=np.intp)
+    visitado = np.zeros(n, dtype=bool)
+    actual = start
+    for paso in range(n):
+        route[paso] = actual
+        visitado[actual] = True
+        if paso == n - 1:
+            break
+        fila = np.where(visitado, np.inf, dist[actual])
+        actual = int(np.argmin(fila))
+    return route
+
+
+def neighbor_lists(dist, k=12):
+    """Índices de los k vecinos más cercanos de cada punto (sin incluirse a sí mismo)."""
+    n = len(dist)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.intp)
+    con_diagonal = dist + np.diag(np.full(n, np.inf))
+    vecinos = np.argpartition(con_diagonal, k - 1, axis=1)[:, :k]
+    orden = np.take_along_axis(con_diagonal, vecinos, axis=1).argsort(axis=1)
+    return np.take_along_axis(vecinos, orden, axis=1)
+
+
+def _two_opt_move(dist, route, pos, neighbors, x):
+    """
+    Busca y aplica la mejor inversión 2-opt de las aristas que tocan al punto x.
+
+    Se evalúan en bloque las inversiones del tramo b..c cuyas nuevas aristas
+    (a, c) o (b, d) unen vecinos cercanos. Modifica route y pos en sitio.
+
+    Returns:
+        Puntos afectados por el movimiento, o None si no hubo mejora
+    """
+    n = len(route)
+    for i in (pos[x] - 1, pos[x]):
+        if i < 0 or i > n - 3:
+            continue
+        a, b = route[i], route[i + 1]
+        j = np.concatenate([pos[neighbors[a]], pos[neighbors[b]] - 1])
+        j = j[j >= i + 2]
+        if len(j) == 0:
+            continue
+        c = route[j]
+        d = np.where(j + 1 < n, route[np.minimum(j + 1, n - 1)], -1)
+        # Cambio de longitud al invertir route[i+1..j]; el último tramo no tiene sucesor
+        delta = dist[a, c] - dist[a, b]
+        interior = d >= 0
+        delta[interior] += dist[b, d[interior]] - dist[c[interior], d[interior]]
+        k = int(np.argmin(delta))
+        if delta[k] < -_EPS:
+            fin = int(j[k])
+            route[i + 1:fin + 1] = route[i + 1:fin + 1][::-1]
+            pos[route[i + 1:fin + 1]] = np.arange(i + 1, fin + 1)
+            return [a, b, c[k], d[k]]
+    return None
+
+
+def _or_opt_move(dist, route, pos, neighbors, x, max_segment):
+    """
+    Busca y aplica la mejor reubicación Or-opt del tramo que empieza en x.
+
+    Tramos de 1 a max_segment puntos se insertan junto a un vecino cercano,
+    en su orden original o invertidos. Modifica route y pos en sitio.
+
+    Returns:
+        Puntos afectados por el movimiento, o None si no hubo mejora
+    """
+    n = len(route)
+    i = pos[x]
+    for largo in range(1, max_segment + 1):
+        if i < 1 or i + largo > n:
+            break
+        tramo = route[i:i + largo].copy()
+        primero, ultimo = tramo[0], tramo[-1]
+        previo = route[i - 1]
+        siguiente = route[i + largo] if i + largo < n else -1
+
+        # Ahorro al retirar el tramo
+        ahorro = dist[previo, primero]
+        if siguiente >= 0:
+            ahorro += dist[ultimo, siguiente] - dist[previo, siguiente]
+
+        # Insertar después de la posición p (u = route[p], v = route[p + 1])
+        cercanos = pos[np.concatenate([neighbors[primero], neighbors[ultimo]])]
+        p = np.concatenate([cercanos, cercanos - 1])
+        p = p[(p >= 0) & ((p < i - 1) | (p >= i + largo))]
+        if len(p) == 0:
+            continue
+        u = route[p]
+        v = np.where(p + 1 < n, route[np.minimum(p + 1, n - 1)], -1)
+        interior = v >= 0
+        directo = dist[u, primero].copy()
+        inverso = dist[u, ultimo].copy()
+        directo[interior] += dist[ultimo, v[interior]] - dist[u[interior], v[interior]]
+        inverso[interior] += dist[primero, v[interior]] - dist[u[interior], v[interior]]
+
+        costo = np.minimum(directo, inverso)
+        k = int(np.argmin(costo))
+        if costo[k] - ahorro < -_EPS:
+            destino = int(p[k])
+            insertado = tramo if directo[k] <= inverso[k] else tramo[::-1]
+            if destino < i:
+                partes = [route[:destino + 1], insertado, route[destino + 1:i], route[i + largo:]]
+            else:
+                partes = [route[:i], route[i + largo:destino + 1], insertado, route[destino + 1:]]
+            route[:] = np.concatenate(partes)
+            pos[route] = np.arange(n)
+            return [previo, siguiente, u[k], v[k], primero, ultimo]
+    return None
+
+
+def improve_route(dist, route, neighbors, max_segment=3, deadline=None):
+    """
+    Búsqueda local 2-opt + Or-opt sobre un recorrido abierto (el primer punto queda fijo).
+
+    Cada punto se revisa una vez; tras un movimiento solo se vuelven a revisar
+    los puntos cuyas aristas cambiaron (bits "don't look"), así que el costo
+    crece con el número de mejoras y no con pasadas completas.
+
+    Args:
+        dist: Matriz de distancias
+        route: Recorrido inicial
+        neighbors: Listas de vecinos (ver neighbor_lists)
+        max_segment: Largo máximo del tramo que mueve Or-opt
+        deadline: Instante (time.perf_counter) en el que se detiene la búsqueda
+
+    Returns:
+        Recorrido mejorado
+    """
+    route = np.array(route, dtype=np.intp)
+    n = len(route)
+    if n < 4:
+        return route
+
+    pos = np.empty(n, dtype=np.intp)
+    pos[route] = np.arange(n)
+    pendientes = deque(route.tolist())
+    en_cola = np.ones(n, dtype=bool)
+    while pendientes:
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        x = pendientes.popleft()
+        en_cola[x] = False
+        afectados = _two_opt_move(dist, route, pos, neighbors, x)
+        if afectados is None:
+            afectados = _or_opt_move(dist, route, pos, neighbors, x, max_segment)
+        if afectados is None:
+            continue
+        for punto in afectados + [x]:
+            if punto >= 0 and not en_cola[punto]:
+                en_cola[punto] = True
+                pendientes.append(punto)
+    return route
+
+
+def optimize_route(dist, start=0, time_limit=0.9):
+    """
+    Vecino más cercano seguido de búsqueda local 2-opt + Or-opt.
+
+    Args:
+        dist: Matriz de distancias
+        start: Índice del punto de partida
+        time_limit: Segundos máximos dedicados a la mejora local (None = hasta
+            el óptimo local; el resultado no depende entonces de la carga del equipo)
+
+    Returns:
+        Arreglo con el orden de visita
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    route = nearest_neighbor_route(dist, start=start)
+    return improve_route(dist, route, neighbor_lists(dist), deadline=deadline)
+
+
+def plan_route(df, lat_col='Latitud', lon_col='Longitud', time_limit=0.9):
+    """
+    Ordena los puntos de un DataFrame en una ruta optimizada.
+
+    La ruta parte del mismo punto que el orden actual por Comuna y Latitud
+    descendente, para comparar ambas longitudes en igualdad de condiciones.
+
+    Args:
+        df: DataFrame con coordenadas (las filas sin coordenadas se descartan)
+        lat_col: Columna de latitud
+        lon_col: Columna de longitud
+        time_limit: Segundos máximos dedicados a la mejora local (None = sin límite)
+
+    Returns:
+        Tupla (df_ruta, resumen):
+        - df_ruta: filas en orden de visita con columnas 'Orden_ruta',
+          'Distancia_tramo_km' y 'Distancia_acumulada_km'
+        - resumen: diccionario con 'puntos', 'km_ruta', 'km_orden_actual' y 'ahorro_pct'
+    """
+    puntos = df.dropna(subset=[lat_col, lon_col])
+    if 'Comuna' in puntos.columns:
+        puntos = puntos.sort_values(['Comuna', lat_col], ascending=[True, False])
+    puntos = puntos.reset_index(drop=True)
+
+    n = len(puntos)
+    if n == 0:
+        resumen = {'puntos': 0, 'km_ruta': 0.0, 'km_orden_actual': 0.0, 'ahorro_pct': 0.0}
+        return puntos.assign(Orden_ruta=[], Distancia_tramo_km=[], Distancia_acumulada_km=[]), resumen
+
+    dist = haversine_matrix(puntos[lat_col].to_numpy(), puntos[lon_col].to_numpy())
+    orden_actual = np.arange(n)
+    route = optimize_route(dist, start=0, time_limit=time_limit)
+
+    tramos = np.concatenate([[0.0], dist[route[:-1], route[1:]]])
+    df_ruta = puntos.iloc[route].reset_index(drop=True)
+    df_ruta['Orden_ruta'] = np.arange(1, n + 1)
+    df_ruta['Distancia_tramo_km'] = tramos.round(3)
+    df_ruta['Distancia_acumulada_km'] = tramos.cumsum().round(3)
+
+    km_ruta = route_length(dist, route)
+    km_actual = route_length(dist, orden_actual)
+    resumen = {
+        'puntos': n,
+        'km_ruta': km_ruta,
+        'km_orden_actual': km_actual,
+        'ahorro_pct': (1 - km_ruta / km_actual) * 100 if km_actual > 0 else 0.0,
+    }
+    return df_ruta, resumen
@@ -0,0 +1,286 @@
+"""
+Programación de órdenes de trabajo por cuadrilla y por día.
+
+Reparte los PQR pendientes (Requiere_Acción = SI y aún no ejecutados) entre
+varias cuadrillas con una capacidad diaria de paradas y de kilómetros:
+
+1. Agrupamiento: bisección recursiva balanceada sobre el eje de mayor
+   dispersión. Primero se forman los territorios de cada cuadrilla y luego,
+   dentro de cada territorio, los grupos de un día. Cada corte es O(n), así
+   que el agrupamiento escala a decenas de miles de paradas.
+2. Ruteo: cada grupo diario se ordena con podas.routing (vecino más cercano +
+   2-opt/Or-opt). Si el recorrido supera el límite de kilómetros, el grupo se
+   vuelve a partir en dos y se rutea cada mitad.
+"""
+
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from podas.map_layers import frame_to_feature_collection
+from podas.routing import RADIO_TIERRA_KM, haversine_matrix, optimize_route, route_length
+
+# Columnas de cada orden de trabajo, en este orden (las ausentes se ignoran)
+COLUMNAS_ORDEN = [
+    'Cuadrilla', 'Dia', 'Orden_visita', 'Sticker', 'ID_Luminaria', 'P.Q.R.S', 'Comuna',
+    'Inventariado', 'Requiere_Acción', 'Latitud', 'Longitud',
+    'Distancia_tramo_km', 'Distancia_acumulada_km',
+]
+_COLUMNAS_PLAN = ['Cuadrilla', 'Dia', 'Orden_visita', 'Distancia_tramo_km', 'Distancia_acumulada_km']
+
+
+def pending_requests(df, lat_col='Latitud', lon_col='Longitud'):
+    """
+    PQR que requieren acción y no figuran como ejecutados.
+
+    Acepta tanto el DataFrame de load_pqr_data (sin columna Ejecutada) como el
+    de load_data (con Ejecutada). Las filas sin coordenadas se descartan.
+    """
+    mascara = pd.Series(True, index=df.index)
+    if 'Requiere_Acción' in df.columns:
+        mascara &= df['Requiere_Acción'].astype(str).str.strip().str.upper() == 'SI'
+    if 'Ejecutada' in df.columns:
+        mascara &= df['Ejecutada'].astype(str).str.strip().str.upper() != 'SI'
+    return df[mascara].dropna(subset=[lat_col, lon_col])
+
+
+def _planar_km(lat, lon):
+    """Proyección equirectangular local (km), para cortar por distancia y no por grados."""
+    lat0 = np.radians(np.mean(lat))
+    x = np.radians(lon) * np.cos(lat0) * RADIO_TIERRA_KM
+    y = np.radians(lat) * RADIO_TIERRA_KM
+    return np.column_stack([x, y])
+
+
+def _leg_km(lat, lon, route):
+    """Distancia haversine (km) de cada tramo del recorrido; el primer punto vale 0."""
+    lat1, lat2 = np.radians(lat[route[:-1]]), np.radians(lat[route[1:]])
+    dlon = np.radians(lon[route[1:]] - lon[route[:-1]])
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    tramos = 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+    return np.concatenate([[0.0], tramos])
+
+
+def balanced_partition(xy, groups):
+    """
+    Parte los puntos en grupos compactos de tamaño balanceado (difieren en a lo sumo 1).
+
+    Args:
+        xy: Arreglo n x 2 de coordenadas planas
+        groups: Número de grupos
+
+    Returns:
+        Arreglo de etiquetas 0..groups-1
+    """
+    n = len(xy)
+    etiquetas = np.zeros(n, dtype=np.intp)
+    groups = max(1, min(int(groups), n))
+    # Pila de (índices, primer grupo, cantidad de grupos)
+    pila = [(np.arange(n), 0, groups)]
+    while pila:
+        indices, primero, cantidad = pila.pop()
+        if cantidad == 1:
+            etiquetas[indices] = primero
+            continue
+        izquierda = cantidad // 2
+        corte = round(len(indices) * izquierda / cantidad)
+        puntos = xy[indices]
+        eje = int(np.argmax(np.ptp(puntos, axis=0)))
+        orden = np.argpartition(puntos[:, eje], corte - 1)
+        pila.append((indices[orden[corte:]], primero + izquierda, cantidad - izquierda))
+        pila.append((indices[orden[:corte]], primero, izquierda))
+    return etiquetas
+
+
+def _route_group(lat, lon, xy, max_km, time_limit):
+    """
+    Rutea un grupo y lo parte en dos mientras su recorrido supere max_km.
+
+    El recorrido parte del punto más al norte, como el orden por Latitud descendente.
+
+    Returns:
+        Lista de recorridos (arreglos de índices locales al grupo)
+    """
+    dist = haversine_matrix(lat, lon)
+    route = optimize_route(dist, start=int(np.argmax(xy[:, 1])), time_limit=time_limit)
+    if max_km is None or len(route) < 2 or route_length(dist, route) <= max_km:
+        return [route]
+
+    mitades = balanced_partition(xy, 2)
+    recorridos = []
+    for mitad in (0, 1):
+        indices = np.flatnonzero(mitades == mitad)
+        for sub in _route_group(lat[indices], lon[indices], xy[indices], max_km, time_limit):
+            recorridos.append(indices[sub])
+    return recorridos
+
+
+def schedule_work_orders(df, crews=3, max_stops=25, max_km=None, lat_col='Latitud',
+                         lon_col='Longitud', time_budget=5.0):
+    """
+    Asigna los PQR pendientes a cuadrillas y días, con una ruta por cuadrilla y día.
+
+    Args:
+        df: DataFrame de PQR (load_pqr_data o load_data)
+        crews: Número de cuadrillas
+        max_stops: Máximo de paradas por cuadrilla y día
+        max_km: Máximo de kilómetros por cuadrilla y día (None = sin límite)
+        lat_col: Columna de latitud
+        lon_col: Columna de longitud
+        time_budget: Segundos de mejora local repartidos entre todos los recorridos.
+            Un recorrido de 30 paradas converge en ~10 ms, así que el límite
+            solo recorta la búsqueda en programaciones de decenas de miles de paradas
+
+    Returns:
+        DataFrame con las paradas pendientes y las columnas 'Cuadrilla', 'Dia',
+        'Orden_visita', 'Distancia_tramo_km' y 'Distancia_acumulada_km',
+        ordenado por cuadrilla, día y orden de visita
+    """
+    pendientes = pending_requests(df, lat_col=lat_col, lon_col=lon_col).reset_index(drop=True)
+    n = len(pendientes)
+    if n == 0:
+        return pendientes.assign(**{c: [] for c in _COLUMNAS_PLAN})
+
+    lat = pendientes[lat_col].to_numpy(dtype='float64')
+    lon = pendientes[lon_col].to_numpy(dtype='float64')
+    xy = _planar_km(lat, lon)
+    max_stops = max(1, int(max_stops))
+
+    territorios = balanced_partition(xy, crews)
+    tamanos = np.bincount(territorios)
+    time_limit = time_budget / (-(-tamanos // max_stops)).sum()
+
+    orden, cuadrilla, dia, tramos = [], [], [], []
+    for c, tamano in enumerate(tamanos):
+        miembros = np.flatnonzero(territorios == c)
+        grupos = balanced_partition(xy[miembros], -(-tamano // max_stops))
+
+        recorridos = []
+        for g in range(grupos.max() + 1):
+            indices = miembros[grupos == g]
+            for sub in _route_group(lat[indices], lon[indices], xy[indices], max_km, time_limit):
+                recorridos.append(indices[sub])
+
+        # Los días de cada cuadrilla avanzan de norte a sur
+        recorridos.sort(key=lambda r: -xy[r, 1].mean())
+        for d, recorrido in enumerate(recorridos, start=1):
+            orden.append(recorrido)
+            cuadrilla.append(np.full(len(recorrido), c + 1))
+            dia.append(np.full(len(recorrido), d))
+            tramos.append(_leg_km(lat, lon, recorrido))
+
+    plan = pendientes.iloc[np.concatenate(orden)].reset_index(drop=True)
+    plan['Cuadrilla'] = np.concatenate(cuadrilla)
+    plan['Dia'] = np.concatenate(dia)
+    plan['Orden_visita'] = plan.groupby(['Cuadrilla', 'Dia']).cumcount() + 1
+    tramos = pd.Series(np.concatenate(tramos))
+    plan['Distancia_tramo_km'] = tramos.round(3)
+    plan['Distancia_acumulada_km'] = tramos.groupby([plan['Cuadrilla'], plan['Dia']]).cumsum().round(3)
+    return plan
+
+
+def schedule_summary(plan):
+    """
+    Resumen de paradas y kilómetros por cuadrilla y día.
+
+    Args:
+        plan: DataFrame de schedule_work_orders
+
+    Returns:
+        DataFrame con 'Cuadrilla', 'Dia', 'Paradas' y 'Km'
+    """
+    return (
+        plan.groupby(['Cuadrilla', 'Dia'])
+        .agg(Paradas=('Orden_visita', 'size'), Km=('Distancia_tramo_km', 'sum'))
+        .reset_index()
+        .round({'Km': 2})
+    )
+
+
+def work_order_frames(plan):
+    """Itera (cuadrilla, día, DataFrame de la orden de trabajo) en orden."""
+    columnas = [c for c in COLUMNAS_ORDEN if c in plan.columns]
+    for (cuadrilla, dia), orden in plan.groupby(['Cuadrilla', 'Dia'], sort=True):
+        yield int(cuadrilla), int(dia), orden[columnas]
+
+
+def work_order_geojson(orden, lat_col='Latitud', lon_col='Longitud'):
+    """
+    FeatureCollection de una orden de trabajo: un punto por parada y la línea del recorrido.
+
+    Args:
+        orden: DataFrame de una cuadrilla y un día (ver work_order_frames)
+        lat_col: Columna de latitud
+        lon_col: Columna de longitud
+
+    Returns:
+        Diccionario GeoJSON
+    """
+    columnas = [c for c in orden.columns if c not in (lat_col, lon_col)]
+    coleccion = frame_to_feature_collection(orden, columnas, lat_col=lat_col, lon_col=lon_col)
+    linea = [f['geometry']['coordinates'] for f in coleccion['features']]
+    if len(linea) > 1:
+        coleccion['features'].append({
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': linea},
+            'properties': {'Km': round(float(orden['Distancia_tramo_km'].sum()), 3)},
+        })
+    return coleccion
+
+
+def _work_order_name(cuadrilla, dia):
+    return f"cuadrilla_{cuadrilla:02d}_dia_{dia:02d}"
+
+
+def write_work_orders(plan, out_dir, formats=('csv', 'geojson')):
+    """
+    Escribe una orden de trabajo por cuadrilla y día, y el resumen de distancias.
+
+    Args:
+        plan: DataFrame de schedule_work_orders
+        out_dir: Carpeta de salida (se crea si no existe)
+        formats: Formatos a escribir ('csv' y/o 'geojson')
+
+    Returns:
+        Lista de rutas escritas
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    escritos = []
+    for cuadrilla, dia, orden in work_order_frames(plan):
+        base = out_dir / _work_order_name(cuadrilla, dia)
+        if 'csv' in formats:
+            orden.to_csv(base.with_suffix('.csv'), index=False)
+            escritos.append(base.with_suffix('.csv'))
+        if 'geojson' in formats:
+            base.with_suffix('.geojson').write_text(
+                json.dumps(work_order_geojson(orden), ensure_ascii=False), encoding='utf-8'
+            )
+            escritos.append(base.with_suffix('.geojson'))
+    resumen = out_dir / 'resumen_cuadrillas.csv'
+    schedule_summary(plan).to_csv(resumen, index=False)
+    escritos.append(resumen)
+    return escritos
+
+
+def work_orders_zip(plan, formats=('csv', 'geojson')):
+    """
+    Órdenes de trabajo y resumen empaquetados en un ZIP en memoria (para st.download_button).
+
+    Returns:
+        Contenido del ZIP en bytes
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for cuadrilla, dia, orden in work_order_frames(plan):
+            nombre = _work_order_name(cuadrilla, dia)
+            if 'csv' in formats:
+                zf.writestr(f"{nombre}.csv", orden.to_csv(index=False))
+            if 'geojson' in formats:
+                zf.writestr(f"{nombre}.geojson", json.dumps(work_order_geojson(orden), ensure_ascii=False))
+        zf.writestr('resumen_cuadrillas.csv', schedule_summary(plan).to_csv(index=False))
+    return buffer.getvalue()
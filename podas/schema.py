@@ -0,0 +1,152 @@
+"""
+Esquema de tipos compacto para los DataFrames cargados por las apps.
+
+Los CSV se leen con todas las columnas de texto como cadenas, una por fila,
+aunque Comuna, Tipo o las especies tengan pocas decenas de valores distintos.
+compact_frame aplica al cargar un tipo por columna:
+
+- 'category': texto de baja cardinalidad (códigos enteros + tabla de valores)
+- 'flag': columnas SI/NO como categóricas con categorías ['NO', 'SI'] (1 byte
+  por fila, como un booleano, pero las comparaciones con 'SI' siguen igual)
+- 'float32': coordenadas y medidas (error < 1 m en las longitudes de Neiva)
+- 'key': Sticker e ID_Luminaria como texto (casi todos distintos, así que no
+  se comprimen; solo se unifica el tipo y los nulos siguen siendo nulos)
+- 'int': enteros con el menor ancho que admite su rango
+
+memory_report muestra el tamaño de cada DataFrame antes y después.
+"""
+
+import numpy as np
+import pandas as pd
+
+FLAG_CATEGORIES = ['NO', 'SI']
+
+# Tipo de cada columna conocida; las columnas ausentes en un DataFrame se ignoran
+COLUMN_TYPES = {
+    # Texto de baja cardinalidad
+    'Comuna': 'category',
+    'Tipo': 'category',
+    'Estado': 'category',
+    'P.Q.R.S': 'category',
+    'NOMBRE COMÚN': 'category',
+    'Nombre_comun': 'category',
+    'NOMBRE CIENTIFICO': 'category',
+    'Cruce_CAM': 'category',
+    'Cruce_forestal': 'category',
+    'PROCESO': 'category',
+    'BARRIO': 'category',
+    'DIAMETRO DE COPAS (m)': 'category',
+    'ESTADO FISICO (B,R,M, MM)': 'category',
+    'AFECTACIÓN ALUMBRADO (A,M,B)': 'category',
+    'TRATAMIENTO, PODA ': 'category',
+    'TRATAMIENTO, PODA': 'category',
+    # Banderas SI/NO
+    'Requiere_Acción': 'flag',
+    'Inventariado': 'flag',
+    'Ejecutada': 'flag',
+    'Permiso_CAM': 'flag',
+    # Coordenadas y medidas
+    'Latitud': 'float32',
+    'Longitud': 'float32',
+    'Distancia_CAM_m': 'float32',
+    'Distancia_forestal_m': 'float32',
+    'HT(m)': 'float32',
+    'CAP(cm)': 'float32',
+    'DAP(m)': 'float32',
+    'VOLUMEN (m3)': 'float32',
+    # Claves
+    'Sticker': 'key',
+    'ID_Luminaria': 'key',
+    'Sticker_inv': 'key',
+    'ID_Luminaria_inv': 'key',
+    'CODIGO': 'key',
+    # Enteros
+    'ID': 'int',
+    'Comuna_Num': 'int',
+}
+
+
+def _flag(serie):
+    """Categórica SI/NO; si hay otros valores se agregan como categorías extra."""
+    otros = sorted(set(serie.dropna().astype(str).unique()) - set(FLAG_CATEGORIES))
+    return serie.astype(pd.CategoricalDtype(FLAG_CATEGORIES + otros))
+
+
+def _key(serie):
+    """
+    Texto; los ID numéricos (leídos como enteros) también pasan a texto. Solo
+    se convierten los valores no nulos: astype(str) sobre NaN/None daría los
+    textos 'nan'/'None', que se mostrarían en popups y tablas en lugar de N/D.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype(object)
+    return serie.where(serie.isna(), serie.astype(str)) if serie.notna().any() else serie
+
+
+def _int(serie):
+    """Entero con el menor ancho posible (se deja igual si tiene nulos o no es entero)."""
+    if not pd.api.types.is_integer_dtype(serie.dtype):
+        return serie
+    return pd.to_numeric(serie, downcast='integer')
+
+
+def _float32(serie):
+    """Flotante de 32 bits (el texto no numérico queda como NaN)."""
+    return pd.to_numeric(serie, errors='coerce').astype('float32')
+
+
+_CONVERTERS = {
+    'category': lambda serie: serie.astype('category'),
+    'flag': _flag,
+    'float32': _float32,
+    'key': _key,
+    'int': _int,
+}
+
+
+def compact_frame(df, column_types=None):
+    """
+    Aplica el esquema compacto a las columnas conocidas de un DataFrame.
+
+    Args:
+        df: DataFrame cargado (no se modifica)
+        column_types: Diccionario {columna: tipo} (por defecto COLUMN_TYPES)
+
+    Returns:
+        DataFrame nuevo con las columnas convertidas; el resto se conserva
+    """
+    column_types = COLUMN_TYPES if column_types is None else column_types
+    convertidas = {
+        columna: _CONVERTERS[tipo](df[columna])
+        for columna, tipo in column_types.items()
+        if columna in df.columns
+    }
+    return df.assign(**convertidas)
+
+
+def memory_report(frames, compacted=None):
+    """
+    Tamaño en memoria (MB, contando el texto) de cada DataFrame.
+
+    Args:
+        frames: Diccionario {nombre: DataFrame}
+        compacted: Diccionario {nombre: DataFrame compacto} para comparar (opcional)
+
+    Returns:
+        DataFrame con 'Tabla', 'Filas', 'Columnas', 'MB' y, si hay compacted,
+        'MB_compacto' y 'Reduccion' (veces)
+    """
+    filas = []
+    for nombre, df in frames.items():
+        fila = {
+            'Tabla': nombre,
+            'Filas': len(df),
+            'Columnas': df.shape[1],
+            'MB': round(df.memory_usage(deep=True).sum() / 1e6, 3),
+        }
+        if compacted is not None and nombre in compacted:
+            compacto = compacted[nombre].memory_usage(deep=True).sum() / 1e6
+            fila['MB_compacto'] = round(compacto, 3)
+            fila['Reduccion'] = round(fila['MB'] / compacto, 1) if compacto else np.nan
+        filas.append(fila)
+    return pd.DataFrame(filas)
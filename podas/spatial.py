@@ -0,0 +1,174 @@
+"""
+Índice espacial de malla uniforme para buscar vecinos cercanos en bloque.
+
+Los puntos se proyectan a metros con una proyección equirectangular local
+(suficiente a escala de ciudad) y se ordenan por celda. Una consulta revisa
+las 3 x 3 celdas alrededor de cada punto con arreglos NumPy, sin bucles por
+punto: con celdas del tamaño del radio de búsqueda, miles de puntos se
+resuelven en pocos milisegundos.
+"""
+
+import numpy as np
+
+RADIO_TIERRA_M = 6371008.8
+
+
+def planar_m(lat, lon, lat0):
+    """
+    Proyección equirectangular local en metros.
+
+    Args:
+        lat: Latitudes en grados
+        lon: Longitudes en grados
+        lat0: Latitud de referencia (grados) para la escala de las longitudes
+
+    Returns:
+        Arreglo n x 2 de coordenadas (x, y) en metros
+    """
+    lat = np.asarray(lat, dtype='float64')
+    lon = np.asarray(lon, dtype='float64')
+    x = np.radians(lon) * np.cos(np.radians(lat0)) * RADIO_TIERRA_M
+    y = np.radians(lat) * RADIO_TIERRA_M
+    return np.column_stack([x, y])
+
+
+class GridIndex:
+    """
+    Malla uniforme sobre un conjunto de puntos (los que no tienen coordenadas se ignoran).
+
+    Args:
+        lat: Latitudes en grados
+        lon: Longitudes en grados
+        cell_m: Lado de la celda en metros (usar el radio de búsqueda habitual)
+    """
+
+    def __init__(self, lat, lon, cell_m=25.0):
+        lat = np.asarray(lat, dtype='float64')
+        lon = np.asarray(lon, dtype='float64')
+        validos = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        self.cell_m = float(cell_m)
+        self.lat0 = float(np.mean(lat[validos])) if len(validos) else 0.0
+        self.size = len(lat)
+
+        xy = planar_m(lat[validos], lon[validos], self.lat0)
+        celdas = np.floor(xy / self.cell_m).astype(np.int64)
+        self._origen = celdas.min(axis=0) - 1 if len(celdas) else np.zeros(2, dtype=np.int64)
+        self._ancho = int(celdas[:, 0].max() - self._origen[0] + 2) if len(celdas) else 1
+
+        codigos = self._cell_codes(celdas)
+        orden = np.argsort(codigos, kind='stable')
+        self._codigos = codigos[orden]
+        self._xy = xy[orden]
+        self._filas = validos[orden]
+
+    def _cell_codes(self, celdas):
+        """Código lineal de cada celda (x, y) de la malla."""
+        relativas = celdas - self._origen
+        return relativas[:, 1] * self._ancho + relativas[:, 0]
+
+    def query(self, lat, lon, max_dist_m, k=1):
+        """
+        Los k puntos más cercanos a cada consulta dentro de max_dist_m.
+
+        Args:
+            lat: Latitudes de las consultas en grados
+            lon: Longitudes de las consultas en grados
+            max_dist_m: Distancia máxima en metros (se amplía la búsqueda a las
+                celdas necesarias si es mayor que cell_m)
+            k: Número de vecinos por consulta
+
+        Returns:
+            Tupla (filas, distancias) de forma n x k: fila del punto indexado
+            (-1 si no hay vecino dentro del radio) y distancia en metros (inf)
+        """
+        lat = np.asarray(lat, dtype='float64')
+        lon = np.asarray(lon, dtype='float64')
+        n = len(lat)
+        filas = np.full((n, k), -1, dtype=np.intp)
+        distancias = np.full((n, k), np.inf)
+        consultas = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        if len(consultas) == 0 or len(self._filas) == 0:
+            return filas, distancias
+
+        xy = planar_m(lat[consultas], lon[consultas], self.lat0)
+        celdas = np.floor(xy / self.cell_m).astype(np.int64)
+        alcance = int(np.ceil(max_dist_m / self.cell_m))
+        desplazamientos = np.arange(-alcance, alcance + 1)
+        dx, dy = np.meshgrid(desplazamientos, desplazamientos)
+        vecinas = celdas[:, None, :] + np.stack([dx.ravel(), dy.ravel()], axis=1)[None, :, :]
+
+        # Las celdas fuera de la malla no tienen puntos
+        relativas = vecinas - self._origen
+        dentro = (relativas[..., 0] >= 0) & (relativas[..., 0] < self._ancho) & (relativas[..., 1] >= 0)
+        codigos = np.where(dentro, relativas[..., 1] * self._ancho + relativas[..., 0], -1).ravel()
+        inicio = np.searchsorted(self._codigos, codigos, side='left')
+        fin = np.searchsorted(self._codigos, codigos, side='right')
+        fin[codigos < 0] = inicio[codigos < 0]
+
+        # Pares (consulta, candidato) de todas las celdas vecinas
+        cuantos = fin - inicio
+        consulta = np.repeat(np.repeat(np.arange(len(consultas)), len(dx.ravel())), cuantos)
+        desfase = np.arange(cuantos.sum()) - np.repeat(np.cumsum(cuantos) - cuantos, cuantos)
+        candidato = np.repeat(inicio, cuantos) + desfase
+
+        distancia = np.hypot(*(self._xy[candidato] - xy[consulta]).T)
+        cerca = distancia <= max_dist_m
+        consulta, candidato, distancia = consulta[cerca], candidato[cerca], distancia[cerca]
+
+        # Los k más cercanos de cada consulta
+        orden = np.lexsort((distancia, consulta))
+        consulta, candidato, distancia = consulta[orden], candidato[orden], distancia[orden]
+        primero = np.searchsorted(consulta, consulta, side='left')
+        rango = np.arange(len(consulta)) - primero
+        top = rango < k
+        filas[consultas[consulta[top]], rango[top]] = self._filas[candidato[top]]
+        distancias[consultas[consulta[top]], rango[top]] = distancia[top]
+        return filas, distancias
+
+    def nearest(self, lat, lon, max_dist_m):
+        """
+        Punto más cercano a cada consulta dentro de max_dist_m.
+
+        Returns:
+            Tupla (filas, distancias) de largo n (-1 e inf si no hay vecino)
+        """
+        filas, distancias = self.query(lat, lon, max_dist_m, k=1)
+        return filas[:, 0], distancias[:, 0]
+
+
+def colocated_groups(lat, lon, tol_m=1.0):
+    """
+    Agrupa puntos con coordenadas iguales o casi iguales (hash espacial).
+
+    Las coordenadas se redondean a una malla de tol_m metros y los puntos que
+    caen en la misma celda forman un grupo; con tol_m=0 solo se agrupan
+    coordenadas idénticas. Dos puntos a menos de tol_m pueden quedar en
+    celdas vecinas y no agruparse.
+
+    Args:
+        lat: Latitudes en grados
+        lon: Longitudes en grados
+        tol_m: Lado de la celda en metros
+
+    Returns:
+        Arreglo con el grupo de cada punto (0..g-1 en orden de primera
+        aparición; -1 si no tiene coordenadas válidas)
+    """
+    lat = np.asarray(lat, dtype='float64')
+    lon = np.asarray(lon, dtype='float64')
+    grupos = np.full(len(lat), -1, dtype=np.intp)
+    validos = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+    if len(validos) == 0:
+        return grupos
+
+    if tol_m > 0:
+        xy = planar_m(lat[validos], lon[validos], float(np.mean(lat[validos])))
+        claves = np.floor(xy / tol_m).astype(np.int64)
+    else:
+        claves = np.column_stack([lat[validos], lon[validos]])
+    _, primera, inversa = np.unique(claves, axis=0, return_index=True, return_inverse=True)
+    # Numerar los grupos por la primera fila en que aparecen
+    orden = np.empty(len(primera), dtype=np.intp)
+    orden[np.argsort(primera, kind='stable')] = np.arange(len(primera))
+    grupos[validos] = orden[inversa.ravel()]
+    return grupos
@@ -0,0 +1,313 @@
+"""
+Tiempos por etapa de cada rerun de los tableros.
+
+Cada rerun abre un registro (start) y las etapas se miden con span (bloque
+with) o timed (decorador); los tramos anidados quedan como hijos del tramo
+que los contiene. Al final del script, finish cierra el registro, lo agrega
+al archivo JSONL de PODAS_TIMING_LOG y el panel de la barra lateral
+(render_panel) muestra los tramos del rerun y los percentiles p50/p95 por
+página del registro.
+
+Apagado (sin PODAS_TIMING_LOG, sin PODAS_TIMING_PANEL y sin ?debug=1 en la
+URL) no se abre ningún registro: span devuelve un contexto vacío compartido y
+el costo por etapa es una consulta a un atributo de hilo.
+
+    PODAS_TIMING_LOG=tiempos.jsonl streamlit run app_v2.py
+    python -m podas.timing tiempos.jsonl          # p50/p95 por página y etapa
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Archivo JSONL donde se agrega un registro por rerun (vacío = sin registro)
+LOG_ENV = 'PODAS_TIMING_LOG'
+# Con un valor no vacío, el panel se muestra en todas las sesiones
+PANEL_ENV = 'PODAS_TIMING_PANEL'
+# Parámetro de la URL que muestra el panel en una sesión (?debug=1)
+PANEL_QUERY_PARAM = 'debug'
+# Registros más recientes que se leen para los percentiles del panel
+SUMMARY_TAIL = 2000
+
+_local = threading.local()
+_log_lock = threading.Lock()
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class RerunTimer:
+    """
+    Tramos medidos durante un rerun.
+
+    Args:
+        page: Nombre de la página
+        kind: 'rerun' (script completo) o 'fragmento' (solo una sección st.fragment)
+    """
+
+    def __init__(self, page, kind='rerun'):
+        self.page = page
+        self.kind = kind
+        self.spans = []
+        self._depth = 0
+        self._t0 = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Mide el bloque; el tramo se agrega en orden de inicio."""
+        tramo = {'name': name, 'depth': self._depth, 'start_ms': (time.perf_counter() - self._t0) * 1000}
+        self.spans.append(tramo)
+        self._depth += 1
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            tramo['ms'] = (time.perf_counter() - t0) * 1000
+            self._depth -= 1
+
+    def add(self, name, seconds):
+        """Agrega un tramo medido por otro código (p. ej. los tiempos de IncrementalPqrData.refresh)."""
+        self.spans.append({'name': name, 'depth': self._depth,
+                           'start_ms': (time.perf_counter() - self._t0) * 1000, 'ms': seconds * 1000})
+
+    def record(self):
+        """Registro JSON del rerun."""
+        return {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'page': self.page,
+            'kind': self.kind,
+            'total_ms': round((time.perf_counter() - self._t0) * 1000, 3),
+            'spans': [dict(t, ms=round(t.get('ms', 0.0), 3), start_ms=round(t['start_ms'], 3))
+                      for t in self.spans],
+        }
+
+
+def log_path():
+    """Ruta del registro JSONL, o None si no está configurado."""
+    ruta = os.environ.get(LOG_ENV, '').strip()
+    return Path(ruta) if ruta else None
+
+
+def current():
+    """RerunTimer del rerun en curso en este hilo, o None si la medición está apagada."""
+    return getattr(_local, 'timer', None)
+
+
+def start(page, kind='rerun'):
+    """Abre el registro de un rerun en este hilo (reemplaza uno que no se cerró)."""
+    _local.timer = RerunTimer(page, kind)
+    return _local.timer
+
+
+def finish():
+    """
+    Cierra el registro del rerun en curso y lo agrega al JSONL (si hay uno configurado).
+
+    Returns:
+        Registro del rerun, o None si no había uno abierto
+    """
+    timer = current()
+    if timer is None:
+        return None
+    _local.timer = None
+    registro = timer.record()
+    ruta = log_path()
+    if ruta is not None:
+        append_record(ruta, registro)
+    return registro
+
+
+def append_record(path, record):
+    """Agrega un registro al archivo JSONL (una línea por rerun)."""
+    linea = json.dumps(record, ensure_ascii=False) + '\n'
+    with _log_lock:
+        with open(path, 'a', encoding='utf-8') as archivo:
+            archivo.write(linea)
+
+
+def span(name):
+    """Contexto que mide una etapa del rerun en curso (vacío si la medición está apagada)."""
+    timer = current()
+    return _NULL_SPAN if timer is None else timer.span(name)
+
+
+def add(name, seconds):
+    """Agrega un tramo ya medido al rerun en curso (no hace nada si la medición está apagada)."""
+    timer = current()
+    if timer is not None:
+        timer.add(name, seconds)
+
+
+def timed(name):
+    """Decorador que mide cada llamada de la función como un tramo (ver span)."""
+    def decorador(func):
+        @functools.wraps(func)
+        def envoltura(*args, **kwargs):
+            timer = current()
+            if timer is None:
+                return func(*args, **kwargs)
+            with timer.span(name):
+                return func(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+@contextlib.contextmanager
+def fragment(page, name):
+    """
+    Tramo de una sección st.fragment. Dentro de un rerun completo es un tramo
+    más; en un rerun solo del fragmento (el script no pasa por start) abre y
+    cierra su propio registro de tipo 'fragmento'.
+    """
+    if current() is not None:
+        with span(name):
+            yield
+        return
+    if not panel_requested() and log_path() is None:
+        yield
+        return
+    timer = start(page, kind=f"fragmento:{name}")
+    try:
+        with timer.span(name):
+            yield
+    finally:
+        finish()
+
+
+def panel_requested():
+    """Si el panel se pidió por variable de entorno o por ?debug=1 en la URL."""
+    if os.environ.get(PANEL_ENV, '').strip():
+        return True
+    try:
+        import streamlit as st
+        return st.query_params.get(PANEL_QUERY_PARAM, '') not in ('', '0')
+    except Exception:
+        return False
+
+
+def start_page(page):
+    """
+    Abre el registro del rerun si la medición está encendida (registro JSONL,
+    PODAS_TIMING_PANEL o ?debug=1). Se llama al inicio del script.
+
+    Returns:
+        RerunTimer, o None si la medición está apagada
+    """
+    if log_path() is None and not panel_requested():
+        _local.timer = None
+        return None
+    return start(page)
+
+
+def read_log(path, tail=None):
+    """
+    Registros de un archivo JSONL (las líneas incompletas se ignoran).
+
+    Args:
+        path: Archivo JSONL
+        tail: Cantidad de registros más recientes a devolver (None = todos)
+
+    Returns:
+        Lista de registros
+    """
+    registros = []
+    try:
+        with open(path, encoding='utf-8') as archivo:
+            lineas = archivo.readlines()
+    except FileNotFoundError:
+        return registros
+    for linea in lineas[-tail:] if tail else lineas:
+        try:
+            registros.append(json.loads(linea))
+        except json.JSONDecodeError:
+            continue
+    return registros
+
+
+def latency_summary(records, by_stage=False):
+    """
+    Percentiles de latencia por página (y tipo de rerun), o por etapa.
+
+    Args:
+        records: Registros de read_log
+        by_stage: Si es True, una fila por página y etapa en lugar de por rerun
+
+    Returns:
+        DataFrame con 'n', 'p50_ms', 'p95_ms' y 'max_ms'
+    """
+    if by_stage:
+        filas = [{'page': r['page'], 'stage': t['name'], 'ms': t['ms']} for r in records for t in r['spans']]
+        claves = ['page', 'stage']
+    else:
+        filas = [{'page': r['page'], 'kind': r['kind'], 'ms': r['total_ms']} for r in records]
+        claves = ['page', 'kind']
+    if not filas:
+        return pd.DataFrame(columns=claves + ['n', 'p50_ms', 'p95_ms', 'max_ms'])
+    return (
+        pd.DataFrame(filas)
+        .groupby(claves, sort=True)['ms']
+        .agg(n='size', p50_ms=lambda ms: np.percentile(ms, 50), p95_ms=lambda ms: np.percentile(ms, 95),
+             max_ms='max')
+        .round(1)
+        .reset_index()
+    )
+
+
+def spans_frame(record):
+    """Tramos de un registro como tabla, con el nombre sangrado según el anidamiento."""
+    return pd.DataFrame({
+        'Etapa': [' ' * t['depth'] + t['name'] for t in record['spans']],
+        'ms': [round(t['ms'], 1) for t in record['spans']],
+    })
+
+
+def render_panel(record):
+    """
+    Panel de la barra lateral con los tramos del rerun y los percentiles del
+    registro JSONL. Solo se muestra si se pidió (PODAS_TIMING_PANEL o ?debug=1).
+
+    Args:
+        record: Registro devuelto por finish (None = no se midió)
+    """
+    if record is None or not panel_requested():
+        return
+    import streamlit as st
+
+    with st.sidebar.expander(f"⏱️ Tiempos por etapa ({record['total_ms']:.0f} ms)", expanded=False):
+        st.dataframe(spans_frame(record), use_container_width=True, hide_index=True)
+        ruta = log_path()
+        if ruta is None:
+            st.caption(f"Defina {LOG_ENV} para registrar los reruns y ver p50/p95.")
+            return
+        registros = read_log(ruta, tail=SUMMARY_TAIL)
+        st.caption(f"Últimos {len(registros):,} reruns registrados en {ruta}")
+        st.dataframe(latency_summary(registros), use_container_width=True, hide_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m podas.timing',
+                                     description='Percentiles de latencia de un registro de tiempos JSONL.')
+    parser.add_argument('log', help='Archivo JSONL (PODAS_TIMING_LOG)')
+    parser.add_argument('--ultimos', type=int, default=None, help='Solo los N registros más recientes')
+    args = parser.parse_args(argv)
+
+    registros = read_log(args.log, tail=args.ultimos)
+    if not registros:
+        parser.error(f"sin registros en {args.log}")
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(latency_summary(registros).to_string(index=False))
+        print()
+        print(latency_summary(registros, by_stage=True).to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())